@@ -1,9 +1,11 @@
-from __future__ import unicode_literals
+from __future__ import absolute_import, unicode_literals
 
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.utils.translation import ugettext_lazy as _
 
 from common import MayanAppConfig, menu_object, menu_sidebar
 from navigation import SourceColumn
+from permissions.handlers import handler_invalidate_user_permission_cache
 from rest_api.classes import APIEndPoint
 
 from .links import link_acl_create, link_acl_delete, link_acl_permissions
@@ -36,3 +38,19 @@ class ACLsApp(MayanAppConfig):
         menu_sidebar.bind_links(
             links=(link_acl_create,), sources=('acls:acl_list',)
         )
+
+        m2m_changed.connect(
+            handler_invalidate_user_permission_cache,
+            dispatch_uid='acls_handler_invalidate_cache_acl_permissions',
+            sender=AccessControlList.permissions.through
+        )
+        post_delete.connect(
+            handler_invalidate_user_permission_cache,
+            dispatch_uid='acls_handler_invalidate_cache_acl_delete',
+            sender=AccessControlList
+        )
+        post_save.connect(
+            handler_invalidate_user_permission_cache,
+            dispatch_uid='acls_handler_invalidate_cache_acl_save',
+            sender=AccessControlList
+        )
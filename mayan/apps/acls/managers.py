@@ -3,13 +3,13 @@ from __future__ import absolute_import, unicode_literals
 import logging
 
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
 from django.db import models
 from django.db.models import Q
 from django.utils.translation import ugettext
 
 from common.utils import return_attrib
-from permissions import Permission
+from permissions import Permission, UserPermissionCache
 from permissions.models import StoredPermission
 
 from .classes import ModelPermission
@@ -47,6 +47,16 @@ class AccessControlListManager(models.Manager):
             except self.model.DoesNotExist:
                 return StoredPermission.objects.none()
 
+    def _get_parent_content_type(self, model, parent_accessor):
+        try:
+            related_model = model._meta.get_field(
+                parent_accessor
+            ).related_model
+        except FieldDoesNotExist:
+            return None
+        else:
+            return ContentType.objects.get_for_model(related_model)
+
     def check_access(self, permissions, user, obj, related=None):
         if user.is_superuser or user.is_staff:
             logger.debug(
@@ -55,6 +65,24 @@ class AccessControlListManager(models.Manager):
             )
             return True
 
+        try:
+            key = (
+                'access', Permission.get_pks(permissions=permissions),
+                obj._meta.label, obj.pk, related
+            )
+        except AttributeError:
+            # Non model objects can't be used as keys, check them directly
+            return self._check_access(
+                permissions=permissions, user=user, obj=obj, related=related
+            )
+
+        return UserPermissionCache.get_for_user(user=user).get_decision(
+            key=key, function=lambda: self._check_access(
+                permissions=permissions, user=user, obj=obj, related=related
+            )
+        )
+
+    def _check_access(self, permissions, user, obj, related=None):
         try:
             return Permission.check_permissions(
                 requester=user, permissions=permissions
@@ -89,19 +117,11 @@ class AccessControlListManager(models.Manager):
                 except PermissionDenied:
                     pass
 
-            user_roles = []
-            for group in user.groups.all():
-                for role in group.roles.all():
-                    if set(stored_permissions).intersection(set(self.get_inherited_permissions(role=role, obj=obj))):
-                        logger.debug(
-                            'Permissions "%s" on "%s" granted to user "%s" through role "%s" via inherited ACL',
-                            permissions, obj, user, role
-                        )
-                        return True
-
-                    user_roles.append(role)
+            permission_cache = UserPermissionCache.get_for_user(user=user)
 
-            if not self.filter(content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk, permissions__in=stored_permissions, role__in=user_roles).exists():
+            # The decision is memoized per object by check_access, query
+            # only the access control lists of this object.
+            if not self.filter(content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk, permissions__in=stored_permissions, role__pk__in=permission_cache.role_ids).exists():
                 logger.debug(
                     'Permissions "%s" on "%s" denied for user "%s"',
                     permissions, obj, user
@@ -110,9 +130,11 @@ class AccessControlListManager(models.Manager):
 
             logger.debug(
                 'Permissions "%s" on "%s" granted to user "%s" through roles "%s" by direct ACL',
-                permissions, obj, user, user_roles
+                permissions, obj, user, permission_cache.role_ids
             )
 
+            return True
+
     def filter_by_access(self, permission, user, queryset):
         if user.is_superuser or user.is_staff:
             logger.debug('Unfiltered queryset returned to user "%s" as superuser or staff',
@@ -124,10 +146,7 @@ class AccessControlListManager(models.Manager):
                 requester=user, permissions=(permission,)
             )
         except PermissionDenied:
-            user_roles = []
-            for group in user.groups.all():
-                for role in group.roles.all():
-                    user_roles.append(role)
+            user_roles = UserPermissionCache.get_for_user(user=user).role_ids
 
             try:
                 parent_accessor = ModelPermission.get_inheritance(
@@ -136,14 +155,23 @@ class AccessControlListManager(models.Manager):
             except KeyError:
                 parent_acl_query = Q()
             else:
-                instance = queryset.first()
-                if instance:
-                    parent_object = getattr(instance, parent_accessor)
-                    parent_content_type = ContentType.objects.get_for_model(
-                        parent_object
-                    )
+                parent_content_type = self._get_parent_content_type(
+                    model=queryset.model, parent_accessor=parent_accessor
+                )
+
+                if not parent_content_type:
+                    # The accessor is not a model field, fall back to
+                    # inspecting an instance.
+                    instance = queryset.first()
+                    if instance:
+                        parent_content_type = ContentType.objects.get_for_model(
+                            getattr(instance, parent_accessor)
+                        )
+
+                if parent_content_type:
                     parent_queryset = self.filter(
-                        content_type=parent_content_type, role__in=user_roles,
+                        content_type=parent_content_type,
+                        role__pk__in=user_roles,
                         permissions=permission.stored_permission
                     )
                     parent_acl_query = Q(
@@ -161,7 +189,7 @@ class AccessControlListManager(models.Manager):
             # Directly granted access
             content_type = ContentType.objects.get_for_model(queryset.model)
             acl_query = Q(pk__in=self.filter(
-                content_type=content_type, role__in=user_roles,
+                content_type=content_type, role__pk__in=user_roles,
                 permissions=permission.stored_permission
             ).values_list('object_id', flat=True))
             logger.debug(
@@ -9,6 +9,7 @@ from common.tests import BaseTestCase
 from documents.models import Document, DocumentType
 from documents.permissions import permission_document_view
 from documents.tests import TEST_SMALL_DOCUMENT_PATH, TEST_DOCUMENT_TYPE
+from permissions import UserPermissionCache
 from permissions.models import Role
 from permissions.tests.literals import TEST_ROLE_LABEL
 from user_management.tests.literals import TEST_USER_USERNAME, TEST_GROUP_NAME
@@ -172,3 +173,78 @@ class PermissionTestCase(BaseTestCase):
         self.assertTrue(self.document_1 in result)
         self.assertTrue(self.document_2 in result)
         self.assertTrue(self.document_3 in result)
+
+    def test_check_access_after_acl_change(self):
+        with self.assertRaises(PermissionDenied):
+            AccessControlList.objects.check_access(
+                permissions=(permission_document_view,),
+                user=self.user, obj=self.document_1
+            )
+
+        acl = AccessControlList.objects.create(
+            content_object=self.document_1, role=self.role
+        )
+        acl.permissions.add(permission_document_view.stored_permission)
+
+        try:
+            AccessControlList.objects.check_access(
+                permissions=(permission_document_view,), user=self.user,
+                obj=self.document_1
+            )
+        except PermissionDenied:
+            self.fail('PermissionDenied exception was not expected.')
+
+        self.group.user_set.remove(self.user)
+
+        with self.assertRaises(PermissionDenied):
+            AccessControlList.objects.check_access(
+                permissions=(permission_document_view,),
+                user=self.user, obj=self.document_1
+            )
+
+    def test_check_access_repeated_queries(self):
+        acl = AccessControlList.objects.create(
+            content_object=self.document_1, role=self.role
+        )
+        acl.permissions.add(permission_document_view.stored_permission)
+
+        AccessControlList.objects.check_access(
+            permissions=(permission_document_view,), user=self.user,
+            obj=self.document_1
+        )
+
+        with self.assertNumQueries(0):
+            AccessControlList.objects.check_access(
+                permissions=(permission_document_view,), user=self.user,
+                obj=self.document_1
+            )
+
+    def test_check_access_decision_cache(self):
+        with self.assertRaises(PermissionDenied):
+            AccessControlList.objects.check_access(
+                permissions=(permission_document_view,),
+                user=self.user, obj=self.document_1
+            )
+
+        permission_cache = UserPermissionCache.get_for_user(user=self.user)
+        hits = permission_cache.hits
+
+        with self.assertRaises(PermissionDenied):
+            AccessControlList.objects.check_access(
+                permissions=(permission_document_view,),
+                user=self.user, obj=self.document_1
+            )
+
+        self.assertEqual(permission_cache.hits, hits + 1)
+
+        acl = AccessControlList.objects.create(
+            content_object=self.document_1, role=self.role
+        )
+        acl.permissions.add(permission_document_view.stored_permission)
+
+        self.assertTrue(
+            AccessControlList.objects.check_access(
+                permissions=(permission_document_view,), user=self.user,
+                obj=self.document_1
+            )
+        )
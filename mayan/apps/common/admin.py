@@ -2,7 +2,9 @@ from __future__ import unicode_literals
 
 from django.contrib import admin
 
-from .models import SharedUploadedFile, UserLocaleProfile
+from .models import (
+    SharedUploadedFile, SharedUploadSession, UserLocaleProfile
+)
 
 
 @admin.register(SharedUploadedFile)
@@ -12,6 +14,15 @@ class SharedUploadedFileAdmin(admin.ModelAdmin):
     readonly_fields = list_display
 
 
+@admin.register(SharedUploadSession)
+class SharedUploadSessionAdmin(admin.ModelAdmin):
+    date_hierarchy = 'datetime'
+    list_display = (
+        'uuid', 'user', 'filename', 'offset', 'size', 'datetime',
+    )
+    readonly_fields = list_display
+
+
 @admin.register(UserLocaleProfile)
 class UserLocaleProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'timezone', 'language',)
@@ -1,10 +1,18 @@
 from __future__ import unicode_literals
 
+import re
+
 from django.contrib.contenttypes.models import ContentType
+from django.utils.translation import ugettext_lazy as _
 
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from .serializers import ContentTypeSerializer
+from .exceptions import UploadSessionError, UploadSessionOffsetError
+from .literals import UPLOAD_SESSION_CONTENT_RANGE_REGEX
+from .models import SharedUploadSession
+from .serializers import ContentTypeSerializer, SharedUploadSessionSerializer
 
 
 class APIContentTypeList(generics.ListAPIView):
@@ -14,3 +22,110 @@ class APIContentTypeList(generics.ListAPIView):
 
     serializer_class = ContentTypeSerializer
     queryset = ContentType.objects.order_by('app_label', 'model')
+
+
+class APISharedUploadSessionListView(generics.CreateAPIView):
+    """
+    Start a chunked upload session.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = SharedUploadSessionSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def post(self, *args, **kwargs):
+        """
+        Create a new upload session. Chunks are then sent to the session
+        URL and the finished session is used as the file of a new document
+        or document version.
+        """
+
+        return super(APISharedUploadSessionListView, self).post(
+            *args, **kwargs
+        )
+
+
+class APISharedUploadSessionView(generics.RetrieveDestroyAPIView):
+    """
+    Returns the selected upload session details.
+    """
+
+    lookup_field = 'uuid'
+    permission_classes = (IsAuthenticated,)
+    serializer_class = SharedUploadSessionSerializer
+
+    def delete(self, *args, **kwargs):
+        """
+        Abort the selected upload session.
+        """
+
+        return super(APISharedUploadSessionView, self).delete(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        """
+        Return the selected upload session details. The offset is where
+        an interrupted upload must resume.
+        """
+
+        return super(APISharedUploadSessionView, self).get(*args, **kwargs)
+
+    def get_queryset(self):
+        return SharedUploadSession.objects.filter(user=self.request.user)
+
+    def put(self, request, *args, **kwargs):
+        """
+        Append a chunk to the selected upload session. The request body is
+        the raw chunk and the Content-Range header its position,
+        as in: bytes 0-1048575/10485760
+        """
+
+        instance = self.get_object()
+
+        match = re.match(
+            UPLOAD_SESSION_CONTENT_RANGE_REGEX,
+            request.META.get('HTTP_CONTENT_RANGE', '')
+        )
+        if not match:
+            return Response(
+                {'detail': _('Missing or invalid Content-Range header.')},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        start, end = int(match.group(1)), int(match.group(2))
+        if end < start:
+            return Response(
+                {'detail': _('Missing or invalid Content-Range header.')},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if match.group(3) != '*' and int(match.group(3)) != instance.size:
+            return Response(
+                {
+                    'detail': _(
+                        'Content-Range total doesn\'t match the size of the '
+                        'upload session.'
+                    )
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            instance.append(
+                offset=start, file_object=request.stream,
+                length=end - start + 1
+            )
+        except UploadSessionOffsetError as exception:
+            return Response(
+                {'detail': _('Unexpected offset.'), 'offset': exception.offset},
+                status=status.HTTP_409_CONFLICT
+            )
+        except UploadSessionError as exception:
+            return Response(
+                {'detail': unicode(exception)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
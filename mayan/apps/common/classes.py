@@ -1,10 +1,16 @@
 from __future__ import unicode_literals
 
+from collections import OrderedDict
+import threading
+
 from django.apps import apps
 from django.core.urlresolvers import reverse
 from django.db import models
+from django.template import Template
 from django.utils.translation import ugettext
 
+from .literals import TEMPLATE_CACHE_MAXIMUM_SIZE
+
 
 class Collection(object):
     _registry = []
@@ -208,3 +214,41 @@ class Package(object):
         self.label = label
         self.license_text = license_text
         self.__class__._registry.append(self)
+
+
+class TemplateCache(object):
+    """
+    Compiled templates of user defined expressions (indexing, smart links,
+    metadata defaults and lookups) keyed by their text, to avoid lexing and
+    parsing the same expression on every evaluation. The least recently
+    used templates are discarded once the maximum size is reached.
+    """
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._cache.clear()
+
+    @classmethod
+    def get(cls, template_string):
+        with cls._lock:
+            try:
+                template = cls._cache.pop(template_string)
+            except KeyError:
+                pass
+            else:
+                cls._cache[template_string] = template
+                return template
+
+        # Compile outside of the lock, syntax errors are raised to the
+        # caller and not cached.
+        template = Template(template_string)
+
+        with cls._lock:
+            cls._cache[template_string] = template
+            while len(cls._cache) > TEMPLATE_CACHE_MAXIMUM_SIZE:
+                cls._cache.popitem(last=False)
+
+        return template
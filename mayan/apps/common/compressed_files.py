@@ -1,5 +1,8 @@
 from __future__ import unicode_literals
 
+import shutil
+import tarfile
+from tempfile import SpooledTemporaryFile
 import zipfile
 
 try:
@@ -13,7 +16,11 @@ try:
 except ImportError:
     from StringIO import StringIO
 
+from django.core.files import File
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils.encoding import force_text
+
+from .literals import COMPRESSED_FILE_SPOOL_SIZE
 
 
 class NotACompressedFile(Exception):
@@ -93,20 +100,54 @@ class CompressedFile(object):
     def as_file(self, filename):
         return SimpleUploadedFile(name=filename, content=self.write().read())
 
-    def children(self):
+    def children(self, skip=0):
+        """
+        Return an iterator of the files inside a ZIP or TAR file, optionally
+        skipping the first files. Files are extracted one at a time as the
+        iterator advances.
+        """
         try:
             # Try for a ZIP file
             zfobj = zipfile.ZipFile(self.file_object)
-            filenames = [
-                filename for filename in zfobj.namelist() if not filename.endswith('/')
-            ]
-            return (
-                SimpleUploadedFile(
-                    name=filename, content=zfobj.read(filename)
-                ) for filename in filenames
-            )
         except zipfile.BadZipfile:
+            pass
+        else:
+            members = (
+                (info.filename, zfobj.open(info)) for info in zfobj.infolist()
+                if not info.filename.endswith('/')
+            )
+            return self._extract_members(members=members, skip=skip)
+
+        self.file_object.seek(0)
+
+        try:
+            # Try for a TAR file, compressed or not
+            tfobj = tarfile.open(fileobj=self.file_object, mode='r:*')
+        except tarfile.TarError:
             raise NotACompressedFile
+        else:
+            members = (
+                (force_text(info.name), tfobj.extractfile(info))
+                for info in tfobj if info.isfile()
+            )
+            return self._extract_members(members=members, skip=skip)
+
+    def _extract_members(self, members, skip):
+        for index, (filename, member_file) in enumerate(members):
+            if index < skip:
+                member_file.close()
+                continue
+
+            file_object = SpooledTemporaryFile(
+                max_size=COMPRESSED_FILE_SPOOL_SIZE
+            )
+            shutil.copyfileobj(member_file, file_object)
+            member_file.close()
+
+            child = File(file=file_object, name=filename)
+            child.size = file_object.tell()
+            file_object.seek(0)
+            yield child
 
     def close(self):
         self.zf.close()
@@ -14,3 +14,21 @@ class NotLatestVersion(BaseCommonException):
     """
     def __init__(self, upstream_version):
         self.upstream_version = upstream_version
+
+
+class UploadSessionError(BaseCommonException):
+    """
+    A chunk or the assembled file of an upload session is not valid
+    """
+    pass
+
+
+class UploadSessionOffsetError(UploadSessionError):
+    """
+    A chunk was sent for an offset other than the session's current offset
+    """
+    def __init__(self, offset):
+        self.offset = offset
+        super(UploadSessionOffsetError, self).__init__(
+            'Upload session is at offset: {}'.format(offset)
+        )
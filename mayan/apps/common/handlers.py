@@ -4,6 +4,8 @@ from django.apps import apps
 from django.conf import settings
 from django.utils import timezone, translation
 
+from .classes import TemplateCache
+
 
 def user_locale_profile_session_config(sender, request, user, **kwargs):
     UserLocaleProfile = apps.get_model(
@@ -43,3 +45,7 @@ def user_locale_profile_create(sender, instance, created, **kwargs):
 
     if created:
         UserLocaleProfile.objects.create(user=instance)
+
+
+def handler_clear_template_cache(sender, **kwargs):
+    TemplateCache.clear()
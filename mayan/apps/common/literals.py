@@ -3,9 +3,13 @@ from __future__ import unicode_literals
 from django.utils.translation import ugettext_lazy as _
 
 
+# Size after which the files extracted from compressed files are stored in
+# a temporary file
+COMPRESSED_FILE_SPOOL_SIZE = 1024 * 1024 * 10  # 10 MB
 DELETE_STALE_UPLOADS_INTERVAL = 60 * 10  # 10 minutes
 MAYAN_PYPI_NAME = 'mayan-edms'
 PYPI_URL = 'https://pypi.python.org/pypi'
+TEMPLATE_CACHE_MAXIMUM_SIZE = 512
 TIME_DELTA_UNIT_DAYS = 'days'
 TIME_DELTA_UNIT_HOURS = 'hours'
 TIME_DELTA_UNIT_MINUTES = 'minutes'
@@ -16,3 +20,5 @@ TIME_DELTA_UNIT_CHOICES = (
     (TIME_DELTA_UNIT_MINUTES, _('Minutes')),
 )
 UPLOAD_EXPIRATION_INTERVAL = 60 * 60 * 24 * 7  # 7 days
+UPLOAD_SESSION_CONTENT_RANGE_REGEX = r'^bytes (\d+)-(\d+)/(\d+|\*)$'
+UPLOAD_SESSION_READ_CHUNK_SIZE = 1024 * 1024
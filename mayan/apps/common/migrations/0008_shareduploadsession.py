@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+import common.models
+import storage.backends.filebasedstorage
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('common', '0007_auto_20170118_1758'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SharedUploadSession',
+            fields=[
+                (
+                    'id', models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID'
+                    )
+                ),
+                (
+                    'uuid', models.UUIDField(
+                        default=uuid.uuid4, editable=False, unique=True
+                    )
+                ),
+                (
+                    'file', models.FileField(
+                        storage=storage.backends.filebasedstorage.FileBasedStorage(),
+                        upload_to=common.models.upload_to,
+                        verbose_name='File'
+                    )
+                ),
+                (
+                    'filename', models.CharField(
+                        max_length=255, verbose_name='Filename'
+                    )
+                ),
+                (
+                    'size', models.BigIntegerField(
+                        help_text='Total size in bytes of the file being '
+                        'uploaded.', verbose_name='Size'
+                    )
+                ),
+                (
+                    'checksum', models.CharField(
+                        blank=True, help_text='Optional SHA256 hex digest of '
+                        'the complete file. Verified before the file is '
+                        'handed off.', max_length=64, verbose_name='Checksum'
+                    )
+                ),
+                (
+                    'offset', models.BigIntegerField(
+                        default=0, help_text='Number of bytes received so '
+                        'far.', verbose_name='Offset'
+                    )
+                ),
+                (
+                    'datetime', models.DateTimeField(
+                        auto_now=True, verbose_name='Date time'
+                    )
+                ),
+                (
+                    'user', models.ForeignKey(
+                        blank=True, null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='upload_sessions',
+                        to=settings.AUTH_USER_MODEL, verbose_name='User'
+                    )
+                ),
+            ],
+            options={
+                'verbose_name': 'Shared upload session',
+                'verbose_name_plural': 'Shared upload sessions',
+            },
+        ),
+    ]
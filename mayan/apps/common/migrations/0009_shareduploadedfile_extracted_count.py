@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-19 10:05
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0008_shareduploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shareduploadedfile',
+            name='extracted_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of files of a compressed file already extracted for upload. Used to resume the extraction after an interruption.', verbose_name='Extracted count'),
+        ),
+    ]
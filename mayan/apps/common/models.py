@@ -1,21 +1,64 @@
 from __future__ import unicode_literals
 
+import hashlib
+import os
+import shutil
 import uuid
 
 from pytz import common_timezones
 
 from django.conf import settings
-from django.db import models
+from django.core.files.base import ContentFile, File
+from django.db import models, transaction
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 
+from .exceptions import UploadSessionError, UploadSessionOffsetError
+from .literals import UPLOAD_SESSION_READ_CHUNK_SIZE
 from .runtime import shared_storage_backend
+from .utils import TemporaryFile, get_storage_file_path
 
 
 def upload_to(instance, filename):
     return 'shared-file-{}'.format(uuid.uuid4().hex)
 
 
+class SharedUploadedFileObject(File):
+    """
+    File object of a shared uploaded file kept as is in the local
+    filesystem. Storages that move temporary files into place instead of
+    copying their content, like the FileSystemStorage, are given a hard
+    link to the shared file. The shared file stays in place for retries of
+    the task using it.
+    """
+    def __init__(self, file, path):
+        super(SharedUploadedFileObject, self).__init__(file=file)
+        self.path = path
+
+    @staticmethod
+    def get_link_path(path):
+        return '{}.{}'.format(path, uuid.uuid4().hex)
+
+    @staticmethod
+    def is_supported(path):
+        """
+        Return whether hard links to the file at path can be created.
+        """
+        link_path = SharedUploadedFileObject.get_link_path(path=path)
+        try:
+            os.link(path, link_path)
+        except OSError:
+            return False
+        else:
+            os.unlink(link_path)
+            return True
+
+    def temporary_file_path(self):
+        link_path = SharedUploadedFileObject.get_link_path(path=self.path)
+        os.link(self.path, link_path)
+        return link_path
+
+
 @python_2_unicode_compatible
 class SharedUploadedFile(models.Model):
     file = models.FileField(
@@ -26,6 +69,12 @@ class SharedUploadedFile(models.Model):
     datetime = models.DateTimeField(
         auto_now_add=True, verbose_name=_('Date time')
     )
+    extracted_count = models.PositiveIntegerField(
+        default=0, help_text=_(
+            'Number of files of a compressed file already extracted for '
+            'upload. Used to resume the extraction after an interruption.'
+        ), verbose_name=_('Extracted count')
+    )
 
     class Meta:
         verbose_name = _('Shared uploaded file')
@@ -43,7 +92,167 @@ class SharedUploadedFile(models.Model):
         return super(SharedUploadedFile, self).delete(*args, **kwargs)
 
     def open(self):
-        return self.file.storage.open(self.file.name)
+        file_object = self.file.storage.open(self.file.name)
+
+        path = get_storage_file_path(
+            storage=self.file.storage, name=self.file.name
+        )
+        if path and SharedUploadedFileObject.is_supported(path=path):
+            return SharedUploadedFileObject(file=file_object.file, path=path)
+        else:
+            # The storage copies the content of the file directly
+            return file_object
+
+
+@python_2_unicode_compatible
+class SharedUploadSession(models.Model):
+    """
+    Assembles a file sent in consecutive chunks directly in the shared
+    storage. The resulting file is handed off as a SharedUploadedFile once
+    all the bytes are received and the checksum verified.
+    """
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, blank=True, null=True,
+        on_delete=models.CASCADE, related_name='upload_sessions',
+        verbose_name=_('User')
+    )
+    file = models.FileField(
+        storage=shared_storage_backend, upload_to=upload_to,
+        verbose_name=_('File')
+    )
+    filename = models.CharField(max_length=255, verbose_name=_('Filename'))
+    size = models.BigIntegerField(
+        help_text=_('Total size in bytes of the file being uploaded.'),
+        verbose_name=_('Size')
+    )
+    checksum = models.CharField(
+        blank=True, help_text=_(
+            'Optional SHA256 hex digest of the complete file. Verified '
+            'before the file is handed off.'
+        ), max_length=64, verbose_name=_('Checksum')
+    )
+    offset = models.BigIntegerField(
+        default=0, help_text=_('Number of bytes received so far.'),
+        verbose_name=_('Offset')
+    )
+    datetime = models.DateTimeField(
+        auto_now=True, verbose_name=_('Date time')
+    )
+
+    class Meta:
+        verbose_name = _('Shared upload session')
+        verbose_name_plural = _('Shared upload sessions')
+
+    def __str__(self):
+        return self.filename
+
+    def append(self, offset, file_object, length):
+        """
+        Write length bytes from file_object at offset. Chunks must be sent
+        in order, a chunk for an offset other than the current one raises
+        UploadSessionOffsetError so the client can resume from the offset
+        the session reports. The chunk is received in a temporary file
+        before locking the session, so that slow clients don't keep the
+        session row locked.
+        """
+        self.refresh_from_db(fields=('offset',))
+        self._check_chunk(offset=offset, length=length)
+
+        with TemporaryFile() as chunk_file:
+            written = 0
+            while written < length:
+                data = file_object.read(
+                    min(UPLOAD_SESSION_READ_CHUNK_SIZE, length - written)
+                )
+                if not data:
+                    break
+                chunk_file.write(data)
+                written += len(data)
+
+            if written != length:
+                raise UploadSessionError(
+                    'Chunk is shorter than its declared length.'
+                )
+
+            chunk_file.seek(0)
+
+            with transaction.atomic():
+                # Lock the session row to serialize concurrent chunks and
+                # check the offset again, it might have advanced while the
+                # chunk was being received.
+                session = SharedUploadSession.objects.select_for_update().get(
+                    pk=self.pk
+                )
+                session._check_chunk(offset=offset, length=length)
+
+                with open(session.file.path, 'r+b') as destination:
+                    destination.seek(offset)
+                    # Discard any leftover from a previous interrupted chunk
+                    destination.truncate()
+                    shutil.copyfileobj(
+                        chunk_file, destination,
+                        UPLOAD_SESSION_READ_CHUNK_SIZE
+                    )
+
+                session.offset = offset + length
+                session.save()
+
+        self.offset = session.offset
+        self.datetime = session.datetime
+
+    def _check_chunk(self, offset, length):
+        if offset != self.offset:
+            raise UploadSessionOffsetError(offset=self.offset)
+
+        if offset + length > self.size:
+            raise UploadSessionError(
+                'Chunk ends past the size of the upload session.'
+            )
+
+    def delete(self, *args, **kwargs):
+        self.file.storage.delete(self.file.name)
+        return super(SharedUploadSession, self).delete(*args, **kwargs)
+
+    def finalize(self):
+        """
+        Verify the assembled file and hand it off as a SharedUploadedFile
+        without copying it. The session is removed afterwards.
+        """
+        if self.offset != self.size:
+            raise UploadSessionError(
+                'Upload session is incomplete; {} of {} bytes received.'.format(
+                    self.offset, self.size
+                )
+            )
+
+        if self.checksum:
+            hash_object = hashlib.sha256()
+            with self.file.storage.open(self.file.name) as file_object:
+                for chunk in iter(lambda: file_object.read(UPLOAD_SESSION_READ_CHUNK_SIZE), b''):
+                    hash_object.update(chunk)
+
+            if hash_object.hexdigest() != self.checksum.lower():
+                raise UploadSessionError(
+                    'Checksum of the uploaded file does not match.'
+                )
+
+        with transaction.atomic():
+            shared_uploaded_file = SharedUploadedFile.objects.create(
+                file=self.file.name
+            )
+            # The file now belongs to the shared uploaded file, skip the
+            # storage cleanup of this class' delete method.
+            super(SharedUploadSession, self).delete()
+
+        return shared_uploaded_file
+
+    def save(self, *args, **kwargs):
+        if not self.pk:
+            # Create the empty file the chunks will be written to
+            self.file.save(self.filename, ContentFile(b''), save=False)
+
+        super(SharedUploadSession, self).save(*args, **kwargs)
 
 
 @python_2_unicode_compatible
@@ -1,11 +1,50 @@
 from __future__ import unicode_literals
 
 from django.contrib.contenttypes.models import ContentType
+from django.utils.translation import ugettext_lazy as _
 
 from rest_framework import serializers
 
+from .models import SharedUploadSession
+from .runtime import shared_storage_backend
+from .utils import get_storage_file_path
+
 
 class ContentTypeSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('app_label', 'id', 'model')
         model = ContentType
+
+
+class SharedUploadSessionSerializer(serializers.HyperlinkedModelSerializer):
+    class Meta:
+        extra_kwargs = {
+            'url': {
+                'lookup_field': 'uuid',
+                'view_name': 'rest_api:shareduploadsession-detail'
+            },
+        }
+        fields = (
+            'checksum', 'datetime', 'filename', 'offset', 'size', 'url',
+            'uuid'
+        )
+        model = SharedUploadSession
+        read_only_fields = ('datetime', 'offset', 'uuid')
+
+    def validate(self, attrs):
+        # Chunks are written in place, which requires a storage that keeps
+        # the files as is in the local filesystem
+        if not get_storage_file_path(storage=shared_storage_backend, name=''):
+            raise serializers.ValidationError(
+                _('The shared storage does not support upload sessions.')
+            )
+
+        return attrs
+
+    def validate_size(self, value):
+        if value < 0:
+            raise serializers.ValidationError(
+                _('Size must be zero or a positive number.')
+            )
+
+        return value
@@ -21,7 +21,15 @@ def task_delete_stale_uploads():
         app_label='common', model_name='SharedUploadedFile'
     )
 
+    SharedUploadSession = apps.get_model(
+        app_label='common', model_name='SharedUploadSession'
+    )
+
     for expired_upload in SharedUploadedFile.objects.filter(datetime__lt=now() - timedelta(seconds=UPLOAD_EXPIRATION_INTERVAL)):
         expired_upload.delete()
 
+    # Sessions expire counting from their last received chunk
+    for expired_session in SharedUploadSession.objects.filter(datetime__lt=now() - timedelta(seconds=UPLOAD_EXPIRATION_INTERVAL)):
+        expired_session.delete()
+
     logger.info('Finshed')
@@ -1,4 +1,6 @@
 from __future__ import unicode_literals
 
+TEST_UPLOAD_SESSION_DATA = b'0123456789'
+TEST_UPLOAD_SESSION_FILENAME = 'test_upload_session.txt'
 TEST_VIEW_NAME = 'test view name'
 TEST_VIEW_URL = 'test-view-url'
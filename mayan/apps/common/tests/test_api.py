@@ -1,11 +1,107 @@
 from __future__ import unicode_literals
 
+from json import loads
+
+from django.contrib.auth import get_user_model
 from django.core.urlresolvers import reverse
 
 from rest_api.tests import BaseAPITestCase
+from user_management.tests.literals import (
+    TEST_ADMIN_EMAIL, TEST_ADMIN_PASSWORD, TEST_ADMIN_USERNAME
+)
+
+from ..models import SharedUploadSession
+
+from .literals import TEST_UPLOAD_SESSION_DATA, TEST_UPLOAD_SESSION_FILENAME
 
 
 class CommonAPITestCase(BaseAPITestCase):
     def test_content_type_list_view(self):
         response = self.client.get(reverse('rest_api:content-type-list'))
         self.assertEqual(response.status_code, 200)
+
+
+class SharedUploadSessionAPITestCase(BaseAPITestCase):
+    def setUp(self):
+        super(SharedUploadSessionAPITestCase, self).setUp()
+        self.admin_user = get_user_model().objects.create_superuser(
+            username=TEST_ADMIN_USERNAME, email=TEST_ADMIN_EMAIL,
+            password=TEST_ADMIN_PASSWORD
+        )
+
+        self.client.login(
+            username=TEST_ADMIN_USERNAME, password=TEST_ADMIN_PASSWORD
+        )
+
+        response = self.client.post(
+            reverse('rest_api:shareduploadsession-list'), {
+                'filename': TEST_UPLOAD_SESSION_FILENAME,
+                'size': len(TEST_UPLOAD_SESSION_DATA)
+            }
+        )
+        self.upload_session = SharedUploadSession.objects.get(
+            uuid=loads(response.content)['uuid']
+        )
+
+    def tearDown(self):
+        for upload_session in SharedUploadSession.objects.all():
+            upload_session.delete()
+
+        self.admin_user.delete()
+        super(SharedUploadSessionAPITestCase, self).tearDown()
+
+    def _put_chunk(self, start, end):
+        return self.client.put(
+            reverse(
+                'rest_api:shareduploadsession-detail',
+                args=(self.upload_session.uuid,)
+            ), TEST_UPLOAD_SESSION_DATA[start:end + 1],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE='bytes {}-{}/{}'.format(
+                start, end, len(TEST_UPLOAD_SESSION_DATA)
+            )
+        )
+
+    def test_upload_session_resume(self):
+        response = self._put_chunk(start=0, end=3)
+        self.assertEqual(response.status_code, 200)
+
+        # Chunk sent again after a lost response
+        response = self._put_chunk(start=0, end=3)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(loads(response.content)['offset'], 4)
+
+        response = self._put_chunk(
+            start=4, end=len(TEST_UPLOAD_SESSION_DATA) - 1
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.upload_session.refresh_from_db()
+        shared_uploaded_file = self.upload_session.finalize()
+
+        with shared_uploaded_file.open() as file_object:
+            self.assertEqual(file_object.read(), TEST_UPLOAD_SESSION_DATA)
+
+        shared_uploaded_file.delete()
+
+    def test_upload_session_chunk_past_size(self):
+        response = self._put_chunk(
+            start=0, end=len(TEST_UPLOAD_SESSION_DATA)
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_upload_session_total_mismatch(self):
+        response = self.client.put(
+            reverse(
+                'rest_api:shareduploadsession-detail',
+                args=(self.upload_session.uuid,)
+            ), TEST_UPLOAD_SESSION_DATA[0:4],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE='bytes 0-3/{}'.format(
+                len(TEST_UPLOAD_SESSION_DATA) + 1
+            )
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.upload_session.refresh_from_db()
+        self.assertEqual(self.upload_session.offset, 0)
@@ -0,0 +1,44 @@
+from __future__ import unicode_literals
+
+import os
+
+import mock
+
+from django.core.files.base import ContentFile
+
+from .base import BaseTestCase
+from ..models import SharedUploadedFile, SharedUploadedFileObject
+
+TEST_CONTENT = b'test content'
+
+
+class SharedUploadedFileTestCase(BaseTestCase):
+    def setUp(self):
+        super(SharedUploadedFileTestCase, self).setUp()
+        self.shared_uploaded_file = SharedUploadedFile.objects.create(
+            file=ContentFile(TEST_CONTENT, name='test_file')
+        )
+
+    def tearDown(self):
+        self.shared_uploaded_file.delete()
+        super(SharedUploadedFileTestCase, self).tearDown()
+
+    def test_open_hard_link(self):
+        with self.shared_uploaded_file.open() as file_object:
+            self.assertTrue(isinstance(file_object, SharedUploadedFileObject))
+
+            link_path = file_object.temporary_file_path()
+            with open(link_path, 'rb') as link_file_object:
+                self.assertEqual(link_file_object.read(), TEST_CONTENT)
+
+            # Moving the link into place keeps the shared file
+            os.unlink(link_path)
+            self.assertTrue(os.path.exists(file_object.path))
+
+    def test_open_without_hard_links(self):
+        with mock.patch('common.models.os.link', side_effect=OSError):
+            with self.shared_uploaded_file.open() as file_object:
+                self.assertFalse(
+                    isinstance(file_object, SharedUploadedFileObject)
+                )
+                self.assertEqual(file_object.read(), TEST_CONTENT)
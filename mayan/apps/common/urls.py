@@ -3,7 +3,10 @@ from __future__ import unicode_literals
 from django.conf.urls import url
 from django.views.i18n import javascript_catalog, set_language
 
-from .api_views import APIContentTypeList
+from .api_views import (
+    APIContentTypeList, APISharedUploadSessionListView,
+    APISharedUploadSessionView
+)
 from .views import (
     AboutView, CheckVersionView, CurrentUserDetailsView, CurrentUserEditView,
     CurrentUserLocaleProfileDetailsView, CurrentUserLocaleProfileEditView,
@@ -74,4 +77,13 @@ api_urls = [
         r'^content_types/$', APIContentTypeList.as_view(),
         name='content-type-list'
     ),
+    url(
+        r'^upload_sessions/$', APISharedUploadSessionListView.as_view(),
+        name='shareduploadsession-list'
+    ),
+    url(
+        r'^upload_sessions/(?P<uuid>[0-9a-f-]+)/$',
+        APISharedUploadSessionView.as_view(),
+        name='shareduploadsession-detail'
+    ),
 ]
@@ -8,6 +8,7 @@ import types
 import xmlrpclib
 
 from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.core.urlresolvers import resolve as django_resolve
 from django.urls.base import get_script_prefix
 from django.utils.datastructures import MultiValueDict
@@ -95,6 +96,25 @@ def get_descriptor(file_input, read=True):
         return file_input
 
 
+def get_storage_file_path(storage, name):
+    """
+    Return the filesystem path of a stored file when the storage keeps the
+    files unmodified in the local filesystem, otherwise return None.
+    """
+    if not isinstance(storage, FileSystemStorage):
+        return None
+
+    for klass in type(storage).__mro__:
+        if klass is FileSystemStorage:
+            break
+
+        if '_open' in klass.__dict__ or '_save' in klass.__dict__:
+            # The storage transforms the content of the files
+            return None
+
+    return storage.path(name)
+
+
 def TemporaryFile(*args, **kwargs):
     kwargs.update({'dir': setting_temporary_directory.value})
     return tempfile.TemporaryFile(*args, **kwargs)
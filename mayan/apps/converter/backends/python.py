@@ -3,6 +3,9 @@ from __future__ import unicode_literals
 import io
 import logging
 import os
+import re
+import shutil
+import time
 
 try:
     from cStringIO import StringIO
@@ -15,10 +18,11 @@ import sh
 
 from django.utils.translation import ugettext_lazy as _
 
-from common.utils import fs_cleanup, mkstemp
+from common.utils import fs_cleanup, mkdtemp, mkstemp
 
 from ..classes import ConverterBase
 from ..exceptions import PageCountError
+from ..literals import DEFAULT_FILE_FORMAT, PDFTOPPM_POLL_INTERVAL
 from ..settings import setting_pdftoppm_path
 
 try:
@@ -31,6 +35,9 @@ else:
 Image.init()
 logger = logging.getLogger(__name__)
 
+PDFTOPPM_OUTPUT_PREFIX = 'page'
+PDFTOPPM_OUTPUT_REGEX = re.compile(r'-(\d+)\.jpg$')
+
 
 class IteratorIO(object):
     def __init__(self, iterator):
@@ -67,6 +74,79 @@ class Python(ConverterBase):
             finally:
                 fs_cleanup(input_filepath)
 
+    def get_pages(self, first_page_number=0, last_page_number=None, output_format=DEFAULT_FILE_FORMAT):
+        if self.mime_type == 'application/pdf' and pdftoppm:
+            return self._get_pdf_pages(
+                first_page_number=first_page_number,
+                last_page_number=last_page_number, output_format=output_format
+            )
+        else:
+            return super(Python, self).get_pages(
+                first_page_number=first_page_number,
+                last_page_number=last_page_number, output_format=output_format
+            )
+
+    def _get_pdf_pages(self, first_page_number, last_page_number, output_format):
+        """
+        Render a range of pages of a PDF file with a single pdftoppm
+        execution. pdftoppm writes each page to its own file, pages are
+        yielded as soon as pdftoppm moves on to the next one.
+        """
+        file_descriptor, input_filepath = mkstemp()
+        self.file_object.seek(0)
+        with os.fdopen(file_descriptor, 'wb') as file_object:
+            shutil.copyfileobj(self.file_object, file_object)
+        self.file_object.seek(0)
+
+        output_directory = mkdtemp()
+
+        kwargs = {'f': first_page_number + 1, '_bg': True}
+        if last_page_number is not None:
+            kwargs['l'] = last_page_number + 1
+
+        process = None
+        try:
+            process = pdftoppm(
+                input_filepath, os.path.join(
+                    output_directory, PDFTOPPM_OUTPUT_PREFIX
+                ), **kwargs
+            )
+
+            while True:
+                is_running = process.process.is_alive()[0]
+
+                filenames = sorted(
+                    os.listdir(output_directory), key=lambda filename: int(
+                        PDFTOPPM_OUTPUT_REGEX.search(filename).group(1)
+                    )
+                )
+
+                if is_running:
+                    # The last file could still be being written
+                    filenames = filenames[:-1]
+
+                for filename in filenames:
+                    filepath = os.path.join(output_directory, filename)
+                    self.image = Image.open(filepath)
+                    self.image.load()
+                    fs_cleanup(filepath)
+
+                    yield int(
+                        PDFTOPPM_OUTPUT_REGEX.search(filename).group(1)
+                    ) - 1, self.get_page(output_format=output_format)
+
+                if not is_running:
+                    process.wait()
+                    break
+
+                time.sleep(PDFTOPPM_POLL_INTERVAL)
+        finally:
+            if process and process.process.is_alive()[0]:
+                process.process.kill()
+
+            fs_cleanup(input_filepath)
+            fs_cleanup(output_directory)
+
     def get_page_count(self):
         super(Python, self).get_page_count()
 
@@ -86,7 +86,7 @@ class ConverterBase(object):
         self.file_object = file_object
         self.image = None
         self.mime_type = mime_type or get_mimetype(
-            file_object=file_object, mimetype_only=False
+            file_object=file_object, mimetype_only=True
         )[0]
         self.soffice_file = None
 
@@ -195,6 +195,20 @@ class ConverterBase(object):
     def convert(self, page_number=DEFAULT_PAGE_NUMBER):
         self.page_number = page_number
 
+    def get_pages(self, first_page_number=0, last_page_number=None, output_format=DEFAULT_FILE_FORMAT):
+        """
+        Generator that renders a range of pages and yields a tuple of the
+        page number (starting with #0) and the page image for each one.
+        Backends can override this method to render all the pages of the
+        range in a single pass.
+        """
+        if last_page_number is None:
+            last_page_number = self.get_page_count() - 1
+
+        for page_number in range(first_page_number, last_page_number + 1):
+            self.seek(page_number=page_number)
+            yield page_number, self.get_page(output_format=output_format)
+
     def transform(self, transformation):
         if not self.image:
             self.seek(0)
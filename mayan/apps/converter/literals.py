@@ -6,3 +6,5 @@ DEFAULT_PAGE_NUMBER = 1
 DEFAULT_FILE_FORMAT = 'JPEG'
 
 DIMENSION_SEPARATOR = 'x'
+
+PDFTOPPM_POLL_INTERVAL = 0.1
@@ -0,0 +1,74 @@
+from __future__ import unicode_literals
+
+import os
+import unittest
+
+import mock
+
+from django.test import TestCase
+
+from common.utils import mkdtemp
+from documents.tests import TEST_DOCUMENT_PATH
+
+from ..backends.python import Python, pdftoppm
+
+
+@unittest.skipUnless(pdftoppm, 'pdftoppm not installed')
+class PythonBackendPDFPagesTestCase(TestCase):
+    def setUp(self):
+        self.file_object = open(TEST_DOCUMENT_PATH, 'rb')
+        self.converter = Python(
+            file_object=self.file_object, mime_type='application/pdf'
+        )
+        self.output_directories = []
+
+    def tearDown(self):
+        self.file_object.close()
+
+    def _mkdtemp(self):
+        output_directory = mkdtemp()
+        self.output_directories.append(output_directory)
+        return output_directory
+
+    def test_get_pages(self):
+        page_count = self.converter.get_page_count()
+
+        with mock.patch('converter.backends.python.mkdtemp', self._mkdtemp):
+            pages = list(self.converter.get_pages())
+
+        self.assertEqual(
+            [page_number for page_number, page_image in pages],
+            list(range(page_count))
+        )
+        for page_number, page_image in pages:
+            self.converter.seek(page_number=page_number)
+            self.assertEqual(
+                page_image.getvalue(), self.converter.get_page().getvalue()
+            )
+
+        self.assertFalse(os.path.exists(self.output_directories[0]))
+
+    def test_get_pages_range(self):
+        page_count = self.converter.get_page_count()
+
+        pages = list(
+            self.converter.get_pages(
+                first_page_number=1, last_page_number=page_count - 1
+            )
+        )
+
+        self.assertEqual(
+            [page_number for page_number, page_image in pages],
+            list(range(1, page_count))
+        )
+
+    def test_get_pages_closed(self):
+        # Stop reading the pages while pdftoppm could still be rendering
+        # the rest in the background.
+        with mock.patch('converter.backends.python.mkdtemp', self._mkdtemp):
+            pages = self.converter.get_pages()
+            page_number, page_image = next(pages)
+            pages.close()
+
+        self.assertEqual(page_number, 0)
+        self.assertFalse(os.path.exists(self.output_directories[0]))
@@ -14,8 +14,12 @@ from common import (
     MayanAppConfig, menu_facet, menu_main, menu_object, menu_secondary,
     menu_setup, menu_tools
 )
+from common.handlers import handler_clear_template_cache
 from common.widgets import two_state_template
-from documents.signals import post_document_created, post_initial_document_type
+from documents.signals import (
+    post_document_created, post_document_created_bulk,
+    post_initial_document_type
+)
 from mayan.celery import app
 from navigation import SourceColumn
 from rest_api.classes import APIEndPoint
@@ -23,7 +27,7 @@ from rest_api.classes import APIEndPoint
 from .handlers import (
     create_default_document_index, document_metadata_index_update,
     document_metadata_index_post_delete, handler_delete_empty,
-    handler_index_document, handler_remove_document
+    handler_index_document, handler_index_documents, handler_remove_document
 )
 from .links import (
     link_document_index_list, link_index_main_menu, link_index_setup,
@@ -154,6 +158,9 @@ class DocumentIndexingApp(MayanAppConfig):
                 'document_indexing.tasks.task_index_document': {
                     'queue': 'indexing'
                 },
+                'document_indexing.tasks.task_index_documents': {
+                    'queue': 'indexing'
+                },
                 'document_indexing.tasks.task_rebuild_index': {
                     'queue': 'tools'
                 },
@@ -204,6 +211,10 @@ class DocumentIndexingApp(MayanAppConfig):
             handler_index_document,
             dispatch_uid='handler_index_document', sender=Document
         )
+        post_document_created_bulk.connect(
+            handler_index_documents,
+            dispatch_uid='handler_index_documents', sender=Document
+        )
         post_initial_document_type.connect(
             create_default_document_index,
             dispatch_uid='create_default_document_index', sender=DocumentType
@@ -213,3 +224,14 @@ class DocumentIndexingApp(MayanAppConfig):
             dispatch_uid='document_metadata_index_update',
             sender=DocumentMetadata
         )
+
+        post_delete.connect(
+            handler_clear_template_cache,
+            dispatch_uid='document_indexing_handler_clear_template_cache_index_template_node_delete',
+            sender=IndexTemplateNode
+        )
+        post_save.connect(
+            handler_clear_template_cache,
+            dispatch_uid='document_indexing_handler_clear_template_cache_index_template_node_save',
+            sender=IndexTemplateNode
+        )
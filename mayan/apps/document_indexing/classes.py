@@ -0,0 +1,61 @@
+from __future__ import unicode_literals
+
+
+class IndexRebuildNode(object):
+    """
+    In memory index instance node used to compute the complete tree of an
+    index before writing it to the database.
+    """
+    def __init__(self, index_template_node_id=None, value='', level=0, parent=None):
+        self.children = {}
+        self.document_ids = set()
+        self.index_template_node_id = index_template_node_id
+        self.left = None
+        self.level = level
+        self.parent = parent
+        self.right = None
+        self.value = value
+
+    def get_child(self, index_template_node, value):
+        key = (index_template_node.pk, value)
+        try:
+            return self.children[key]
+        except KeyError:
+            child = IndexRebuildNode(
+                index_template_node_id=index_template_node.pk, value=value,
+                level=self.level + 1, parent=self
+            )
+            self.children[key] = child
+            return child
+
+    def get_levels(self):
+        """
+        Return the nodes of the tree grouped by level, starting with the
+        children of this node.
+        """
+        levels = []
+        nodes = [self]
+        while True:
+            nodes = [
+                child for node in nodes for child in node.get_sorted_children()
+            ]
+            if not nodes:
+                return levels
+
+            levels.append(nodes)
+
+    def get_sorted_children(self):
+        return [self.children[key] for key in sorted(self.children)]
+
+    def update_tree_values(self, left=1):
+        """
+        Assign the nested set left and right values of this node and of its
+        descendants, return the next free left value.
+        """
+        self.left = left
+        right = left + 1
+        for child in self.get_sorted_children():
+            right = child.update_tree_values(left=right)
+
+        self.right = right
+        return right + 1
@@ -4,7 +4,8 @@ from django.apps import apps
 from django.utils.translation import ugettext_lazy as _
 
 from .tasks import (
-    task_delete_empty, task_index_document, task_remove_document
+    task_delete_empty, task_index_document, task_index_documents,
+    task_remove_document
 )
 
 
@@ -43,6 +44,14 @@ def handler_index_document(sender, **kwargs):
     )
 
 
+def handler_index_documents(sender, **kwargs):
+    task_index_documents.apply_async(
+        kwargs=dict(
+            document_ids=[instance.pk for instance in kwargs['instances']]
+        )
+    )
+
+
 def handler_remove_document(sender, **kwargs):
     task_remove_document.apply_async(
         kwargs=dict(document_id=kwargs['instance'].pk)
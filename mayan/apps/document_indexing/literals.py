@@ -1 +1,6 @@
 RETRY_DELAY = 5  # TODO: convert this into a config option
+INDEX_LOCK_WAIT_INTERVAL = 0.05
+INDEX_LOCK_WAIT_TIMEOUT = 10
+INDEX_REBUILD_BATCH_SIZE = 1000
+INDEX_REBUILD_LOCK_TIMEOUT = 60 * 60
+INDEX_REBUILD_PREFETCH_RELATED = ('metadata__metadata_type',)
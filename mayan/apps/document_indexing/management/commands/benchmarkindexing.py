@@ -0,0 +1,84 @@
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from documents.models import Document
+
+from ...models import Index, IndexInstanceNode
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the indexing throughput of an index using different '
+        'numbers of concurrent workers. The index instance nodes are '
+        'deleted before each run, rebuild the index afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug', help='Slug of the index to benchmark.')
+        parser.add_argument(
+            '--documents', default=1000, dest='documents', type=int,
+            help='Maximum number of documents to index on each run.'
+        )
+        parser.add_argument(
+            '--workers', default='1,2,4,8', dest='workers',
+            help='Comma separated list of worker counts to measure.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            index = Index.objects.get(slug=options['slug'])
+        except Index.DoesNotExist:
+            raise CommandError('Unknown index: {}'.format(options['slug']))
+
+        document_ids = list(
+            Document.objects.filter(
+                document_type__in=index.document_types.all()
+            ).values_list('pk', flat=True)[:options['documents']]
+        )
+
+        if not document_ids:
+            raise CommandError('The index has no documents.')
+
+        for workers in [int(value) for value in options['workers'].split(',')]:
+            try:
+                index.instance_root.delete()
+            except IndexInstanceNode.DoesNotExist:
+                pass
+
+            threads = [
+                threading.Thread(
+                    target=self.index_documents, kwargs={
+                        'document_ids': document_ids[worker::workers],
+                        'index': index
+                    }
+                ) for worker in range(workers)
+            ]
+
+            start = time.time()
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+            elapsed = time.time() - start
+
+            self.stdout.write(
+                '{} workers: {} documents in {:.2f} seconds, {:.2f} '
+                'documents per second'.format(
+                    workers, len(document_ids), elapsed,
+                    len(document_ids) / elapsed
+                )
+            )
+
+    def index_documents(self, index, document_ids):
+        try:
+            for document in Document.objects.filter(pk__in=document_ids):
+                index.index_document(document=document)
+        finally:
+            connection.close()
@@ -13,6 +13,26 @@ class IndexManager(models.Manager):
         for index in self.filter(enabled=True, document_types=document.document_type):
             index.index_document(document=document)
 
+    def index_documents(self, documents):
+        """
+        Index several documents, looking up the indexes of each document type
+        only once.
+        """
+        document_type_indexes = {}
+
+        for document in documents:
+            try:
+                indexes = document_type_indexes[document.document_type_id]
+            except KeyError:
+                indexes = document_type_indexes[document.document_type_id] = list(
+                    self.filter(
+                        enabled=True, document_types=document.document_type_id
+                    )
+                )
+
+            for index in indexes:
+                index.index_document(document=document)
+
     def get_by_natural_key(self, name):
         return self.get(name=name)
 
@@ -1,10 +1,11 @@
 from __future__ import absolute_import, unicode_literals
 
 import logging
+import time
 
 from django.core.urlresolvers import reverse
 from django.db import models, transaction
-from django.template import Context, Template
+from django.template import Context
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext, ugettext_lazy as _
 
@@ -12,10 +13,18 @@ from mptt.fields import TreeForeignKey
 from mptt.models import MPTTModel
 
 from acls.models import AccessControlList
+from common.classes import TemplateCache
 from documents.models import Document, DocumentType
 from documents.permissions import permission_document_view
+from lock_manager import LockError
 from lock_manager.runtime import locking_backend
 
+from .classes import IndexRebuildNode
+from .literals import (
+    INDEX_LOCK_WAIT_INTERVAL, INDEX_LOCK_WAIT_TIMEOUT,
+    INDEX_REBUILD_BATCH_SIZE, INDEX_REBUILD_LOCK_TIMEOUT,
+    INDEX_REBUILD_PREFETCH_RELATED
+)
 from .managers import (
     DocumentIndexInstanceNodeManager, IndexManager, IndexInstanceNodeManager
 )
@@ -85,33 +94,319 @@ class Index(models.Model):
             ] or ['None']
         )
 
+    def acquire_lock(self, timeout=None):
+        """
+        Acquire the lock protecting the structure of the instance node tree
+        of this index. Creating or deleting instance nodes updates the MPTT
+        values of the whole tree and is not safe to do concurrently.
+        """
+        return self._acquire_lock(
+            name='indexing:indexing_template_node_{}'.format(
+                self.template_root.pk
+            ), timeout=timeout
+        )
+
+    def _acquire_lock(self, name, timeout=None):
+        # Wait for the lock for a short time instead of failing right away,
+        # the sections it protects are brief.
+        start = time.time()
+        while True:
+            try:
+                return locking_backend.acquire_lock(name=name, timeout=timeout)
+            except LockError:
+                if time.time() - start > INDEX_LOCK_WAIT_TIMEOUT:
+                    raise
+
+                time.sleep(INDEX_LOCK_WAIT_INTERVAL)
+
+    def get_template_nodes(self, template_root):
+        """
+        Return the enabled template nodes of this index grouped by their
+        parent and their compiled expressions.
+        """
+        template_children = {}
+        templates = {}
+        for index_template_node in template_root.get_descendants():
+            template_children.setdefault(
+                index_template_node.parent_id, []
+            ).append(index_template_node)
+            if index_template_node.enabled:
+                try:
+                    templates[index_template_node.pk] = TemplateCache.get(
+                        index_template_node.expression
+                    )
+                except Exception as exception:
+                    logger.debug(
+                        'Error compiling expression: %s; %s',
+                        index_template_node.expression, exception
+                    )
+
+        return template_children, templates
+
     def index_document(self, document):
+        """
+        Update the instance nodes of this index for a document. The
+        evaluation of the template nodes and the addition or removal of the
+        document from existing instance nodes don't lock the index, allowing
+        documents to be indexed in parallel. The index is locked only when
+        instance nodes have to be created or deleted.
+        """
         logger.debug('Index; Indexing document: %s', document)
-        self.template_root.index_document(document=document)
+
+        template_root = self.template_root
+        template_children, templates = self.get_template_nodes(
+            template_root=template_root
+        )
+
+        tree = IndexRebuildNode()
+        self._evaluate_template_children(
+            context=Context({'document': document}), document=document,
+            node=tree, template_children=template_children,
+            template_node=template_root, templates=templates
+        )
+
+        # Serialize the indexing of the same document in this index.
+        document_lock = self._acquire_lock(
+            name='indexing:index_{}_document_{}'.format(self.pk, document.pk)
+        )
+
+        try:
+            removed_node_pks = self._update_document_nodes(
+                document=document, template_root=template_root, tree=tree
+            )
+
+            if removed_node_pks is None or removed_node_pks:
+                lock = self.acquire_lock()
+
+                # Start transaction after the lock in case the locking
+                # backend uses the database.
+                try:
+                    with transaction.atomic():
+                        if removed_node_pks is None:
+                            removed_node_pks = self._update_document_nodes(
+                                create=True, document=document,
+                                template_root=template_root, tree=tree
+                            )
+
+                        for index_instance_node in IndexInstanceNode.objects.filter(pk__in=removed_node_pks or ()):
+                            index_instance_node.delete_empty(
+                                acquire_lock=False
+                            )
+                finally:
+                    lock.release()
+        finally:
+            document_lock.release()
+
+    def _update_document_nodes(self, document, template_root, tree, create=False):
+        """
+        Link the document to the instance nodes of the evaluated tree and
+        unlink it from the others. Return the primary keys of the instance
+        nodes the document was removed from or None if instance nodes need
+        to be created and create is False.
+        """
+        try:
+            instance_root = template_root.index_instance_nodes.get()
+        except IndexInstanceNode.DoesNotExist:
+            if not create:
+                return None
+
+            instance_root = template_root.index_instance_nodes.create()
+
+        node_pks = set()
+        nodes = [(tree, instance_root)]
+        while nodes:
+            node, index_instance_node = nodes.pop()
+            for child in node.get_sorted_children():
+                child_instance_node = IndexInstanceNode.objects.filter(
+                    index_template_node_id=child.index_template_node_id,
+                    parent=index_instance_node, value=child.value
+                ).first()
+
+                if not child_instance_node:
+                    if not create:
+                        return None
+
+                    child_instance_node = IndexInstanceNode.objects.create(
+                        index_template_node_id=child.index_template_node_id,
+                        parent=index_instance_node, value=child.value
+                    )
+
+                if child.document_ids:
+                    node_pks.add(child_instance_node.pk)
+
+                nodes.append((child, child_instance_node))
+
+        with transaction.atomic():
+            # Lock the rows of the instance nodes to be linked so that they
+            # can't be deleted as empty before the links are committed.
+            if IndexInstanceNode.objects.select_for_update().filter(pk__in=node_pks).count() != len(node_pks):
+                # Deleted after they were found
+                return None
+
+            current_node_pks = set(
+                IndexInstanceNode.objects.filter(
+                    documents=document, index_template_node__index=self
+                ).values_list('pk', flat=True)
+            )
+
+            DocumentThrough = IndexInstanceNode.documents.through
+
+            removed_node_pks = current_node_pks - node_pks
+            DocumentThrough.objects.filter(
+                document_id=document.pk,
+                indexinstancenode_id__in=removed_node_pks
+            ).delete()
+
+            DocumentThrough.objects.bulk_create(
+                [
+                    DocumentThrough(
+                        document_id=document.pk, indexinstancenode_id=pk
+                    ) for pk in node_pks - current_node_pks
+                ]
+            )
+
+        return removed_node_pks
 
     def rebuild(self):
         """
         Delete and reconstruct the index by deleting of all its instance nodes
         and recreating them for the documents whose types are associated with
-        this index
+        this index. The instance node tree is computed in memory evaluating
+        the documents in batches and then written using bulk inserts.
         """
-        # Delete all index instance nodes by deleting the root index
-        # instance node. All child index instance nodes will be cascade
-        # deleted.
+        template_root = self.template_root
+
+        # Don't allow documents to be indexed individually while the
+        # index is rebuilt.
+        lock = self.acquire_lock(timeout=INDEX_REBUILD_LOCK_TIMEOUT)
+
         try:
-            self.instance_root.delete()
-        except IndexInstanceNode.DoesNotExist:
-            # Empty index, ignore this exception
-            pass
+            with transaction.atomic():
+                # Delete all index instance nodes by deleting the root index
+                # instance node. All child index instance nodes will be
+                # cascade deleted.
+                try:
+                    self.instance_root.delete()
+                except IndexInstanceNode.DoesNotExist:
+                    # Empty index, ignore this exception
+                    pass
+
+                # Create the new root index instance node
+                instance_root = template_root.index_instance_nodes.create()
+
+                tree = self.get_rebuild_tree(template_root=template_root)
+                self.save_rebuild_tree(instance_root=instance_root, tree=tree)
+        finally:
+            lock.release()
+
+    def get_rebuild_tree(self, template_root):
+        """
+        Evaluate the template nodes of this index for all its documents and
+        return the resulting instance node tree without saving it.
+        """
+        # Get the compiled expression of each enabled template node once
+        template_children, templates = self.get_template_nodes(
+            template_root=template_root
+        )
+
+        tree = IndexRebuildNode()
+
+        document_ids = list(
+            Document.objects.filter(
+                document_type__in=self.document_types.all()
+            ).order_by('pk').values_list('pk', flat=True)
+        )
+
+        for start in range(0, len(document_ids), INDEX_REBUILD_BATCH_SIZE):
+            queryset = Document.objects.filter(
+                pk__in=document_ids[start:start + INDEX_REBUILD_BATCH_SIZE]
+            ).select_related('document_type').prefetch_related(
+                *INDEX_REBUILD_PREFETCH_RELATED
+            )
 
-        # Create the new root index instance node
-        self.template_root.index_instance_nodes.create()
+            for document in queryset:
+                self._evaluate_template_children(
+                    context=Context({'document': document}),
+                    document=document, node=tree,
+                    template_children=template_children,
+                    template_node=template_root, templates=templates
+                )
 
-        # Re-index each document with a type associated with this index
-        for document in Document.objects.filter(document_type__in=self.document_types.all()):
-            # Evaluate each index template node for each document
-            # associated with this index.
-            self.index_document(document=document)
+        return tree
+
+    def _evaluate_template_children(self, context, document, node, template_children, template_node, templates):
+        for child in template_children.get(template_node.pk, ()):
+            try:
+                template = templates[child.pk]
+            except KeyError:
+                # Disabled template node or invalid expression
+                continue
+
+            try:
+                result = template.render(context=context)
+            except Exception as exception:
+                logger.debug(
+                    'Error indexing document: %s; expression: %s; %s',
+                    document, child.expression, exception
+                )
+            else:
+                if result:
+                    child_node = node.get_child(
+                        index_template_node=child, value=result
+                    )
+                    if child.link_documents:
+                        child_node.document_ids.add(document.pk)
+
+                    self._evaluate_template_children(
+                        context=context, document=document, node=child_node,
+                        template_children=template_children,
+                        template_node=child, templates=templates
+                    )
+
+    def save_rebuild_tree(self, instance_root, tree):
+        """
+        Write the instance node tree computed by get_rebuild_tree under the
+        root instance node, one level at a time, with the MPTT values
+        already calculated.
+        """
+        tree.update_tree_values(left=instance_root.lft)
+        IndexInstanceNode.objects.filter(pk=instance_root.pk).update(
+            rght=tree.right
+        )
+
+        DocumentThrough = IndexInstanceNode.documents.through
+
+        # The left value of a node is unique in its tree and is used to
+        # find the primary key of the parent of the nodes of the next level.
+        parent_pks = {tree.left: instance_root.pk}
+
+        for level, nodes in enumerate(tree.get_levels(), 1):
+            IndexInstanceNode.objects.bulk_create(
+                [
+                    IndexInstanceNode(
+                        index_template_node_id=node.index_template_node_id,
+                        level=node.level, lft=node.left,
+                        parent_id=parent_pks[node.parent.left],
+                        rght=node.right, tree_id=instance_root.tree_id,
+                        value=node.value
+                    ) for node in nodes
+                ], batch_size=INDEX_REBUILD_BATCH_SIZE
+            )
+
+            parent_pks = dict(
+                IndexInstanceNode.objects.filter(
+                    level=level, tree_id=instance_root.tree_id
+                ).values_list('lft', 'pk')
+            )
+
+            DocumentThrough.objects.bulk_create(
+                [
+                    DocumentThrough(
+                        document_id=document_id,
+                        indexinstancenode_id=parent_pks[node.left]
+                    ) for node in nodes for document_id in node.document_ids
+                ], batch_size=INDEX_REBUILD_BATCH_SIZE
+            )
 
     class Meta:
         verbose_name = _('Index')
@@ -179,84 +474,6 @@ class IndexTemplateNode(MPTTModel):
         else:
             return self.expression
 
-    def index_document(self, document, acquire_lock=True):
-        # Avoid another process to index this same document for the same
-        # template node. This prevents this template node's index instance
-        # nodes from being deleted while the template is evaluated and
-        # documents added to it.
-        if acquire_lock:
-            lock = locking_backend.acquire_lock(
-                'indexing:indexing_template_node_{}'.format(self.pk)
-            )
-
-        # Start transaction after the lock in case the locking backend uses
-        # the database.
-        with transaction.atomic():
-            logger.debug('IndexTemplateNode; Indexing document: %s', document)
-
-            logger.debug(
-                'Removing document "%s" from all index instance nodes',
-                document
-            )
-            for index_template_node in self.index_instance_nodes.all():
-                index_template_node.remove_document(
-                    document=document, acquire_lock=False
-                )
-
-            if not self.parent:
-                logger.debug(
-                    'IndexTemplateNode; parent: creating empty root index '
-                    'instance node'
-                )
-                index_instance_node, created = self.index_instance_nodes.get_or_create()
-
-                for child in self.get_children():
-                    child.index_document(document=document, acquire_lock=False)
-
-                if acquire_lock:
-                    lock.release()
-
-            elif self.enabled:
-                logger.debug('IndexTemplateNode; non parent: evaluating')
-                logger.debug('My parent is: %s', self.parent)
-                logger.debug(
-                    'My parent nodes: %s', self.parent.index_instance_nodes.all()
-                )
-                logger.debug(
-                    'IndexTemplateNode; Evaluating template: %s', self.expression
-                )
-
-                try:
-                    context = Context({'document': document})
-                    template = Template(self.expression)
-                    result = template.render(context=context)
-                except Exception as exception:
-                    logger.debug('Evaluating error: %s', exception)
-                    error_message = _(
-                        'Error indexing document: %(document)s; expression: '
-                        '%(expression)s; %(exception)s'
-                    ) % {
-                        'document': document,
-                        'expression': self.expression,
-                        'exception': exception
-                    }
-                    logger.debug(error_message)
-                else:
-                    logger.debug('Evaluation result: %s', result)
-                    if result:
-                        index_instance_node, created = self.index_instance_nodes.get_or_create(
-                            parent=self.parent.index_instance_nodes.get(),
-                            value=result
-                        )
-                        if self.link_documents:
-                            index_instance_node.documents.add(document)
-
-                    for child in self.get_children():
-                        child.index_document(document=document, acquire_lock=False)
-                finally:
-                    if acquire_lock:
-                        lock.release()
-
     class Meta:
         verbose_name = _('Index node template')
         verbose_name_plural = _('Indexes node template')
@@ -320,21 +537,24 @@ class IndexInstanceNode(MPTTModel):
         or not to acquire when called as part of a larger index process
         that already has a lock
         """
-        # Prevent another process to work on this node. We use the node's
-        # parent template node for the lock
+        # Prevent another process from changing the structure of the index
         if acquire_lock:
-            lock = locking_backend.acquire_lock(
-                'indexing:indexing_template_node_{}'.format(
-                    self.index_template_node.pk
-                )
-            )
+            lock = self.index_template_node.index.acquire_lock()
         # Start transaction after the lock in case the locking backend uses
         # the database.
         with transaction.atomic():
-            if self.documents.count() == 0 and self.get_children().count() == 0:
-                if self.parent:
-                    self.delete()
-                    self.parent.delete_empty(acquire_lock=False)
+            # Reload and lock the row, the node might have changed or
+            # a document might be being linked to it without the index lock.
+            instance_node = IndexInstanceNode.objects.select_for_update().filter(
+                pk=self.pk
+            ).first()
+
+            if instance_node and instance_node.parent_id:
+                if not instance_node.documents.exists() and not IndexInstanceNode.objects.filter(parent=instance_node).exists():
+                    instance_node.delete()
+                    IndexInstanceNode.objects.get(
+                        pk=instance_node.parent_id
+                    ).delete_empty(acquire_lock=False)
             if acquire_lock:
                 lock.release()
 
@@ -345,14 +565,9 @@ class IndexInstanceNode(MPTTModel):
         or not to acquire when called as part of a larger index process
         that already has a lock
         """
-        # Prevent another process to work on this node. We use the node's
-        # parent template node for the lock
+        # Prevent another process from changing the structure of the index
         if acquire_lock:
-            lock = locking_backend.acquire_lock(
-                'indexing:indexing_template_node_{}'.format(
-                    self.index_template_node.pk
-                )
-            )
+            lock = self.index_template_node.index.acquire_lock()
         self.documents.remove(document)
         self.delete_empty(acquire_lock=False)
 
@@ -8,7 +8,7 @@ from django.db import OperationalError
 from mayan.celery import app
 from lock_manager import LockError
 
-from .literals import RETRY_DELAY
+from .literals import INDEX_REBUILD_PREFETCH_RELATED, RETRY_DELAY
 
 logger = logging.getLogger(__name__)
 
@@ -90,3 +90,33 @@ def task_rebuild_index(self, index_id):
     except LockError as exception:
         # This index is being rebuilt by another task, retry later
         raise self.retry(exc=exception)
+
+
+@app.task(bind=True, default_retry_delay=RETRY_DELAY, max_retries=None, ignore_result=True)
+def task_index_documents(self, document_ids):
+    Document = apps.get_model(
+        app_label='documents', model_name='Document'
+    )
+    Index = apps.get_model(
+        app_label='document_indexing', model_name='Index'
+    )
+
+    # Documents deleted before we could execute are skipped by the query
+    documents = Document.objects.filter(pk__in=document_ids).select_related(
+        'document_type'
+    ).prefetch_related(*INDEX_REBUILD_PREFETCH_RELATED)
+
+    try:
+        Index.objects.index_documents(documents=documents)
+    except OperationalError as exception:
+        logger.warning(
+            'Operational error while trying to index documents: '
+            '%s; %s', document_ids, exception
+        )
+        raise self.retry(exc=exception)
+    except LockError as exception:
+        logger.warning(
+            'Unable to acquire lock for documents %s; %s ',
+            document_ids, exception
+        )
+        raise self.retry(exc=exception)
@@ -169,3 +169,134 @@ class IndexTestCase(BaseTestCase):
         self.assertQuerysetEqual(
             instance_node.documents.all(), [repr(self.document)]
         )
+
+    def test_rebuild_nested_index(self):
+        metadata_type = MetadataType.objects.create(
+            name=TEST_METADATA_TYPE_NAME, label=TEST_METADATA_TYPE_LABEL
+        )
+        DocumentTypeMetadataType.objects.create(
+            document_type=self.document_type, metadata_type=metadata_type
+        )
+
+        with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
+            document_2 = self.document_type.new_document(
+                file_object=file_object
+            )
+
+        self.document.metadata.create(
+            metadata_type=metadata_type, value='0001'
+        )
+        document_2.metadata.create(metadata_type=metadata_type, value='0002')
+
+        index = Index.objects.create(label=TEST_INDEX_LABEL)
+        index.document_types.add(self.document_type)
+        level_1 = index.node_templates.create(
+            parent=index.template_root,
+            expression=TEST_INDEX_TEMPLATE_METADATA_EXPRESSION
+        )
+        index.node_templates.create(
+            parent=level_1, expression='{{ document.label }}',
+            link_documents=True
+        )
+
+        index.rebuild()
+
+        instance_root = index.instance_root
+        self.assertEqual(
+            [
+                (node.level, node.value) for node in instance_root.get_descendants()
+            ], [
+                (1, '0001'), (2, self.document.label),
+                (1, '0002'), (2, document_2.label)
+            ]
+        )
+        self.assertQuerysetEqual(
+            IndexInstanceNode.objects.get(
+                parent__value='0002'
+            ).documents.all(), [repr(document_2)]
+        )
+
+        # The tree values written by the rebuild must match those
+        # calculated by MPTT
+        tree_values = list(
+            IndexInstanceNode.objects.values_list('pk', 'lft', 'rght', 'level')
+        )
+        IndexInstanceNode._tree_manager.partial_rebuild(instance_root.tree_id)
+        self.assertEqual(
+            list(
+                IndexInstanceNode.objects.values_list(
+                    'pk', 'lft', 'rght', 'level'
+                )
+            ), tree_values
+        )
+
+        index.delete()
+
+    def test_nested_index_concurrent_documents(self):
+        metadata_type = MetadataType.objects.create(
+            name=TEST_METADATA_TYPE_NAME, label=TEST_METADATA_TYPE_LABEL
+        )
+        DocumentTypeMetadataType.objects.create(
+            document_type=self.document_type, metadata_type=metadata_type
+        )
+
+        with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
+            document_2 = self.document_type.new_document(
+                file_object=file_object
+            )
+
+        index = Index.objects.create(label=TEST_INDEX_LABEL)
+        index.document_types.add(self.document_type)
+        level_1 = index.node_templates.create(
+            parent=index.template_root,
+            expression=TEST_INDEX_TEMPLATE_METADATA_EXPRESSION
+        )
+        index.node_templates.create(
+            parent=level_1, expression='{{ document.label }}',
+            link_documents=True
+        )
+
+        self.document.metadata.create(
+            metadata_type=metadata_type, value='0001'
+        )
+
+        # Documents are added to existing instance nodes without locking
+        # the index.
+        lock = index.acquire_lock()
+        try:
+            document_2.metadata.create(
+                metadata_type=metadata_type, value='0001'
+            )
+        finally:
+            lock.release()
+
+        self.assertQuerysetEqual(
+            IndexInstanceNode.objects.get(
+                parent__value='0001'
+            ).documents.order_by('pk'), [repr(self.document), repr(document_2)]
+        )
+
+        document_metadata = document_2.metadata.get(
+            metadata_type=metadata_type
+        )
+        document_metadata.value = '0002'
+        document_metadata.save()
+
+        self.assertEqual(
+            [
+                (node.level, node.value) for node in index.instance_root.get_descendants()
+            ], [
+                (1, '0001'), (2, self.document.label),
+                (1, '0002'), (2, document_2.label)
+            ]
+        )
+
+        document_metadata.delete()
+
+        self.assertEqual(
+            [
+                (node.level, node.value) for node in index.instance_root.get_descendants()
+            ], [(1, '0001'), (2, self.document.label)]
+        )
+
+        index.delete()
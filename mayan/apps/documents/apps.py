@@ -31,7 +31,10 @@ from rest_api.classes import APIEndPoint
 from rest_api.fields import DynamicSerializerField
 from statistics.classes import StatisticNamespace, CharJSLine
 
-from .handlers import create_default_document_type
+from .handlers import (
+    create_default_document_type, handler_generate_page_images,
+    handler_generate_page_images_bulk
+)
 from .links import (
     link_clear_image_cache, link_document_clear_transformations,
     link_document_clone_transformations, link_document_delete,
@@ -58,8 +61,8 @@ from .links import (
     link_document_version_revert, link_trash_can_empty
 )
 from .literals import (
-    CHECK_DELETE_PERIOD_INTERVAL, CHECK_TRASH_PERIOD_INTERVAL,
-    DELETE_STALE_STUBS_INTERVAL
+    CACHE_PRUNE_INTERVAL, CHECK_DELETE_PERIOD_INTERVAL,
+    CHECK_TRASH_PERIOD_INTERVAL, DELETE_STALE_STUBS_INTERVAL
 )
 from .menus import menu_documents
 from .permissions import (
@@ -72,6 +75,7 @@ from .permissions import (
 )
 # Just import to initialize the search models
 from .search import document_search, document_page_search  # NOQA
+from .signals import post_version_upload, post_version_upload_bulk
 from .statistics import (
     new_documents_per_month, new_document_pages_per_month,
     new_document_pages_this_month, new_documents_this_month,
@@ -287,6 +291,10 @@ class DocumentsApp(MayanAppConfig):
                     'task': 'documents.tasks.task_delete_stubs',
                     'schedule': timedelta(seconds=DELETE_STALE_STUBS_INTERVAL),
                 },
+                'task_prune_image_cache': {
+                    'task': 'documents.tasks.task_prune_image_cache',
+                    'schedule': timedelta(seconds=CACHE_PRUNE_INTERVAL),
+                },
             }
         )
 
@@ -318,9 +326,15 @@ class DocumentsApp(MayanAppConfig):
                 'documents.tasks.task_clear_image_cache': {
                     'queue': 'tools'
                 },
+                'documents.tasks.task_prune_image_cache': {
+                    'queue': 'documents_periodic'
+                },
                 'documents.tasks.task_generate_document_page_image': {
                     'queue': 'converter'
                 },
+                'documents.tasks.task_generate_document_version_page_images': {
+                    'queue': 'converter'
+                },
                 'documents.tasks.task_update_page_count': {
                     'queue': 'uploads'
                 },
@@ -498,6 +512,16 @@ class DocumentsApp(MayanAppConfig):
             create_default_document_type,
             dispatch_uid='create_default_document_type'
         )
+        post_version_upload.connect(
+            handler_generate_page_images,
+            dispatch_uid='handler_generate_page_images',
+            sender=DocumentVersion
+        )
+        post_version_upload_bulk.connect(
+            handler_generate_page_images_bulk,
+            dispatch_uid='handler_generate_page_images_bulk',
+            sender=DocumentVersion
+        )
 
         registry.register(DeletedDocument)
         registry.register(Document)
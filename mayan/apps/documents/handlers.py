@@ -2,7 +2,10 @@ from __future__ import unicode_literals
 
 from django.apps import apps
 
+from common.settings import settings_db_sync_task_delay
+
 from .literals import DEFAULT_DOCUMENT_TYPE_LABEL
+from .settings import setting_generate_page_images_on_upload
 from .signals import post_initial_document_type
 
 
@@ -18,3 +21,24 @@ def create_default_document_type(sender, **kwargs):
         post_initial_document_type.send(
             sender=DocumentType, instance=document_type
         )
+
+
+def handler_generate_page_images(sender, instance, **kwargs):
+    from .tasks import task_generate_document_version_page_images
+
+    if setting_generate_page_images_on_upload.value:
+        task_generate_document_version_page_images.apply_async(
+            kwargs={'document_version_id': instance.pk},
+            countdown=settings_db_sync_task_delay.value
+        )
+
+
+def handler_generate_page_images_bulk(sender, instances, **kwargs):
+    from .tasks import task_generate_document_version_page_images
+
+    if setting_generate_page_images_on_upload.value:
+        for instance in instances:
+            task_generate_document_version_page_images.apply_async(
+                kwargs={'document_version_id': instance.pk},
+                countdown=settings_db_sync_task_delay.value
+            )
@@ -4,15 +4,23 @@ from django.utils.translation import ugettext_lazy as _
 
 from common.literals import TIME_DELTA_UNIT_DAYS
 
+CACHE_HITS_CACHE_KEY = 'documents:image_cache_hits'
+CACHE_MISSES_CACHE_KEY = 'documents:image_cache_misses'
 CACHE_PATH = 'document_cache/'
+CACHE_PRUNE_INTERVAL = 60 * 5  # 5 minutes
 CHECK_DELETE_PERIOD_INTERVAL = 60
 CHECK_TRASH_PERIOD_INTERVAL = 60
 DELETE_STALE_STUBS_INTERVAL = 60 * 10  # 10 minutes
+DEFAULT_CACHE_MAXIMUM_SIZE = 500 * 2 ** 20  # 500 MB
 DEFAULT_DELETE_PERIOD = 30
 DEFAULT_DELETE_TIME_UNIT = TIME_DELTA_UNIT_DAYS
 DEFAULT_ZIP_FILENAME = 'document_bundle.zip'
 DEFAULT_DOCUMENT_TYPE_LABEL = _('Default')
 DOCUMENT_IMAGE_TASK_TIMEOUT = 20
+DOCUMENT_VERSION_FILE_LOCK_TIMEOUT = 60 * 10  # 10 minutes
+DOCUMENT_VERSION_FILE_LOCK_WAIT_INTERVAL = 0.05
+DOCUMENT_VERSION_FILE_LOCK_WAIT_TIMEOUT = 10
+FILE_READ_CHUNK_SIZE = 1024 * 1024
 STUB_EXPIRATION_INTERVAL = 60 * 60 * 24  # 24 hours
 UPDATE_PAGE_COUNT_RETRY_DELAY = 10
 UPLOAD_NEW_VERSION_RETRY_DELAY = 10
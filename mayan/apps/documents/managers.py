@@ -4,10 +4,14 @@ from datetime import timedelta
 import logging
 
 from django.apps import apps
+from django.core.cache import cache
 from django.db import models
+from django.db.models import Sum
 from django.utils.timezone import now
 
-from .literals import STUB_EXPIRATION_INTERVAL
+from .literals import (
+    CACHE_HITS_CACHE_KEY, CACHE_MISSES_CACHE_KEY, STUB_EXPIRATION_INTERVAL
+)
 from .settings import setting_recent_count
 
 logger = logging.getLogger(__name__)
@@ -31,6 +35,57 @@ class DocumentManager(models.Manager):
             document.invalidate_cache()
 
 
+class DocumentPageCachedImageManager(models.Manager):
+    def _increment_counter(self, key):
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+    def get_statistics(self):
+        """
+        Return the number of hits and misses of the image cache, counted
+        since the counters were last evicted from the cache, and its size.
+        """
+        counters = cache.get_many(
+            [CACHE_HITS_CACHE_KEY, CACHE_MISSES_CACHE_KEY]
+        )
+
+        return {
+            'hits': counters.get(CACHE_HITS_CACHE_KEY, 0),
+            'misses': counters.get(CACHE_MISSES_CACHE_KEY, 0),
+            'total_size': self.get_total_size()
+        }
+
+    def get_total_size(self):
+        return self.aggregate(
+            total_size=Sum('file_size')
+        )['total_size'] or 0
+
+    def prune(self, maximum_size):
+        """
+        Delete the least recently used cached images until the total size
+        of the cache is under the maximum size. Between images accessed at
+        the same time, the least used ones are deleted first.
+        """
+        total_size = self.get_total_size()
+        logger.debug(
+            'Image cache size: %d, maximum size: %d', total_size,
+            maximum_size
+        )
+
+        for cached_image in self.order_by('datetime_accessed', 'hits').iterator():
+            if total_size <= maximum_size:
+                break
+
+            total_size -= cached_image.file_size
+            cached_image.delete()
+
+    def record_hit(self):
+        self._increment_counter(key=CACHE_HITS_CACHE_KEY)
+
+    def record_miss(self):
+        self._increment_counter(key=CACHE_MISSES_CACHE_KEY)
+
+
 class DocumentTypeManager(models.Manager):
     def check_delete_periods(self):
         logger.info('Executing')
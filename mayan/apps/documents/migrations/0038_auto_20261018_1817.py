@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-18 18:17
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0037_auto_20161231_0617'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentpagecachedimage',
+            name='datetime_accessed',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Accessed'),
+        ),
+        migrations.AddField(
+            model_name='documentpagecachedimage',
+            name='file_size',
+            field=models.PositiveIntegerField(default=0, verbose_name='File size'),
+        ),
+        migrations.AddField(
+            model_name='documentpagecachedimage',
+            name='hits',
+            field=models.PositiveIntegerField(default=0, verbose_name='Hits'),
+        ),
+    ]
@@ -2,13 +2,15 @@ from __future__ import absolute_import, unicode_literals
 
 import hashlib
 import logging
+import time
 import uuid
 
 from django.conf import settings
 from django.core.files import File
 from django.core.urlresolvers import reverse
 from django.db import models, transaction
-from django.utils.encoding import python_2_unicode_compatible
+from django.db.models import F
+from django.utils.encoding import force_bytes, python_2_unicode_compatible
 from django.utils.timezone import now
 from django.utils.translation import ugettext, ugettext_lazy as _
 
@@ -21,23 +23,32 @@ from converter import (
 from converter.exceptions import InvalidOfficeFormat, PageCountError
 from converter.literals import DEFAULT_ZOOM_LEVEL, DEFAULT_ROTATION
 from converter.models import Transformation
-from mimetype.api import get_mimetype
+from lock_manager import LockError
+from lock_manager.runtime import locking_backend
+from mimetype.api import (
+    MIMETYPE_READ_SIZE, get_buffer_mimetype, get_mimetype
+)
 
 from .events import (
     event_document_create, event_document_new_version,
     event_document_properties_edit, event_document_type_change,
     event_document_version_revert
 )
-from .literals import DEFAULT_DELETE_PERIOD, DEFAULT_DELETE_TIME_UNIT
+from .literals import (
+    DEFAULT_DELETE_PERIOD, DEFAULT_DELETE_TIME_UNIT,
+    DOCUMENT_VERSION_FILE_LOCK_TIMEOUT,
+    DOCUMENT_VERSION_FILE_LOCK_WAIT_INTERVAL,
+    DOCUMENT_VERSION_FILE_LOCK_WAIT_TIMEOUT, FILE_READ_CHUNK_SIZE
+)
 from .managers import (
-    DocumentManager, DocumentTypeManager, PassthroughManager,
-    RecentDocumentManager, TrashCanManager
+    DocumentManager, DocumentPageCachedImageManager, DocumentTypeManager,
+    PassthroughManager, RecentDocumentManager, TrashCanManager
 )
 from .permissions import permission_document_view
 from .runtime import cache_storage_backend, storage_backend
 from .settings import (
-    setting_display_size, setting_language, setting_zoom_max_level,
-    setting_zoom_min_level
+    setting_deduplicate_storage, setting_display_size, setting_language,
+    setting_zoom_max_level, setting_zoom_min_level
 )
 from .signals import (
     post_document_created, post_document_type_change, post_version_upload
@@ -51,6 +62,11 @@ def HASH_FUNCTION(data):
     return hashlib.sha256(data).hexdigest()
 
 
+# incremental version of the hash function for reading files in chunks
+def HASH_OBJECT_FUNCTION():
+    return hashlib.sha256()
+
+
 def UUID_FUNCTION(*args, **kwargs):
     return unicode(uuid.uuid4())
 
@@ -243,13 +259,18 @@ class Document(models.Model):
         for document_version in self.versions.all():
             document_version.invalidate_cache()
 
-    def new_version(self, file_object, comment=None, _user=None):
+    def new_version(self, file_object, comment=None, _send_signals=True, _user=None):
         logger.info('Creating new document version for document: %s', self)
 
+        if not isinstance(file_object, File):
+            # Existing File instances are kept as they may provide a faster
+            # way to store them, like a temporary_file_path method.
+            file_object = File(file_object)
+
         document_version = DocumentVersion(
-            document=self, comment=comment or '', file=File(file_object)
+            document=self, comment=comment or '', file=file_object
         )
-        document_version.save(_user=_user)
+        document_version.save(_send_signals=_send_signals, _user=_user)
 
         logger.info('New document version queued for document: %s', self)
         return document_version
@@ -389,25 +410,44 @@ class DocumentVersion(models.Model):
         for page in self.pages.all():
             page.delete()
 
-        self.file.storage.delete(self.file.name)
+        with transaction.atomic():
+            # Versions with the same content share their file when the
+            # storage is deduplicated. Wait for the uploads reusing the file
+            # to commit before checking if it is still referenced.
+            self.lock_file_versions(name=self.file.name)
+            is_shared = DocumentVersion.objects.select_for_update().filter(
+                file=self.file.name
+            ).exclude(pk=self.pk).exists()
+
+            result = super(DocumentVersion, self).delete(*args, **kwargs)
+
+            if not is_shared:
+                self.file.storage.delete(self.file.name)
 
-        return super(DocumentVersion, self).delete(*args, **kwargs)
+        return result
 
     def save(self, *args, **kwargs):
         """
         Overloaded save method that updates the document version's checksum,
-        mimetype, and page count when created
+        mimetype, and page count when created. Bulk uploads disable the
+        upload signals and send the bulk upload signals for all the new
+        versions at once.
         """
+        send_signals = kwargs.pop('_send_signals', True)
         user = kwargs.pop('_user', None)
 
         new_document_version = not self.pk
+        deduplicate = new_document_version and setting_deduplicate_storage.value
 
         if new_document_version:
             logger.info('Creating new version for document: %s', self.document)
 
         try:
             with transaction.atomic():
-                super(DocumentVersion, self).save(*args, **kwargs)
+                if deduplicate:
+                    self.save_file_by_checksum(*args, **kwargs)
+                else:
+                    super(DocumentVersion, self).save(*args, **kwargs)
 
                 for key in sorted(DocumentVersion._post_save_hooks):
                     DocumentVersion._post_save_hooks[key](
@@ -416,8 +456,9 @@ class DocumentVersion(models.Model):
 
                 if new_document_version:
                     # Only do this for new documents
-                    self.update_checksum(save=False)
-                    self.update_mimetype(save=False)
+                    if not deduplicate:
+                        # Otherwise already updated when storing the file
+                        self.update_checksum_and_mimetype(save=False)
                     self.save()
                     self.update_page_count(save=False)
 
@@ -442,13 +483,17 @@ class DocumentVersion(models.Model):
                 event_document_new_version.commit(
                     actor=user, target=self.document
                 )
-                post_version_upload.send(sender=self.__class__, instance=self)
-
-                if tuple(self.document.versions.all()) == (self,):
-                    post_document_created.send(
-                        sender=self.document.__class__, instance=self.document
+                if send_signals:
+                    post_version_upload.send(
+                        sender=self.__class__, instance=self, user=user
                     )
 
+                    if tuple(self.document.versions.all()) == (self,):
+                        post_document_created.send(
+                            sender=self.document.__class__,
+                            instance=self.document
+                        )
+
     class Meta:
         verbose_name = _('Document version')
         verbose_name_plural = _('Document version')
@@ -457,6 +502,30 @@ class DocumentVersion(models.Model):
     def cache_filename(self):
         return 'document-version-{}'.format(self.uuid)
 
+    def acquire_file_lock(self, name=None):
+        """
+        Acquire the lock of a stored file, used to avoid storing the same
+        file twice when document versions with the same content are created
+        at the same time. The lock name uses a hash of the stored name to
+        fit the maximum lock name length.
+        """
+        name_hash = hashlib.sha1(
+            force_bytes(name or self.file.name)
+        ).hexdigest()
+
+        start = time.time()
+        while True:
+            try:
+                return locking_backend.acquire_lock(
+                    name='documents:version_file_{}'.format(name_hash),
+                    timeout=DOCUMENT_VERSION_FILE_LOCK_TIMEOUT
+                )
+            except LockError:
+                if time.time() - start > DOCUMENT_VERSION_FILE_LOCK_WAIT_TIMEOUT:
+                    raise
+
+                time.sleep(DOCUMENT_VERSION_FILE_LOCK_WAIT_INTERVAL)
+
     def exists(self):
         """
         Returns a boolean value that indicates if the document's file
@@ -497,6 +566,31 @@ class DocumentVersion(models.Model):
                 cache_storage_backend.delete(cache_filename)
                 raise
 
+    def generate_page_images(self, document_pages=None):
+        """
+        Render the images of all the pages, or of the pages specified, that
+        are not yet in the page cache with a single converter pass instead
+        of one conversion per page.
+        """
+        if document_pages is None:
+            document_pages = self.pages.all()
+
+        uncached_document_pages = {}
+        for document_page in document_pages:
+            if not cache_storage_backend.exists(document_page.cache_filename):
+                uncached_document_pages[document_page.page_number] = document_page
+
+        if not uncached_document_pages:
+            return
+
+        converter = converter_class(file_object=self.get_intermidiate_file())
+
+        for page_number, page_image in converter.get_pages(first_page_number=min(uncached_document_pages) - 1, last_page_number=max(uncached_document_pages) - 1):
+            document_page = uncached_document_pages.get(page_number + 1)
+
+            if document_page and not cache_storage_backend.exists(document_page.cache_filename):
+                document_page.cache_page_image(page_image=page_image)
+
     def invalidate_cache(self):
         cache_storage_backend.delete(self.cache_filename)
         for page in self.pages.all():
@@ -563,18 +657,116 @@ class DocumentVersion(models.Model):
         else:
             return None
 
+    def delete_unused_file(self):
+        """
+        Delete the stored file of a version whose row was not saved, like
+        one rolled back after the file was stored, unless other versions use
+        the file. Must be called in a transaction.
+        """
+        self.lock_file_versions(name=self.file.name)
+        if not DocumentVersion.objects.filter(file=self.file.name).exists():
+            self.file.storage.delete(self.file.name)
+
+    def lock_file_versions(self, name):
+        """
+        Lock the rows of the document versions that reference a stored file,
+        waiting for the transactions creating or deleting them to finish.
+        Must be called in a transaction.
+        """
+        return list(
+            DocumentVersion.objects.select_for_update().filter(
+                file=name
+            ).values_list('pk', flat=True)
+        )
+
+    def save_file_by_checksum(self, *args, **kwargs):
+        """
+        Store the file of a new version using its checksum as the name,
+        reusing the stored file of a version with the same content if there
+        is one, and insert the version. The checksum and mimetype are
+        updated while reading the file. Must be called in a transaction.
+        """
+        file_object = self.file.file
+        file_object.seek(0)
+        self.checksum, self.mimetype, self.encoding = self._read_checksum_and_mimetype(
+            file_object=file_object
+        )
+
+        name = '/'.join(
+            (self.checksum[0:2], self.checksum[2:4], self.checksum)
+        )
+        lock = self.acquire_file_lock(name=name)
+
+        try:
+            # Deletions of the versions sharing the file finish before
+            # checking if it exists, and new ones wait until this version is
+            # committed, keeping the file from being removed in between.
+            self.lock_file_versions(name=name)
+
+            is_created = not self.file.storage.exists(name)
+            if is_created:
+                file_object.seek(0)
+                name = self.file.storage.save(name, file_object)
+
+            self.file.name = name
+            self.file._committed = True
+
+            try:
+                super(DocumentVersion, self).save(*args, **kwargs)
+            except:
+                if is_created:
+                    self.file.storage.delete(name)
+                raise
+        finally:
+            lock.release()
+
     def update_checksum(self, save=True):
         """
         Open a document version's file and update the checksum field using
         the user provided checksum function
         """
         if self.exists():
-            source = self.open()
-            self.checksum = unicode(HASH_FUNCTION(source.read()))
-            source.close()
+            with self.open() as file_object:
+                hash_object = HASH_OBJECT_FUNCTION()
+                for chunk in iter(lambda: file_object.read(FILE_READ_CHUNK_SIZE), b''):
+                    hash_object.update(chunk)
+
+            self.checksum = unicode(hash_object.hexdigest())
             if save:
                 self.save()
 
+    def update_checksum_and_mimetype(self, save=True):
+        """
+        Read a document version's file once, in chunks, to update both the
+        checksum and the mimetype. The mimetype is determined from the
+        initial bytes of the file.
+        """
+        if self.exists():
+            with self.open() as file_object:
+                self.checksum, self.mimetype, self.encoding = self._read_checksum_and_mimetype(
+                    file_object=file_object
+                )
+
+            if save:
+                self.save()
+
+    @staticmethod
+    def _read_checksum_and_mimetype(file_object):
+        hash_object = HASH_OBJECT_FUNCTION()
+        head = b''
+        for chunk in iter(lambda: file_object.read(FILE_READ_CHUNK_SIZE), b''):
+            hash_object.update(chunk)
+            if len(head) < MIMETYPE_READ_SIZE:
+                head += chunk[:MIMETYPE_READ_SIZE - len(head)]
+
+        try:
+            mimetype, encoding = get_buffer_mimetype(data=head)
+        except:
+            mimetype = ''
+            encoding = ''
+
+        return unicode(hash_object.hexdigest()), mimetype, encoding
+
     def update_mimetype(self, save=True):
         """
         Read a document verions's file and determine the mimetype by calling
@@ -689,6 +881,28 @@ class DocumentPage(models.Model):
     def cache_filename(self):
         return 'page-cache-{}'.format(self.uuid)
 
+    def cache_page_image(self, page_image):
+        """
+        Store a rendered page image as the base image of this page from
+        which all the transformed images are generated.
+        """
+        try:
+            with cache_storage_backend.open(self.cache_filename, 'wb+') as file_object:
+                file_object.write(page_image.getvalue())
+
+            self.cached_images.create(
+                filename=self.cache_filename,
+                file_size=len(page_image.getvalue())
+            )
+        except Exception as exception:
+            # Cleanup in case of error
+            logger.error(
+                'Error creating page cache file "%s"; %s',
+                self.cache_filename, exception
+            )
+            cache_storage_backend.delete(self.cache_filename)
+            raise
+
     @property
     def document(self):
         return self.document_version.document
@@ -747,12 +961,16 @@ class DocumentPage(models.Model):
             logger.debug(
                 'transformations cache file "%s" found', cache_filename
             )
+            self.touch_cached_image(filename=cache_filename)
         else:
+            DocumentPageCachedImage.objects.record_miss()
             image = self.get_image(transformations=transformation_list)
             with cache_storage_backend.open(cache_filename, 'wb+') as file_object:
                 file_object.write(image.getvalue())
 
-            self.cached_images.create(filename=cache_filename)
+            self.cached_images.create(
+                filename=cache_filename, file_size=len(image.getvalue())
+            )
 
         return cache_filename
 
@@ -762,6 +980,7 @@ class DocumentPage(models.Model):
 
         if cache_storage_backend.exists(cache_filename):
             logger.debug('Page cache file "%s" found', cache_filename)
+            self.touch_cached_image(filename=cache_filename)
             converter = converter_class(
                 file_object=cache_storage_backend.open(cache_filename)
             )
@@ -769,25 +988,14 @@ class DocumentPage(models.Model):
             converter.seek(0)
         else:
             logger.debug('Page cache file "%s" not found', cache_filename)
+            DocumentPageCachedImage.objects.record_miss()
 
-            try:
-                converter = converter_class(
-                    file_object=self.document_version.get_intermidiate_file()
-                )
-                converter.seek(page_number=self.page_number - 1)
-
-                page_image = converter.get_page()
+            converter = converter_class(
+                file_object=self.document_version.get_intermidiate_file()
+            )
+            converter.seek(page_number=self.page_number - 1)
 
-                with cache_storage_backend.open(cache_filename, 'wb+') as file_object:
-                    file_object.write(page_image.getvalue())
-            except Exception as exception:
-                # Cleanup in case of error
-                logger.error(
-                    'Error creating page cache file "%s"; %s',
-                    cache_filename, exception
-                )
-                cache_storage_backend.delete(cache_filename)
-                raise
+            self.cache_page_image(page_image=converter.get_page())
 
         for transformation in transformations:
             converter.transform(transformation=transformation)
@@ -805,6 +1013,24 @@ class DocumentPage(models.Model):
             document_version=self.document_version
         )
 
+    def touch_cached_image(self, filename):
+        """
+        Record a cache hit for a cached image, updating its access time
+        so that it is evicted last. Cache files that predate the tracking
+        of cached images are registered on their first hit.
+        """
+        DocumentPageCachedImage.objects.record_hit()
+
+        updated = self.cached_images.filter(filename=filename).update(
+            datetime_accessed=now(), hits=F('hits') + 1
+        )
+
+        if not updated:
+            self.cached_images.create(
+                filename=filename,
+                file_size=cache_storage_backend.size(filename), hits=1
+            )
+
     @property
     def uuid(self):
         """
@@ -819,7 +1045,16 @@ class DocumentPageCachedImage(models.Model):
         DocumentPage, related_name='cached_images',
         verbose_name=_('Document page')
     )
+    datetime_accessed = models.DateTimeField(
+        db_index=True, default=now, verbose_name=_('Accessed')
+    )
     filename = models.CharField(max_length=128, verbose_name=_('Filename'))
+    file_size = models.PositiveIntegerField(
+        default=0, verbose_name=_('File size')
+    )
+    hits = models.PositiveIntegerField(default=0, verbose_name=_('Hits'))
+
+    objects = DocumentPageCachedImageManager()
 
     class Meta:
         verbose_name = _('Document page cached image')
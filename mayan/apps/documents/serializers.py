@@ -1,9 +1,12 @@
 from __future__ import unicode_literals
 
+from django.utils.translation import ugettext_lazy as _
+
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 
-from common.models import SharedUploadedFile
+from common.exceptions import UploadSessionError
+from common.models import SharedUploadedFile, SharedUploadSession
 
 from .models import (
     Document, DocumentVersion, DocumentPage, DocumentType,
@@ -13,6 +16,49 @@ from .settings import setting_language
 from .tasks import task_upload_new_version
 
 
+class UploadSessionSerializerMixin(object):
+    """
+    Accept either a file or the UUID of a complete upload session as the
+    content of a new document or document version.
+    """
+    def get_filename(self):
+        if self.validated_data.get('upload_session'):
+            return self.validated_data['upload_session'].filename
+        else:
+            return unicode(self.validated_data['file'])
+
+    def get_shared_uploaded_file(self):
+        upload_session = self.validated_data.get('upload_session')
+
+        if upload_session:
+            try:
+                return upload_session.finalize()
+            except UploadSessionError as exception:
+                raise serializers.ValidationError(
+                    {'upload_session': [unicode(exception)]}
+                )
+        else:
+            return SharedUploadedFile.objects.create(
+                file=self.validated_data['file']
+            )
+
+    def validate(self, attrs):
+        if bool(attrs.get('file')) == bool(attrs.get('upload_session')):
+            raise serializers.ValidationError(
+                _('Provide either a file or an upload session.')
+            )
+
+        return attrs
+
+    def validate_upload_session(self, value):
+        if value.user != self.context['request'].user:
+            raise serializers.ValidationError(
+                _('Upload session does not exist.')
+            )
+
+        return value
+
+
 class DocumentPageSerializer(serializers.HyperlinkedModelSerializer):
     document_version_url = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
@@ -192,14 +238,16 @@ class WritableDocumentVersionSerializer(serializers.ModelSerializer):
         )
 
 
-class NewDocumentVersionSerializer(serializers.Serializer):
+class NewDocumentVersionSerializer(UploadSessionSerializerMixin, serializers.Serializer):
     comment = serializers.CharField(allow_blank=True)
-    file = serializers.FileField(use_url=False)
+    file = serializers.FileField(required=False, use_url=False)
+    upload_session = serializers.SlugRelatedField(
+        queryset=SharedUploadSession.objects.all(), required=False,
+        slug_field='uuid'
+    )
 
     def save(self, document, _user):
-        shared_uploaded_file = SharedUploadedFile.objects.create(
-            file=self.validated_data['file']
-        )
+        shared_uploaded_file = self.get_shared_uploaded_file()
 
         task_upload_new_version.delay(
             comment=self.validated_data.get('comment', ''),
@@ -273,26 +321,27 @@ class WritableDocumentSerializer(serializers.ModelSerializer):
         read_only_fields = ('document_type',)
 
 
-class NewDocumentSerializer(serializers.ModelSerializer):
-    file = serializers.FileField(write_only=True)
+class NewDocumentSerializer(UploadSessionSerializerMixin, serializers.ModelSerializer):
+    file = serializers.FileField(required=False, write_only=True)
+    upload_session = serializers.SlugRelatedField(
+        queryset=SharedUploadSession.objects.all(), required=False,
+        slug_field='uuid', write_only=True
+    )
 
     def save(self, _user):
+        # Verify and claim the uploaded file before creating the document
+        shared_uploaded_file = self.get_shared_uploaded_file()
+
         document = Document.objects.create(
             description=self.validated_data.get('description', ''),
             document_type=self.validated_data['document_type'],
-            label=self.validated_data.get(
-                'label', unicode(self.validated_data['file'])
-            ),
+            label=self.validated_data.get('label', self.get_filename()),
             language=self.validated_data.get(
                 'language', setting_language.value
             )
         )
         document.save(_user=_user)
 
-        shared_uploaded_file = SharedUploadedFile.objects.create(
-            file=self.validated_data['file']
-        )
-
         task_upload_new_version.delay(
             document_id=document.pk,
             shared_uploaded_file_id=shared_uploaded_file.pk, user_id=_user.pk
@@ -304,6 +353,7 @@ class NewDocumentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = (
             'description', 'document_type', 'id', 'file', 'label', 'language',
+            'upload_session',
         )
         model = Document
 
@@ -6,6 +6,8 @@ from django.utils.translation import ugettext_lazy as _
 
 from smart_settings import Namespace
 
+from .literals import DEFAULT_CACHE_MAXIMUM_SIZE
+
 LANGUAGE_CHOICES = [
     (i.iso639_3_code, i.name) for i in list(pycountry.languages)
 ]
@@ -65,6 +67,31 @@ setting_cache_storage_backend = namespace.add_setting(
     global_name='DOCUMENTS_CACHE_STORAGE_BACKEND',
     default='documents.storage.LocalCacheFileStorage'
 )
+setting_cache_maximum_size = namespace.add_setting(
+    global_name='DOCUMENTS_CACHE_MAXIMUM_SIZE',
+    default=DEFAULT_CACHE_MAXIMUM_SIZE, help_text=_(
+        'Maximum size in bytes of the document page image cache. When the '
+        'cache grows beyond this size, the least recently used images are '
+        'deleted. Use 0 to disable the limit.'
+    )
+)
+setting_deduplicate_storage = namespace.add_setting(
+    global_name='DOCUMENTS_DEDUPLICATE_STORAGE', default=False,
+    help_text=_(
+        'Store the files of new document versions using their checksum as '
+        'name. Files with the same content are stored only once and shared '
+        'by their document versions.'
+    )
+)
+setting_generate_page_images_on_upload = namespace.add_setting(
+    global_name='DOCUMENTS_GENERATE_PAGE_IMAGES_ON_UPLOAD', default=False,
+    help_text=_(
+        'Render the images of all the pages of new document versions in a '
+        'single pass when uploaded, instead of one page at a time when '
+        'first displayed. Uses more processing time and cache space for '
+        'documents whose pages are never displayed.'
+    )
+)
 setting_language = namespace.add_setting(
     global_name='DOCUMENTS_LANGUAGE', default='eng',
     help_text=_('Default documents language (in ISO639-2 format).')
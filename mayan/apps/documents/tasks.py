@@ -11,6 +11,7 @@ from mayan.celery import app
 from .literals import (
     UPDATE_PAGE_COUNT_RETRY_DELAY, UPLOAD_NEW_VERSION_RETRY_DELAY
 )
+from .settings import setting_cache_maximum_size
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,25 @@ def task_clear_image_cache():
     logger.info('Finished document cache invalidation')
 
 
+@app.task(ignore_result=True)
+def task_prune_image_cache():
+    DocumentPageCachedImage = apps.get_model(
+        app_label='documents', model_name='DocumentPageCachedImage'
+    )
+
+    if setting_cache_maximum_size.value:
+        logger.info('Starting document cache pruning')
+        DocumentPageCachedImage.objects.prune(
+            maximum_size=setting_cache_maximum_size.value
+        )
+        logger.info('Finished document cache pruning')
+
+    logger.info(
+        'Document cache hits: %(hits)d, misses: %(misses)d, size: '
+        '%(total_size)d', DocumentPageCachedImage.objects.get_statistics()
+    )
+
+
 @app.task(ignore_result=True)
 def task_delete_stubs():
     Document = apps.get_model(
@@ -66,6 +86,23 @@ def task_generate_document_page_image(document_page_id, *args, **kwargs):
     return document_page.generate_image(*args, **kwargs)
 
 
+@app.task(ignore_result=True)
+def task_generate_document_version_page_images(document_version_id):
+    DocumentVersion = apps.get_model(
+        app_label='documents', model_name='DocumentVersion'
+    )
+
+    document_version = DocumentVersion.objects.get(pk=document_version_id)
+
+    try:
+        document_version.generate_page_images()
+    except Exception as exception:
+        logger.error(
+            'Error generating the page images of document version: %s; %s',
+            document_version, exception
+        )
+
+
 @app.task(bind=True, default_retry_delay=UPDATE_PAGE_COUNT_RETRY_DELAY, ignore_result=True)
 def task_update_page_count(self, version_id):
     DocumentVersion = apps.get_model(
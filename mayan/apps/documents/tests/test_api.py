@@ -2,6 +2,7 @@
 
 from __future__ import unicode_literals
 
+import hashlib
 import time
 
 from json import loads
@@ -14,6 +15,7 @@ from django.utils.encoding import force_text
 from django_downloadview import assert_download_response
 from rest_framework import status
 
+from common.models import SharedUploadSession
 from rest_api.tests import BaseAPITestCase
 from user_management.tests.literals import (
     TEST_ADMIN_EMAIL, TEST_ADMIN_PASSWORD, TEST_ADMIN_USERNAME
@@ -153,6 +155,53 @@ class DocumentAPITestCase(BaseAPITestCase):
         )
         self.assertEqual(document.page_count, 47)
 
+    def test_document_upload_session(self):
+        with open(TEST_DOCUMENT_PATH) as file_object:
+            data = file_object.read()
+
+        response = self.client.post(
+            reverse('rest_api:shareduploadsession-list'), {
+                'checksum': hashlib.sha256(data).hexdigest(),
+                'filename': TEST_DOCUMENT_FILENAME, 'size': len(data)
+            }
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        upload_session_uuid = loads(response.content)['uuid']
+
+        middle = len(data) // 2
+        for start, end in ((0, middle - 1), (middle, len(data) - 1)):
+            response = self.client.put(
+                reverse(
+                    'rest_api:shareduploadsession-detail',
+                    args=(upload_session_uuid,)
+                ), data[start:end + 1],
+                content_type='application/octet-stream',
+                HTTP_CONTENT_RANGE='bytes {}-{}/{}'.format(
+                    start, end, len(data)
+                )
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(loads(response.content)['offset'], end + 1)
+
+        response = self.client.post(
+            reverse('rest_api:document-list'), {
+                'document_type': self.document_type.pk,
+                'upload_session': upload_session_uuid
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SharedUploadSession.objects.count(), 0)
+
+        document = Document.objects.first()
+
+        self.assertEqual(document.label, TEST_DOCUMENT_FILENAME)
+        self.assertEqual(document.size, 272213)
+        self.assertEqual(
+            document.checksum,
+            'c637ffab6b8bb026ed3784afdb07663fddc60099853fae2be93890852a69ecf3'
+        )
+
     def test_document_new_version_upload(self):
         with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
             document = self.document_type.new_document(
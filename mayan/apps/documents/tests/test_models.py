@@ -1,13 +1,26 @@
 from __future__ import unicode_literals
 
 from datetime import timedelta
+import os
 import time
 
+import mock
+
+from common.models import SharedUploadedFile
 from common.tests import BaseTestCase
+from django.core.files import File
+from django.db import transaction
 from django.test import override_settings
+from django.utils.timezone import now
+from lock_manager.backends.model_lock import ModelLock
+from lock_manager.models import Lock
 
 from ..literals import STUB_EXPIRATION_INTERVAL
-from ..models import DeletedDocument, Document, DocumentType
+from ..models import (
+    DeletedDocument, Document, DocumentPageCachedImage, DocumentType
+)
+from ..runtime import cache_storage_backend
+from ..settings import setting_deduplicate_storage
 
 from .literals import (
     TEST_DOCUMENT_TYPE, TEST_DOCUMENT_PATH, TEST_MULTI_PAGE_TIFF_PATH,
@@ -59,6 +72,28 @@ class DocumentTestCase(BaseTestCase):
 
         self.assertEqual(self.document.versions.count(), 3)
 
+    def test_version_creation_from_shared_uploaded_file(self):
+        with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
+            shared_uploaded_file = SharedUploadedFile.objects.create(
+                file=File(file_object)
+            )
+
+        with shared_uploaded_file.open() as file_object:
+            document_version = self.document.new_version(
+                file_object=file_object
+            )
+
+        # The stored file is a hard link to the shared file, not a copy
+        self.assertEqual(
+            os.stat(document_version.file.path).st_ino,
+            os.stat(shared_uploaded_file.file.path).st_ino
+        )
+
+        shared_uploaded_file.delete()
+
+        self.assertTrue(document_version.exists())
+        self.assertEqual(document_version.mimetype, 'image/png')
+
     def test_restoring_documents(self):
         self.assertEqual(Document.objects.count(), 1)
 
@@ -193,6 +228,19 @@ class MultiPageTiffTestCase(BaseTestCase):
         )
         self.assertEqual(self.document.page_count, 2)
 
+    def test_page_image_generation(self):
+        self.document.latest_version.generate_page_images()
+
+        for document_page in self.document.pages.all():
+            self.assertTrue(
+                cache_storage_backend.exists(document_page.cache_filename)
+            )
+            self.assertTrue(
+                document_page.cached_images.filter(
+                    filename=document_page.cache_filename
+                ).exists()
+            )
+
 
 @override_settings(OCR_AUTO_OCR=False)
 class DocumentVersionTestCase(BaseTestCase):
@@ -245,6 +293,86 @@ class DocumentVersionTestCase(BaseTestCase):
         self.assertEqual(self.document.versions.count(), 1)
 
 
+@override_settings(
+    DOCUMENTS_DEDUPLICATE_STORAGE=True, OCR_AUTO_OCR=False
+)
+class DocumentVersionDeduplicationTestCase(BaseTestCase):
+    def setUp(self):
+        super(DocumentVersionDeduplicationTestCase, self).setUp()
+        setting_deduplicate_storage.invalidate_cache()
+
+        self.document_type = DocumentType.objects.create(
+            label=TEST_DOCUMENT_TYPE
+        )
+
+    def tearDown(self):
+        self.document_type.delete()
+        setting_deduplicate_storage.invalidate_cache()
+        super(DocumentVersionDeduplicationTestCase, self).tearDown()
+
+    def test_shared_file(self):
+        documents = []
+        for count in range(2):
+            with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
+                documents.append(
+                    self.document_type.new_document(file_object=file_object)
+                )
+
+        version_1 = documents[0].latest_version
+        version_2 = documents[1].latest_version
+
+        self.assertEqual(version_1.file.name, version_2.file.name)
+        self.assertTrue(version_1.file.name.endswith(version_1.checksum))
+        self.assertEqual(version_2.mimetype, 'image/png')
+        self.assertEqual(version_2.page_count, 1)
+
+        documents[0].delete(to_trash=False)
+        self.assertTrue(version_2.exists())
+
+        documents[1].delete(to_trash=False)
+        self.assertFalse(version_2.exists())
+
+    def test_shared_file_same_transaction(self):
+        with transaction.atomic():
+            documents = []
+            for count in range(2):
+                with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
+                    documents.append(
+                        self.document_type.new_document(
+                            file_object=file_object
+                        )
+                    )
+
+        self.assertEqual(
+            documents[0].latest_version.file.name,
+            documents[1].latest_version.file.name
+        )
+
+    def test_shared_file_model_lock(self):
+        maximum_length = Lock._meta.get_field('name').max_length
+
+        with mock.patch('documents.models.locking_backend', ModelLock):
+            with mock.patch.object(ModelLock, 'acquire_lock', wraps=ModelLock.acquire_lock) as acquire_lock:
+                documents = []
+                for count in range(2):
+                    with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
+                        documents.append(
+                            self.document_type.new_document(
+                                file_object=file_object
+                            )
+                        )
+
+        self.assertTrue(acquire_lock.called)
+        for call in acquire_lock.call_args_list:
+            self.assertTrue(len(call[1]['name']) <= maximum_length)
+
+        self.assertEqual(
+            documents[0].latest_version.file.name,
+            documents[1].latest_version.file.name
+        )
+        self.assertEqual(Lock.objects.count(), 0)
+
+
 @override_settings(OCR_AUTO_OCR=False)
 class DocumentManagerTestCase(BaseTestCase):
     def setUp(self):
@@ -274,3 +402,77 @@ class DocumentManagerTestCase(BaseTestCase):
         Document.objects.delete_stubs()
 
         self.assertEqual(Document.objects.count(), 0)
+
+
+@override_settings(OCR_AUTO_OCR=False)
+class DocumentPageCachedImageTestCase(BaseTestCase):
+    def setUp(self):
+        super(DocumentPageCachedImageTestCase, self).setUp()
+        self.document_type = DocumentType.objects.create(
+            label=TEST_DOCUMENT_TYPE
+        )
+
+        with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
+            self.document = self.document_type.new_document(
+                file_object=file_object
+            )
+
+        self.document_page = self.document.pages.first()
+
+    def tearDown(self):
+        self.document_type.delete()
+        super(DocumentPageCachedImageTestCase, self).tearDown()
+
+    def test_cached_image_tracking(self):
+        cache_filename = self.document_page.generate_image(size='100')
+        cached_image = self.document_page.cached_images.get(
+            filename=cache_filename
+        )
+
+        self.assertEqual(
+            cached_image.file_size, cache_storage_backend.size(cache_filename)
+        )
+        self.assertEqual(cached_image.hits, 0)
+
+        self.document_page.generate_image(size='100')
+        cached_image.refresh_from_db()
+
+        self.assertEqual(cached_image.hits, 1)
+
+    def test_cache_statistics(self):
+        statistics = DocumentPageCachedImage.objects.get_statistics()
+
+        self.document_page.generate_image(size='100')
+        statistics_miss = DocumentPageCachedImage.objects.get_statistics()
+
+        self.assertTrue(statistics_miss['misses'] > statistics['misses'])
+
+        self.document_page.generate_image(size='100')
+        statistics_hit = DocumentPageCachedImage.objects.get_statistics()
+
+        self.assertEqual(statistics_hit['hits'], statistics_miss['hits'] + 1)
+        self.assertEqual(statistics_hit['misses'], statistics_miss['misses'])
+        self.assertEqual(
+            statistics_hit['total_size'],
+            DocumentPageCachedImage.objects.get_total_size()
+        )
+
+    def test_cache_pruning(self):
+        old_cache_filename = self.document_page.generate_image(size='100')
+        new_cache_filename = self.document_page.generate_image(size='200')
+
+        DocumentPageCachedImage.objects.filter(
+            filename=old_cache_filename
+        ).update(datetime_accessed=now() - timedelta(days=1))
+
+        DocumentPageCachedImage.objects.prune(
+            maximum_size=DocumentPageCachedImage.objects.get_total_size() - 1
+        )
+
+        self.assertFalse(cache_storage_backend.exists(old_cache_filename))
+        self.assertTrue(cache_storage_backend.exists(new_cache_filename))
+        self.assertFalse(
+            DocumentPageCachedImage.objects.filter(
+                filename=old_cache_filename
+            ).exists()
+        )
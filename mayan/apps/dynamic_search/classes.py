@@ -75,8 +75,8 @@ class SearchModel(object):
         queries = []
         for term in terms:
             or_query = None
-            for field in search_fields:
-                q = Q(**{'%s__%s' % (field, 'icontains'): term})
+            for search_field in search_fields:
+                q = search_field.get_query(term=term)
                 if or_query is None:
                     or_query = q
                 else:
@@ -128,7 +128,6 @@ class SearchModel(object):
 
         elapsed_time = 0
         start_time = datetime.datetime.now()
-        result_set = set()
         search_dict = {}
 
         if 'q' in query_string:
@@ -141,7 +140,7 @@ class SearchModel(object):
                 })
                 search_dict[search_field.get_model()]['searches'].append(
                     {
-                        'field_name': [search_field.field],
+                        'search_fields': [search_field],
                         'terms': self.normalize_query(
                             query_string.get('q', '').strip()
                         )
@@ -157,80 +156,97 @@ class SearchModel(object):
                     })
                     search_dict[search_field.get_model()]['searches'].append(
                         {
-                            'field_name': [search_field.field],
+                            'search_fields': [search_field],
                             'terms': self.normalize_query(
                                 query_string[search_field.field]
                             )
                         }
                     )
 
+        result_query = None
         for model, data in search_dict.items():
             logger.debug('model: %s', model)
 
-            # Initialize per model result set
-            model_result_set = set()
+            # Initialize per model query
+            model_query = None
 
             for query_entry in data['searches']:
                 # Fashion a list of queries for a field for each term
                 field_query_list = self.assemble_query(
-                    query_entry['terms'], query_entry['field_name']
+                    query_entry['terms'], query_entry['search_fields']
                 )
 
                 logger.debug('field_query_list: %s', field_query_list)
 
-                # Initialize per field result set
-                field_result_set = set()
+                # Initialize per field query. A field without terms matches
+                # nothing.
+                field_query = Q(pk__in=())
 
-                # Get results per search field
-                for query in field_query_list:
+                # AND all the term queries of the field. Each term query is
+                # a subquery so that the terms can be found in different
+                # related rows, ie: different tags of the same document.
+                for index, query in enumerate(field_query_list):
                     logger.debug('query: %s', query)
-                    term_query_result_set = set(
-                        model.objects.filter(query).values_list(
-                            data['return_value'], flat=True
-                        )
+                    term_query = Q(
+                        pk__in=model.objects.filter(query).values('pk')
                     )
 
-                    # Convert the QuerySet to a Python set and perform the
-                    # AND operation on the program and not as a query.
-                    # This operation ANDs all the field term results
-                    # belonging to a single model, making sure to only include
-                    # results in the final field result variable if all the
-                    # terms are found in a single field.
-                    if not field_result_set:
-                        field_result_set = term_query_result_set
+                    if index == 0:
+                        field_query = term_query
                     else:
-                        field_result_set &= term_query_result_set
-
-                    logger.debug(
-                        'term_query_result_set: %s', term_query_result_set
-                    )
-                    logger.debug('field_result_set: %s', field_result_set)
+                        field_query &= term_query
 
-                if global_and_search:
-                    if not model_result_set:
-                        model_result_set = field_result_set
-                    else:
-                        model_result_set &= field_result_set
+                if model_query is None:
+                    model_query = field_query
+                elif global_and_search:
+                    model_query &= field_query
                 else:
-                    model_result_set |= field_result_set
+                    model_query |= field_query
 
-            result_set = result_set | model_result_set
-
-        elapsed_time = unicode(
-            datetime.datetime.now() - start_time
-        ).split(':')[2]
+            if model != self.model or data['return_value'] != 'pk':
+                model_query = Q(
+                    pk__in=model.objects.filter(model_query).values(
+                        data['return_value']
+                    )
+                )
 
-        logger.debug('elapsed_time: %s', elapsed_time)
+            if result_query is None:
+                result_query = model_query
+            else:
+                result_query |= model_query
 
-        queryset = self.model.objects.filter(
-            pk__in=list(result_set)[:setting_limit.value]
-        )
+        if result_query is None:
+            queryset = self.model.objects.none()
+        else:
+            queryset = self.model.objects.filter(result_query)
 
         if self.permission:
             queryset = AccessControlList.objects.filter_by_access(
                 self.permission, user, queryset
             )
 
+        # The complete list of matching primary keys, use .count() on it to
+        # get the total number of results with a separate query.
+        result_set = queryset.values_list('pk', flat=True)
+
+        # Order by primary key last for a stable order between pages of
+        # results. Fetch only the limited list of primary keys, the final
+        # queryset is not sliced so that it can still be filtered by views.
+        ordering = tuple(self.model._meta.ordering) + ('pk',)
+        queryset = self.model.objects.filter(
+            pk__in=list(
+                queryset.order_by(*ordering).values_list(
+                    'pk', flat=True
+                )[:setting_limit.value]
+            )
+        ).order_by(*ordering)
+
+        elapsed_time = unicode(
+            datetime.datetime.now() - start_time
+        ).split(':')[2]
+
+        logger.debug('elapsed_time: %s', elapsed_time)
+
         return queryset, result_set, elapsed_time
 
 
@@ -239,14 +255,26 @@ class SearchField(object):
     """
     Search for terms in fields that directly belong to the parent SearchModel
     """
-    def __init__(self, search_model, field, label):
+    def __init__(self, search_model, field, label, query_function=None):
         self.search_model = search_model
         self.field = field
         self.label = label
+        self.query_function = query_function
         self.return_value = 'pk'
 
     def get_full_name(self):
         return self.field
 
+    def get_query(self, term):
+        """
+        Return the Q object that matches the term in this field. Apps can
+        provide a query function to use an index of the field's content
+        instead of a case insensitive containment query.
+        """
+        if self.query_function:
+            return self.query_function(field=self.field, term=term)
+        else:
+            return Q(**{'%s__%s' % (self.field, 'icontains'): term})
+
     def get_model(self):
         return self.search_model.model
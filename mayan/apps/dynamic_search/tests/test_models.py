@@ -60,3 +60,28 @@ class DocumentSearchTestCase(BaseTestCase):
         )
         self.assertEqual(len(result_set), 1)
         self.assertEqual(list(model_list), [self.document])
+
+    def test_search_term_and_field_combination(self):
+        model_list, result_set, elapsed_time = document_search.search(
+            {'label': 'mayan 11'}, user=self.admin_user
+        )
+        self.assertEqual(list(model_list), [self.document])
+
+        model_list, result_set, elapsed_time = document_search.search(
+            {'label': 'mayan invalid'}, user=self.admin_user
+        )
+        self.assertEqual(list(model_list), [])
+
+        model_list, result_set, elapsed_time = document_search.search(
+            {'label': 'mayan', 'description': 'invalid'},
+            user=self.admin_user
+        )
+        self.assertEqual(result_set.count(), 1)
+        self.assertEqual(list(model_list), [self.document])
+
+        model_list, result_set, elapsed_time = document_search.search(
+            {'label': 'mayan', 'description': 'invalid'},
+            user=self.admin_user, global_and_search=True
+        )
+        self.assertEqual(result_set.count(), 0)
+        self.assertEqual(list(model_list), [])
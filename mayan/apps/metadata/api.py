@@ -2,11 +2,47 @@ from __future__ import unicode_literals
 
 from urllib import unquote_plus
 
+from django.core.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
+from django.utils.translation import ugettext_lazy as _
 
 from .models import DocumentMetadata, MetadataType
 
 
+def bulk_create_metadata(documents, document_type, metadata_dict_list=None, metadata_dictionary=None):
+    """
+    Associate the same metadata values to several new documents of the same
+    document type using a single query
+    """
+    metadata_type_ids = list(
+        document_type.metadata.values_list('metadata_type', flat=True)
+    )
+    values = {}
+
+    for metadata_dict in metadata_dict_list or ():
+        metadata_type = get_object_or_404(MetadataType, pk=metadata_dict['id'])
+        if metadata_type.pk not in metadata_type_ids:
+            raise ValidationError(
+                _('Metadata type is not valid for this document type.')
+            )
+
+        values[metadata_type.pk] = unquote_plus(metadata_dict['value'])
+
+    if metadata_dictionary:
+        for metadata_type in MetadataType.objects.filter(name__in=metadata_dictionary.keys(), pk__in=metadata_type_ids):
+            values[metadata_type.pk] = metadata_dictionary[metadata_type.name]
+
+    DocumentMetadata.objects.bulk_create(
+        [
+            DocumentMetadata(
+                document=document, metadata_type_id=metadata_type_id,
+                value=value
+            ) for document in documents
+            for metadata_type_id, value in values.items()
+        ]
+    )
+
+
 def decode_metadata_from_url(url_dict):
     """
     Parse a URL query string to a list of metadata
@@ -14,6 +14,7 @@ from common import (
     menu_setup, menu_sidebar
 )
 from common.classes import ModelAttribute, Filter
+from common.handlers import handler_clear_template_cache
 from common.widgets import two_state_template
 from documents.search import document_page_search, document_search
 from documents.signals import post_document_type_change
@@ -248,3 +249,14 @@ class MetadataApp(MayanAppConfig):
             dispatch_uid='post_document_type_metadata_type_add',
             sender=DocumentTypeMetadataType
         )
+
+        post_delete.connect(
+            handler_clear_template_cache,
+            dispatch_uid='metadata_handler_clear_template_cache_metadata_type_delete',
+            sender=MetadataType
+        )
+        post_save.connect(
+            handler_clear_template_cache,
+            dispatch_uid='metadata_handler_clear_template_cache_metadata_type_save',
+            sender=MetadataType
+        )
@@ -14,6 +14,17 @@ class DocumentMetadataHelper(object):
         self.instance = instance
 
     def __getattr__(self, name):
+        if 'metadata' in getattr(self.instance, '_prefetched_objects_cache', ()):
+            # Use the metadata prefetched with the document, ie: when
+            # rebuilding indexes.
+            for document_metadata in self.instance.metadata.all():
+                if document_metadata.metadata_type.name == name:
+                    return document_metadata.value
+
+            raise AttributeError(
+                _('\'metadata\' object has no attribute \'%s\'') % name
+            )
+
         try:
             return self.instance.metadata.get(metadata_type__name=name).value
         except ObjectDoesNotExist:
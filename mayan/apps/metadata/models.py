@@ -4,11 +4,12 @@ import shlex
 
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.template import Context, Template
+from django.template import Context
 from django.utils.encoding import force_text, python_2_unicode_compatible
 from django.utils.module_loading import import_string
 from django.utils.translation import ugettext_lazy as _
 
+from common.classes import TemplateCache
 from documents.models import Document, DocumentType
 
 from .classes import MetadataLookup
@@ -100,12 +101,12 @@ class MetadataType(models.Model):
         return [force_text(e) for e in splitter]
 
     def get_default_value(self):
-        template = Template(self.default)
+        template = TemplateCache.get(self.default)
         context = Context()
         return template.render(context=context)
 
     def get_lookup_values(self):
-        template = Template(self.lookup)
+        template = TemplateCache.get(self.lookup)
         context = Context(MetadataLookup.get_as_context())
         return MetadataType.comma_splitter(template.render(context=context))
 
@@ -4,6 +4,7 @@ from __future__ import unicode_literals
 from django.core.exceptions import ValidationError
 from django.test import override_settings
 
+from common.classes import TemplateCache
 from common.tests import BaseTestCase
 from documents.models import DocumentType
 from documents.tests import TEST_SMALL_DOCUMENT_PATH, TEST_DOCUMENT_TYPE
@@ -190,3 +191,20 @@ class MetadataTestCase(BaseTestCase):
         self.metadata_type.lookup = 'test1,test2'
         self.metadata_type.save()
         self.metadata_type.validate_value(document_type=None, value='test1')
+
+    def test_lookup_template_cache(self):
+        self.metadata_type.lookup = TEST_LOOKUP_TEMPLATE
+        self.metadata_type.save()
+
+        self.assertEqual(
+            self.metadata_type.get_lookup_values(), ['1', '2', '3']
+        )
+        self.assertTrue(TEST_LOOKUP_TEMPLATE in TemplateCache._cache)
+
+        self.metadata_type.lookup = 'test1,test2'
+        self.metadata_type.save()
+
+        self.assertFalse(TEST_LOOKUP_TEMPLATE in TemplateCache._cache)
+        self.assertEqual(
+            self.metadata_type.get_lookup_values(), ['test1', 'test2']
+        )
@@ -2,6 +2,9 @@ from __future__ import unicode_literals
 
 import magic
 
+# libmagic only looks at the start of the file, read no more than that
+MIMETYPE_READ_SIZE = 1024 * 1024
+
 
 def get_mimetype(file_object, mimetype_only=False):
     """
@@ -9,17 +12,24 @@ def get_mimetype(file_object, mimetype_only=False):
     library via python-magic or fallback to use python's mimetypes
     library
     """
+    data = file_object.read(MIMETYPE_READ_SIZE)
+    file_object.seek(0)
+
+    return get_buffer_mimetype(data=data, mimetype_only=mimetype_only)
+
+
+def get_buffer_mimetype(data, mimetype_only=False):
+    """
+    Determine the mimetype of the initial bytes of a file
+    """
     file_mimetype = None
     file_mime_encoding = None
 
     mime = magic.Magic(mime=True)
-    file_mimetype = mime.from_buffer(file_object.read())
-    file_object.seek(0)
+    file_mimetype = mime.from_buffer(data)
 
     if not mimetype_only:
-        file_object.seek(0)
         mime_encoding = magic.Magic(mime_encoding=True)
-        file_mime_encoding = mime_encoding.from_buffer(file_object.read())
-        file_object.seek(0)
+        file_mime_encoding = mime_encoding.from_buffer(data)
 
     return file_mimetype, file_mime_encoding
@@ -6,9 +6,9 @@ from rest_framework.response import Response
 from documents.models import Document, DocumentPage, DocumentVersion
 from rest_api.permissions import MayanPermission
 
-from .models import DocumentPageContent
+from .models import DocumentPageContent, DocumentVersionOCRRun
 from .permissions import permission_ocr_content_view, permission_ocr_document
-from .serializers import DocumentPageContentSerializer
+from .serializers import DocumentPageContentSerializer, OCRBacklogSerializer
 
 
 class APIDocumentOCRView(generics.GenericAPIView):
@@ -95,3 +95,25 @@ class APIDocumentPageContentView(generics.RetrieveAPIView):
 
         serializer = self.get_serializer(ocr_content)
         return Response(serializer.data)
+
+
+class APIOCRBacklogView(generics.GenericAPIView):
+    mayan_view_permissions = {
+        'GET': (permission_ocr_document,)
+    }
+    permission_classes = (MayanPermission,)
+    serializer_class = OCRBacklogSerializer
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the number of pages and document versions waiting for OCR,
+        the recent OCR rate in pages per minute and the estimated minutes
+        to process the waiting pages. The pages whose OCR started longer
+        than the OCR_RUN_TIMEOUT setting ago without finishing, and their
+        document versions, are also returned apart.
+        """
+
+        serializer = self.get_serializer(
+            DocumentVersionOCRRun.objects.get_backlog()
+        )
+        return Response(serializer.data)
@@ -1,5 +1,6 @@
 from __future__ import unicode_literals
 
+from datetime import timedelta
 import logging
 
 from kombu import Exchange, Queue
@@ -15,35 +16,49 @@ from common import (
 )
 from common.settings import settings_db_sync_task_delay
 from documents.search import document_search, document_page_search
-from documents.signals import post_version_upload
+from documents.signals import post_version_upload, post_version_upload_bulk
 from documents.widgets import document_link
 from mayan.celery import app
 from navigation import SourceColumn
 from rest_api.classes import APIEndPoint
 
-from .handlers import initialize_new_ocr_settings, post_version_upload_ocr
+from .handlers import (
+    index_document_version_content, initialize_new_ocr_settings,
+    post_version_upload_bulk_ocr, post_version_upload_ocr
+)
 from .links import (
     link_document_content, link_document_submit, link_document_submit_all,
     link_document_submit_multiple, link_document_type_ocr_settings,
     link_document_type_submit, link_entry_list
 )
+from .literals import (
+    CHECK_STALE_OCR_RUNS_INTERVAL, OCR_PRIORITY_QUEUES, OCR_PRIORITY_REOCR
+)
 from .permissions import permission_ocr_document, permission_ocr_content_view
+from .signals import post_document_version_ocr
 
 logger = logging.getLogger(__name__)
 
 
-def document_ocr_submit(self):
-    from .tasks import task_do_ocr
+def document_ocr_submit(self, priority=OCR_PRIORITY_REOCR):
+    self.latest_version.submit_for_ocr(priority=priority)
 
-    task_do_ocr.apply_async(args=(self.latest_version.pk,))
 
-
-def document_version_ocr_submit(self):
+def document_version_ocr_submit(self, priority=OCR_PRIORITY_REOCR):
+    from .models import DocumentVersionOCRRun
     from .tasks import task_do_ocr
 
+    # Count the document version in the OCR backlog until its task runs
+    DocumentVersionOCRRun.objects.update_or_create(
+        document_version=self, defaults={
+            'is_prepared': False, 'priority': priority
+        }
+    )
+
     task_do_ocr.apply_async(
-        kwargs={'document_version_pk': self.pk},
-        countdown=settings_db_sync_task_delay.value
+        kwargs={'document_version_pk': self.pk, 'priority': priority},
+        countdown=settings_db_sync_task_delay.value,
+        queue=OCR_PRIORITY_QUEUES[priority]
     )
 
 
@@ -95,8 +110,17 @@ class OCRApp(MayanAppConfig):
             attribute='result'
         )
 
-        app.conf.CELERY_QUEUES.append(
-            Queue('ocr', Exchange('ocr'), routing_key='ocr'),
+        app.conf.CELERY_QUEUES.extend(
+            (
+                Queue('ocr', Exchange('ocr'), routing_key='ocr'),
+                Queue(
+                    'ocr_bulk', Exchange('ocr_bulk'), routing_key='ocr_bulk'
+                ),
+                Queue(
+                    'ocr_reocr', Exchange('ocr_reocr'),
+                    routing_key='ocr_reocr'
+                ),
+            )
         )
 
         app.conf.CELERY_ROUTES.update(
@@ -104,15 +128,36 @@ class OCRApp(MayanAppConfig):
                 'ocr.tasks.task_do_ocr': {
                     'queue': 'ocr'
                 },
+                'ocr.tasks.task_do_ocr_page': {
+                    'queue': 'ocr'
+                },
+                'ocr.tasks.task_check_stale_ocr_runs': {
+                    'queue': 'ocr'
+                },
             }
         )
 
+        app.conf.CELERYBEAT_SCHEDULE.update(
+            {
+                'task_check_stale_ocr_runs': {
+                    'task': 'ocr.tasks.task_check_stale_ocr_runs',
+                    'schedule': timedelta(
+                        seconds=CHECK_STALE_OCR_RUNS_INTERVAL
+                    ),
+                },
+            }
+        )
+
+        DocumentPageContentTerm = self.get_model('DocumentPageContentTerm')
+
         document_search.add_model_field(
-            field='versions__pages__ocr_content__content', label=_('OCR')
+            field='versions__pages__ocr_content__content', label=_('OCR'),
+            query_function=DocumentPageContentTerm.objects.get_search_query
         )
 
         document_page_search.add_model_field(
-            field='ocr_content__content', label=_('OCR')
+            field='ocr_content__content', label=_('OCR'),
+            query_function=DocumentPageContentTerm.objects.get_search_query
         )
 
         menu_facet.bind_links(
@@ -149,3 +194,11 @@ class OCRApp(MayanAppConfig):
             post_version_upload_ocr, dispatch_uid='post_version_upload_ocr',
             sender=DocumentVersion
         )
+        post_version_upload_bulk.connect(
+            post_version_upload_bulk_ocr,
+            dispatch_uid='post_version_upload_bulk_ocr', sender=DocumentVersion
+        )
+        post_document_version_ocr.connect(
+            index_document_version_content,
+            dispatch_uid='index_document_version_content'
+        )
@@ -1,38 +1,128 @@
 from __future__ import absolute_import, unicode_literals
 
 import logging
+import threading
 
 from PIL import Image
 import pyocr
 import pyocr.builders
+from pyocr.libtesseract import tesseract_raw
+
+from documents.settings import setting_language
 
 from ..classes import OCRBackendBase
 from ..exceptions import OCRError
+from ..settings import setting_pyocr_pool_size
 
 logger = logging.getLogger(__name__)
 
 
-class PyOCR(OCRBackendBase):
-    def __init__(self, *args, **kwargs):
-        super(PyOCR, self).__init__(*args, **kwargs)
+class TesseractHandlePool(object):
+    """
+    Keep initialized libtesseract API handles, with the data of their
+    language already loaded, to reuse them for the next pages instead of
+    initializing a new handle per page. Up to size idle handles are kept.
+    """
+    def __init__(self, size):
+        self._handles = {}
+        self._idle_count = 0
+        self._lock = threading.Lock()
+        self.size = size
+
+    def acquire(self, language):
+        with self._lock:
+            if self._handles.get(language):
+                self._idle_count -= 1
+                return self._handles[language].pop()
 
-        self.languages = ()
+        logger.debug('Initializing tesseract handle for language: %s', language)
+        return tesseract_raw.init(lang=language)
 
-        tools = pyocr.get_available_tools()
-        if len(tools) == 0:
-            raise OCRError('No OCR tool found')
+    def discard(self, handle):
+        tesseract_raw.cleanup(handle)
 
-        self.tool = tools[0]
+    def release(self, language, handle):
+        with self._lock:
+            if self._idle_count < self.size:
+                self._handles.setdefault(language, []).append(handle)
+                self._idle_count += 1
+                return
 
-        # The tools are returned in the recommended order of usage
-        for tool in tools:
-            if tool.__name__ == 'pyocr.libtesseract':
-                self.tool = tool
+        self.discard(handle=handle)
 
-        logger.debug('Will use tool \'%s\'', self.tool.get_name())
 
-        self.languages = self.tool.get_available_languages()
-        logger.debug('Available languages: %s', ', '.join(self.languages))
+class PyOCR(OCRBackendBase):
+    _handle_pool = None
+    _languages = None
+    _lock = threading.Lock()
+    _tool = None
+
+    @classmethod
+    def _initialize(cls):
+        # Probing the tools and languages executes programs, do it only once
+        # per process.
+        with cls._lock:
+            if cls._tool:
+                return
+
+            tools = pyocr.get_available_tools()
+            if len(tools) == 0:
+                raise OCRError('No OCR tool found')
+
+            tool = tools[0]
+
+            # The tools are returned in the recommended order of usage
+            for candidate in tools:
+                if candidate.__name__ == 'pyocr.libtesseract':
+                    tool = candidate
+
+            logger.debug('Will use tool \'%s\'', tool.get_name())
+
+            cls._languages = tool.get_available_languages()
+            logger.debug('Available languages: %s', ', '.join(cls._languages))
+
+            if tool.__name__ == 'pyocr.libtesseract' and setting_pyocr_pool_size.value:
+                cls._handle_pool = TesseractHandlePool(
+                    size=setting_pyocr_pool_size.value
+                )
+
+                # Preload the data of the default language
+                if setting_language.value in cls._languages:
+                    cls._handle_pool.release(
+                        language=setting_language.value,
+                        handle=cls._handle_pool.acquire(
+                            language=setting_language.value
+                        )
+                    )
+
+            cls._tool = tool
+
+    def __init__(self, *args, **kwargs):
+        super(PyOCR, self).__init__(*args, **kwargs)
+
+        self._initialize()
+        self.handle_pool = self._handle_pool
+        self.languages = self._languages
+        self.tool = self._tool
+
+    def _image_to_string(self, image):
+        handle = self.handle_pool.acquire(language=self.language)
+        try:
+            tesseract_raw.set_page_seg_mode(
+                handle, pyocr.builders.TextBuilder().tesseract_layout
+            )
+            tesseract_raw.set_image(handle, image)
+            if tesseract_raw.recognize(handle) != 0:
+                raise OCRError('Text recognition failed')
+
+            result = tesseract_raw.get_utf8_text(handle)
+        except:
+            # Don't reuse a handle in an unknown state
+            self.handle_pool.discard(handle=handle)
+            raise
+        else:
+            self.handle_pool.release(language=self.language, handle=handle)
+            return result.strip()
 
     def execute(self, *args, **kwargs):
         """
@@ -42,11 +132,14 @@ class PyOCR(OCRBackendBase):
 
         image = Image.open(self.converter.get_page())
         try:
-            result = self.tool.image_to_string(
-                image,
-                lang=self.language,
-                builder=pyocr.builders.TextBuilder()
-            )
+            if self.handle_pool:
+                result = self._image_to_string(image=image)
+            else:
+                result = self.tool.image_to_string(
+                    image,
+                    lang=self.language,
+                    builder=pyocr.builders.TextBuilder()
+                )
         except Exception as exception:
             error_message = 'Exception calling pyocr with language option: '
             '{}; {}'.format(self.language, exception)
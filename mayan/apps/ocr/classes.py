@@ -1,26 +1,74 @@
 from __future__ import unicode_literals
 
+import hashlib
 import logging
+import threading
+import time
 
+from django.utils.encoding import force_text
 from django.utils.module_loading import import_string
+from django.utils.timezone import now
 
 from converter import converter_class
 from documents.runtime import cache_storage_backend
 
 from .exceptions import NoMIMETypeMatch, ParserError
+from .literals import OCR_CACHE_READ_CHUNK_SIZE
 from .models import DocumentPageContent
 from .parsers import Parser
-from .settings import setting_ocr_backend
+from .settings import (
+    setting_ocr_backend, setting_ocr_cache, setting_text_density_threshold
+)
 
 logger = logging.getLogger(__name__)
 
 
 class TextExtractor(object):
+    _local = threading.local()
+
+    @classmethod
+    def get_ocr_backend(cls):
+        """
+        Return the OCR backend instance of the current thread. Backends keep
+        state while processing a page so an instance is not shared between
+        threads, but it is reused for all the pages a thread processes.
+        """
+        if getattr(cls._local, 'backend_path', None) != setting_ocr_backend.value:
+            cls._local.backend = import_string(setting_ocr_backend.value)()
+            cls._local.backend_path = setting_ocr_backend.value
+
+        return cls._local.backend
+
     @classmethod
     def perform_ocr(cls, document_page):
-        ocr_backend_class = import_string(setting_ocr_backend.value)
-        backend = ocr_backend_class()
-        backend.process_document_page(document_page)
+        cls.get_ocr_backend().process_document_page(document_page)
+
+    @classmethod
+    def has_text(cls, document_page):
+        """
+        Return True if the parsed text of a page has enough characters for
+        the page to not need OCR.
+        """
+        try:
+            content = force_text(document_page.ocr_content.content)
+        except DocumentPageContent.DoesNotExist:
+            return False
+
+        return len(''.join(content.split())) >= setting_text_density_threshold.value
+
+    @classmethod
+    def parse_document_page(cls, document_page):
+        """
+        Try parsing the text of a document version's page. Return False if
+        there are no parsers for the MIME type or if the parser returned
+        too little text and the page needs to be OCR'ed.
+        """
+        try:
+            Parser.parse_document_page(document_page=document_page)
+        except (NoMIMETypeMatch, ParserError):
+            return False
+        else:
+            return cls.has_text(document_page=document_page)
 
     @classmethod
     def process_document_page(cls, document_page):
@@ -29,19 +77,44 @@ class TextExtractor(object):
         no there are not parsers for the MIME type or the parser return nothing
         fallback to doing and OCR of the page.
         """
+        if not cls.parse_document_page(document_page=document_page):
+            cls.perform_ocr(document_page=document_page)
 
+    @classmethod
+    def prepare_document_version(cls, document_version):
+        """
+        Parse the text of all the pages of a document version in a single
+        pass and return the pages that need to be OCR'ed, with their images
+        already rendered.
+        """
         try:
-            Parser.parse_document_page(document_page=document_page)
+            Parser.parse_document_version(document_version=document_version)
         except (NoMIMETypeMatch, ParserError):
-            cls.perform_ocr(document_page=document_page)
+            document_pages = list(document_version.pages.all())
         else:
-            if not document_page.ocr_content.content:
-                cls.perform_ocr(document_page=document_page)
+            document_pages = [
+                document_page for document_page in document_version.pages.select_related('ocr_content') if not cls.has_text(document_page=document_page)
+            ]
+
+        if document_pages:
+            # Render the images of the pages to OCR in a single pass, if
+            # this fails the pages will be rendered one at a time.
+            try:
+                document_version.generate_page_images(
+                    document_pages=document_pages
+                )
+            except Exception as exception:
+                logger.warning(
+                    'Error generating the page images of document version: '
+                    '%s; %s', document_version, exception
+                )
+
+        return document_pages
 
     @classmethod
     def process_document_version(cls, document_version):
-        for document_page in document_version.pages.all():
-            cls.process_document_page(document_page=document_page)
+        for document_page in cls.prepare_document_version(document_version=document_version):
+            cls.perform_ocr(document_page=document_page)
 
 
 class OCRBackendBase(object):
@@ -52,27 +125,76 @@ class OCRBackendBase(object):
         for document_page in document_version.pages.all():
             self.process_document_page(document_page=document_page)
 
+    def get_cache_key(self, file_object, language):
+        """
+        Return the key identifying the OCR result of a page image, made of
+        the hash of the image content, the language and the backend.
+        """
+        hash_object = hashlib.sha256()
+        for chunk in iter(lambda: file_object.read(OCR_CACHE_READ_CHUNK_SIZE), b''):
+            hash_object.update(chunk)
+
+        return hashlib.sha256(
+            '{}.{}:{}:{}'.format(
+                self.__class__.__module__, self.__class__.__name__,
+                language, hash_object.hexdigest()
+            ).encode('utf-8')
+        ).hexdigest()
+
     def process_document_page(self, document_page):
         logger.info(
             'Processing page: %d of document version: %s',
             document_page.page_number, document_page.document_version
         )
 
+        time_start = time.time()
         cache_filename = document_page.generate_image()
+        time_image = time.time()
+        language = document_page.document.language
 
         with cache_storage_backend.open(cache_filename) as file_object:
             document_page_content, created = DocumentPageContent.objects.get_or_create(
                 document_page=document_page
             )
-            document_page_content.content = self.execute(
-                file_object=file_object,
-                language=document_page.document.language
-            )
+
+            content = None
+            if setting_ocr_cache.value:
+                document_page_content.cache_key = self.get_cache_key(
+                    file_object=file_object, language=language
+                )
+                file_object.seek(0)
+
+                # Reuse the result of an identical page
+                content = DocumentPageContent.objects.filter(
+                    cache_key=document_page_content.cache_key
+                ).exclude(pk=document_page_content.pk).values_list(
+                    'content', flat=True
+                ).first()
+            else:
+                document_page_content.cache_key = ''
+
+            if content is None:
+                content = self.execute(
+                    file_object=file_object, language=language
+                )
+            else:
+                logger.debug(
+                    'Using the OCR result of an identical page for page: %d '
+                    'of document version: %s', document_page.page_number,
+                    document_page.document_version
+                )
+
+            document_page_content.content = content
+            document_page_content.datetime_processed = now()
             document_page_content.save()
 
+        time_end = time.time()
+
         logger.info(
-            'Finished processing page: %d of document version: %s',
-            document_page.page_number, document_page.document_version
+            'Finished processing page: %d of document version: %s in %.2f '
+            'seconds (image: %.2f, OCR: %.2f)', document_page.page_number,
+            document_page.document_version, time_end - time_start,
+            time_image - time_start, time_end - time_image
         )
 
     def execute(self, file_object, language=None, transformations=None):
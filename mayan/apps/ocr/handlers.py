@@ -4,6 +4,7 @@ import logging
 
 from django.apps import apps
 
+from .literals import OCR_PRIORITY_BULK, OCR_PRIORITY_INTERACTIVE
 from .settings import setting_auto_ocr
 
 logger = logging.getLogger(__name__)
@@ -13,7 +14,40 @@ def post_version_upload_ocr(sender, instance, **kwargs):
     logger.debug('received post_version_upload')
     logger.debug('instance pk: %s', instance.pk)
     if instance.document.document_type.ocr_settings.auto_ocr:
-        instance.submit_for_ocr()
+        # Documents uploaded by a user are OCR'ed ahead of the ones
+        # uploaded by the sources checked periodically
+        if kwargs.get('user'):
+            instance.submit_for_ocr(priority=OCR_PRIORITY_INTERACTIVE)
+        else:
+            instance.submit_for_ocr(priority=OCR_PRIORITY_BULK)
+
+
+def post_version_upload_bulk_ocr(sender, instances, **kwargs):
+    DocumentTypeSettings = apps.get_model(
+        app_label='ocr', model_name='DocumentTypeSettings'
+    )
+
+    auto_ocr_document_type_ids = set(
+        DocumentTypeSettings.objects.filter(
+            auto_ocr=True, document_type__in=set(
+                instance.document.document_type_id for instance in instances
+            )
+        ).values_list('document_type', flat=True)
+    )
+
+    for instance in instances:
+        if instance.document.document_type_id in auto_ocr_document_type_ids:
+            instance.submit_for_ocr(priority=OCR_PRIORITY_BULK)
+
+
+def index_document_version_content(sender, instance, **kwargs):
+    DocumentPageContentTerm = apps.get_model(
+        app_label='ocr', model_name='DocumentPageContentTerm'
+    )
+
+    DocumentPageContentTerm.objects.index_document_version(
+        document_version=instance
+    )
 
 
 def initialize_new_ocr_settings(sender, instance, **kwargs):
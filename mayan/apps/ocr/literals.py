@@ -1,4 +1,31 @@
 from __future__ import unicode_literals
 
+from django.utils.translation import ugettext_lazy as _
+
+CHECK_STALE_OCR_RUNS_INTERVAL = 60 * 10  # 10 minutes
 DO_OCR_RETRY_DELAY = 10
 LOCK_EXPIRE = 60 * 10  # Adjust to worst case scenario
+OCR_BACKLOG_RATE_WINDOW = 60 * 15  # 15 minutes
+OCR_CACHE_READ_CHUNK_SIZE = 1024 * 1024
+OCR_PAGE_MAXIMUM_STARTS = 3
+
+# Content index
+TERM_MAXIMUM_LENGTH = 64
+TERM_QUERY_CHUNK_SIZE = 500
+
+# Priority classes of the OCR work and their queues
+OCR_PRIORITY_BULK = 'bulk'
+OCR_PRIORITY_INTERACTIVE = 'interactive'
+OCR_PRIORITY_REOCR = 'reocr'
+
+OCR_PRIORITY_CHOICES = (
+    (OCR_PRIORITY_BULK, _('Bulk')),
+    (OCR_PRIORITY_INTERACTIVE, _('Interactive')),
+    (OCR_PRIORITY_REOCR, _('Re-OCR')),
+)
+
+OCR_PRIORITY_QUEUES = {
+    OCR_PRIORITY_BULK: 'ocr_bulk',
+    OCR_PRIORITY_INTERACTIVE: 'ocr',
+    OCR_PRIORITY_REOCR: 'ocr_reocr',
+}
@@ -0,0 +1,17 @@
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand
+
+from documents.models import DocumentVersion
+
+from ...models import DocumentPageContentTerm
+
+
+class Command(BaseCommand):
+    help = 'Build the OCR content search index of all document versions'
+
+    def handle(self, *args, **options):
+        for document_version in DocumentVersion.objects.iterator():
+            DocumentPageContentTerm.objects.index_document_version(
+                document_version=document_version
+            )
@@ -0,0 +1,234 @@
+from __future__ import unicode_literals
+
+import logging
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from .literals import (
+    OCR_BACKLOG_RATE_WINDOW, TERM_MAXIMUM_LENGTH, TERM_QUERY_CHUNK_SIZE
+)
+from .settings import setting_backlog_threshold, setting_run_timeout
+
+logger = logging.getLogger(__name__)
+
+CONTENT_FIELD_NAME = 'ocr_content__content'
+TERM_REGEX = re.compile(r'\w+', re.UNICODE)
+
+
+class DocumentPageContentTermManager(models.Manager):
+    def get_search_query(self, field, term):
+        """
+        Return a query matching the document pages whose content has a
+        word starting with every word of the search term. Words are matched
+        against the start of the index terms, which can use the index of
+        the term values on every database, instead of scanning the content
+        of every page.
+        """
+        words = TERM_REGEX.findall(term.lower())
+        values = self.get_values(text=term)
+
+        if not values or not field.endswith(CONTENT_FIELD_NAME):
+            return Q(**{'{}__icontains'.format(field): term})
+
+        document_page_field = '{}pk__in'.format(
+            field[:-len(CONTENT_FIELD_NAME)]
+        )
+        DocumentPageTerm = self.model.document_pages.through
+
+        query = Q()
+        for value in values:
+            query &= Q(
+                **{
+                    document_page_field: DocumentPageTerm.objects.filter(
+                        documentpagecontentterm__value__startswith=value
+                    ).values('documentpage_id')
+                }
+            )
+
+        if len(words) > 1 or len(words[0]) > TERM_MAXIMUM_LENGTH:
+            # Multiple word terms must still match as a phrase, and words
+            # longer than the index terms must match in full.
+            query &= Q(**{'{}__icontains'.format(field): term})
+
+        return query
+
+    def get_values(self, text):
+        """
+        Split a text into its unique, lowercase words. Words longer than
+        the maximum term length are truncated.
+        """
+        return set(
+            value[:TERM_MAXIMUM_LENGTH] for value in TERM_REGEX.findall(text.lower())
+        )
+
+    def index_document_version(self, document_version):
+        """
+        Replace the index entries of all the pages of a document version
+        with the terms of their current content
+        """
+        DocumentPageContent = apps.get_model(
+            app_label='ocr', model_name='DocumentPageContent'
+        )
+        DocumentPageTerm = self.model.document_pages.through
+
+        page_values = {}
+        for document_page_id, content in DocumentPageContent.objects.filter(document_page__document_version=document_version).values_list('document_page_id', 'content'):
+            page_values[document_page_id] = self.get_values(text=content)
+
+        term_ids = self._get_term_ids(
+            values=set().union(*page_values.values())
+        )
+
+        with transaction.atomic():
+            DocumentPageTerm.objects.filter(
+                documentpage__document_version=document_version
+            ).delete()
+
+            DocumentPageTerm.objects.bulk_create(
+                [
+                    DocumentPageTerm(
+                        documentpage_id=document_page_id,
+                        documentpagecontentterm_id=term_ids[value]
+                    ) for document_page_id, values in page_values.items() for value in values
+                ], batch_size=TERM_QUERY_CHUNK_SIZE
+            )
+
+        logger.debug(
+            'Indexed %d terms of document version: %s', len(term_ids),
+            document_version
+        )
+
+    def _get_term_ids(self, values):
+        values = list(values)
+        result = {}
+
+        for index in range(0, len(values), TERM_QUERY_CHUNK_SIZE):
+            chunk = values[index:index + TERM_QUERY_CHUNK_SIZE]
+
+            result.update(
+                self.filter(value__in=chunk).values_list('value', 'pk')
+            )
+
+            missing_values = [value for value in chunk if value not in result]
+
+            try:
+                with transaction.atomic():
+                    self.bulk_create(
+                        [self.model(value=value) for value in missing_values]
+                    )
+            except IntegrityError:
+                # Another process created some of the same terms, fallback
+                # to creating the rest one at a time
+                for value in missing_values:
+                    self.get_or_create(value=value)
+
+            result.update(
+                self.filter(value__in=missing_values).values_list(
+                    'value', 'pk'
+                )
+            )
+
+        return result
+
+
+class DocumentVersionOCRRunManager(models.Manager):
+    def get_backlog(self):
+        """
+        Return the number of pages and document versions waiting for OCR,
+        the number of pages processed per minute recently and the
+        estimated number of minutes to process the waiting pages. The
+        pages whose OCR started and didn't finish in time, and their
+        document versions, are also counted apart.
+        """
+        DocumentPageContent = apps.get_model(
+            app_label='ocr', model_name='DocumentPageContent'
+        )
+        DocumentVersionOCRRunPage = apps.get_model(
+            app_label='ocr', model_name='DocumentVersionOCRRunPage'
+        )
+
+        page_count = self.get_page_count()
+        processed_count = DocumentPageContent.objects.filter(
+            datetime_processed__gte=now() - timedelta(
+                seconds=OCR_BACKLOG_RATE_WINDOW
+            )
+        ).count()
+        pages_per_minute = processed_count * 60.0 / OCR_BACKLOG_RATE_WINDOW
+
+        if pages_per_minute:
+            estimated_minutes = page_count / pages_per_minute
+        elif page_count:
+            # Nothing processed recently, the workers might be stopped
+            estimated_minutes = None
+        else:
+            estimated_minutes = 0
+
+        return {
+            'document_version_count': self.count(),
+            'estimated_minutes': estimated_minutes,
+            'page_count': page_count,
+            'pages_per_minute': pages_per_minute,
+            'stale_document_version_count': self.get_stale().count(),
+            'stale_page_count': DocumentVersionOCRRunPage.objects.get_stale().count(),
+        }
+
+    def get_stale(self):
+        """
+        Return the runs with pages whose OCR started more than
+        OCR_RUN_TIMEOUT seconds ago and didn't finish
+        """
+        DocumentVersionOCRRunPage = apps.get_model(
+            app_label='ocr', model_name='DocumentVersionOCRRunPage'
+        )
+
+        return self.filter(
+            pk__in=DocumentVersionOCRRunPage.objects.get_stale().values(
+                'ocr_run_id'
+            )
+        )
+
+    def get_page_count(self):
+        """
+        Return the number of pages waiting for OCR: the pending pages of
+        the prepared runs and all the pages of the document versions whose
+        OCR is queued but not prepared yet.
+        """
+        DocumentPage = apps.get_model(
+            app_label='documents', model_name='DocumentPage'
+        )
+        DocumentVersionOCRRunPage = apps.get_model(
+            app_label='ocr', model_name='DocumentVersionOCRRunPage'
+        )
+
+        return DocumentVersionOCRRunPage.objects.count() + DocumentPage.objects.filter(
+            document_version__ocr_run__is_prepared=False
+        ).count()
+
+    def is_backlogged(self):
+        """
+        Return True when more pages than the OCR_BACKLOG_THRESHOLD setting
+        are waiting for OCR, whatever the time they have been waiting.
+        """
+        threshold = setting_backlog_threshold.value
+
+        return bool(threshold) and self.get_page_count() > threshold
+
+
+class DocumentVersionOCRRunPageManager(models.Manager):
+    def get_stale(self):
+        """
+        Return the pages whose OCR started more than OCR_RUN_TIMEOUT
+        seconds ago and didn't finish, because the worker processing them
+        stopped. The pages whose tasks didn't start yet are never stale,
+        however long the queues are.
+        """
+        return self.filter(
+            datetime_started__lt=now() - timedelta(
+                seconds=setting_run_timeout.value
+            )
+        )
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-18 18:38
+from __future__ import unicode_literals
+
+from django.db import DatabaseError, migrations, models, transaction
+
+
+def create_postgresql_content_index(apps, schema_editor):
+    # On PostgreSQL, also index the content with trigrams so that the case
+    # insensitive containment queries used for phrases can use an index.
+    if schema_editor.connection.vendor == 'postgresql':
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+                schema_editor.execute(
+                    'CREATE INDEX ocr_documentpagecontent_content_trgm ON '
+                    'ocr_documentpagecontent USING gin '
+                    '(UPPER(content) gin_trgm_ops)'
+                )
+        except DatabaseError:
+            # The pg_trgm extension is not available
+            pass
+
+
+def remove_postgresql_content_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'DROP INDEX IF EXISTS ocr_documentpagecontent_content_trgm'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0038_auto_20261018_1817'),
+        ('ocr', '0004_documenttypesettings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentPageContentTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=64, unique=True, verbose_name='Value')),
+                ('document_pages', models.ManyToManyField(related_name='ocr_content_terms', to='documents.DocumentPage', verbose_name='Document pages')),
+            ],
+            options={
+                'verbose_name': 'Document page content term',
+                'verbose_name_plural': 'Document page content terms',
+            },
+        ),
+        migrations.RunPython(
+            create_postgresql_content_index,
+            reverse_code=remove_postgresql_content_index
+        ),
+    ]
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-18 21:40
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0038_auto_20261018_1817'),
+        ('ocr', '0005_documentpagecontentterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentVersionOCRRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datetime_started', models.DateTimeField(auto_now_add=True, verbose_name='Date time started')),
+                ('document_pages', models.ManyToManyField(related_name='ocr_runs', to='documents.DocumentPage', verbose_name='Pending document pages')),
+                ('document_version', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ocr_run', to='documents.DocumentVersion', verbose_name='Document version')),
+            ],
+            options={
+                'verbose_name': 'Document version OCR run',
+                'verbose_name_plural': 'Document version OCR runs',
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-18 22:10
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr', '0006_documentversionocrrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentpagecontent',
+            name='cache_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Hash of the page image, language and OCR backend used to reuse the OCR result for identical pages.', max_length=64, verbose_name='Cache key'),
+        ),
+    ]
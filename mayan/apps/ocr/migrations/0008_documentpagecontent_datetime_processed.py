@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-18 23:41
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr', '0007_documentpagecontent_cache_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentpagecontent',
+            name='datetime_processed',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True, verbose_name='Date time processed'),
+        ),
+    ]
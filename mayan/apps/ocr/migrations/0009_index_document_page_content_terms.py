@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Formerly indexed the existing OCR content while migrating, which is too
+    slow and uses too much memory for large installations. The content is
+    now indexed after upgrading with the indexocrcontent management command.
+    """
+
+    dependencies = [
+        ('ocr', '0008_documentpagecontent_datetime_processed'),
+    ]
+
+    operations = []
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-19 09:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr', '0009_index_document_page_content_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentversionocrrun',
+            name='priority',
+            field=models.CharField(choices=[('bulk', 'Bulk'), ('interactive', 'Interactive'), ('reocr', 'Re-OCR')], default='interactive', max_length=16, verbose_name='Priority'),
+        ),
+        migrations.AddField(
+            model_name='documentversionocrrun',
+            name='requeue_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Requeue count'),
+        ),
+        migrations.AlterField(
+            model_name='documentversionocrrun',
+            name='datetime_started',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Date time started'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-19 12:30
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr', '0010_auto_20261019_0912'),
+    ]
+
+    operations = [
+        # Turn the table of the pending pages into an explicit model, the
+        # table and its columns are kept as they are.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='DocumentVersionOCRRunPage',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('document_page', models.ForeignKey(db_column='documentpage_id', on_delete=django.db.models.deletion.CASCADE, related_name='ocr_run_pages', to='documents.DocumentPage', verbose_name='Document page')),
+                        ('ocr_run', models.ForeignKey(db_column='documentversionocrrun_id', on_delete=django.db.models.deletion.CASCADE, related_name='run_pages', to='ocr.DocumentVersionOCRRun', verbose_name='OCR run')),
+                    ],
+                    options={
+                        'db_table': 'ocr_documentversionocrrun_document_pages',
+                        'verbose_name': 'Document version OCR run page',
+                        'verbose_name_plural': 'Document version OCR run pages',
+                    },
+                ),
+                migrations.AlterUniqueTogether(
+                    name='documentversionocrrunpage',
+                    unique_together=set([('ocr_run', 'document_page')]),
+                ),
+                migrations.AlterField(
+                    model_name='documentversionocrrun',
+                    name='document_pages',
+                    field=models.ManyToManyField(related_name='ocr_runs', through='ocr.DocumentVersionOCRRunPage', to='documents.DocumentPage', verbose_name='Pending document pages'),
+                ),
+            ]
+        ),
+        migrations.AddField(
+            model_name='documentversionocrrunpage',
+            name='datetime_started',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Date time started'),
+        ),
+        migrations.AddField(
+            model_name='documentversionocrrunpage',
+            name='start_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Start count'),
+        ),
+        migrations.RemoveField(
+            model_name='documentversionocrrun',
+            name='requeue_count',
+        ),
+    ]
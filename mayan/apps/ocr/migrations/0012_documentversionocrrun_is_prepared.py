@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-19 13:05
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr', '0011_documentversionocrrunpage'),
+    ]
+
+    operations = [
+        # Existing runs were created with their pending pages
+        migrations.AddField(
+            model_name='documentversionocrrun',
+            name='is_prepared',
+            field=models.BooleanField(default=True, help_text='Whether the pages of the document version that need OCR were determined and their tasks queued.', verbose_name='Is prepared'),
+            preserve_default=False,
+        ),
+    ]
@@ -6,6 +6,14 @@ from django.utils.translation import ugettext_lazy as _
 
 from documents.models import DocumentPage, DocumentType, DocumentVersion
 
+from .literals import (
+    OCR_PRIORITY_CHOICES, OCR_PRIORITY_INTERACTIVE, TERM_MAXIMUM_LENGTH
+)
+from .managers import (
+    DocumentPageContentTermManager, DocumentVersionOCRRunManager,
+    DocumentVersionOCRRunPageManager
+)
+
 
 class DocumentTypeSettings(models.Model):
     """
@@ -44,6 +52,84 @@ class DocumentVersionOCRError(models.Model):
         verbose_name_plural = _('Document Version OCR Errors')
 
 
+@python_2_unicode_compatible
+class DocumentVersionOCRRun(models.Model):
+    """
+    Track the pages of a document version still being OCR'ed by the page
+    tasks. The run is created unprepared when the OCR of the document
+    version is queued and is prepared with its pending pages by the OCR
+    task. The run is deleted by the task that processes its last page.
+    """
+    document_version = models.OneToOneField(
+        DocumentVersion, related_name='ocr_run',
+        verbose_name=_('Document version')
+    )
+    datetime_started = models.DateTimeField(
+        auto_now_add=True, db_index=True, verbose_name=_('Date time started')
+    )
+    document_pages = models.ManyToManyField(
+        DocumentPage, related_name='ocr_runs',
+        through='DocumentVersionOCRRunPage',
+        verbose_name=_('Pending document pages')
+    )
+    priority = models.CharField(
+        choices=OCR_PRIORITY_CHOICES, default=OCR_PRIORITY_INTERACTIVE,
+        max_length=16, verbose_name=_('Priority')
+    )
+    is_prepared = models.BooleanField(
+        default=False, help_text=_(
+            'Whether the pages of the document version that need OCR were '
+            'determined and their tasks queued.'
+        ), verbose_name=_('Is prepared')
+    )
+
+    objects = DocumentVersionOCRRunManager()
+
+    def __str__(self):
+        return unicode(self.document_version)
+
+    class Meta:
+        verbose_name = _('Document version OCR run')
+        verbose_name_plural = _('Document version OCR runs')
+
+
+@python_2_unicode_compatible
+class DocumentVersionOCRRunPage(models.Model):
+    """
+    Page pending in an OCR run. The start date time is set when a page
+    task starts the OCR of the page. Pages waiting in the queues have no
+    start date time, pages started long ago without finishing were lost
+    by a worker that stopped.
+    """
+    ocr_run = models.ForeignKey(
+        DocumentVersionOCRRun, db_column='documentversionocrrun_id',
+        on_delete=models.CASCADE, related_name='run_pages',
+        verbose_name=_('OCR run')
+    )
+    document_page = models.ForeignKey(
+        DocumentPage, db_column='documentpage_id', on_delete=models.CASCADE,
+        related_name='ocr_run_pages', verbose_name=_('Document page')
+    )
+    datetime_started = models.DateTimeField(
+        blank=True, db_index=True, null=True,
+        verbose_name=_('Date time started')
+    )
+    start_count = models.PositiveIntegerField(
+        default=0, verbose_name=_('Start count')
+    )
+
+    objects = DocumentVersionOCRRunPageManager()
+
+    def __str__(self):
+        return unicode(self.document_page)
+
+    class Meta:
+        db_table = 'ocr_documentversionocrrun_document_pages'
+        unique_together = ('ocr_run', 'document_page')
+        verbose_name = _('Document version OCR run page')
+        verbose_name_plural = _('Document version OCR run pages')
+
+
 @python_2_unicode_compatible
 class DocumentPageContent(models.Model):
     """
@@ -54,6 +140,16 @@ class DocumentPageContent(models.Model):
         verbose_name=_('Document page')
     )
     content = models.TextField(blank=True, verbose_name=_('Content'))
+    cache_key = models.CharField(
+        blank=True, db_index=True, editable=False, help_text=_(
+            'Hash of the page image, language and OCR backend used to reuse '
+            'the OCR result for identical pages.'
+        ), max_length=64, verbose_name=_('Cache key')
+    )
+    datetime_processed = models.DateTimeField(
+        blank=True, db_index=True, editable=False, null=True,
+        verbose_name=_('Date time processed')
+    )
 
     def __str__(self):
         return unicode(self.document_page)
@@ -61,3 +157,27 @@ class DocumentPageContent(models.Model):
     class Meta:
         verbose_name = _('Document page content')
         verbose_name_plural = _('Document pages contents')
+
+
+@python_2_unicode_compatible
+class DocumentPageContentTerm(models.Model):
+    """
+    Inverted index entry linking a word to the document pages whose content
+    contains it
+    """
+    value = models.CharField(
+        max_length=TERM_MAXIMUM_LENGTH, unique=True, verbose_name=_('Value')
+    )
+    document_pages = models.ManyToManyField(
+        DocumentPage, related_name='ocr_content_terms',
+        verbose_name=_('Document pages')
+    )
+
+    objects = DocumentPageContentTermManager()
+
+    def __str__(self):
+        return self.value
+
+    class Meta:
+        verbose_name = _('Document page content term')
+        verbose_name_plural = _('Document page content terms')
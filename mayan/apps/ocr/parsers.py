@@ -9,6 +9,7 @@ from pdfminer.converter import TextConverter
 from pdfminer.layout import LAParams
 import subprocess
 
+from django.db import transaction
 from django.utils.translation import ugettext_lazy as _
 
 from common.utils import copyfile, fs_cleanup, mkstemp
@@ -73,13 +74,51 @@ class Parser(object):
             raise NoMIMETypeMatch
 
     def process_document_version(self, document_version):
+        """
+        Parse the text of all the pages of a document version with a single
+        pass over the file and store the contents in bulk.
+        """
         logger.info(
             'Starting parsing for document version: %s', document_version
         )
         logger.debug('document version: %d', document_version.pk)
 
-        for document_page in document_version.pages.all():
-            self.process_document_page(document_page=document_page)
+        document_pages = list(document_version.pages.all())
+        file_object = document_version.get_intermidiate_file()
+
+        try:
+            contents = self.execute_document(
+                file_object=file_object, page_count=len(document_pages)
+            )
+        except Exception as exception:
+            error_message = _('Exception parsing document; %s') % exception
+            logger.error(error_message)
+            raise ParserError(error_message)
+        finally:
+            file_object.close()
+
+        if len(contents) != len(document_pages):
+            error_message = _(
+                'Parser returned %(contents)d pages instead of %(pages)d'
+            ) % {'contents': len(contents), 'pages': len(document_pages)}
+            logger.error(error_message)
+            raise ParserError(error_message)
+
+        with transaction.atomic():
+            DocumentPageContent.objects.filter(
+                document_page__in=document_pages
+            ).delete()
+            DocumentPageContent.objects.bulk_create(
+                [
+                    DocumentPageContent(
+                        content=content, document_page=document_page
+                    ) for document_page, content in zip(document_pages, contents)
+                ]
+            )
+
+        logger.info(
+            'Finished parsing document version: %s', document_version
+        )
 
     def process_document_page(self, document_page):
         logger.info(
@@ -96,6 +135,8 @@ class Parser(object):
             document_page_content.content = self.execute(
                 file_object=file_object, page_number=document_page.page_number
             )
+            # Parsed text is not an OCR result
+            document_page_content.cache_key = ''
             document_page_content.save()
         except Exception as exception:
             error_message = _('Exception parsing page; %s') % exception
@@ -115,6 +156,20 @@ class Parser(object):
             self.__class__.__name__
         )
 
+    def execute_document(self, file_object, page_count):
+        """
+        Return a list with the text of every page. Parsers able to extract
+        the text of all the pages in a single pass override this method.
+        """
+        result = []
+        for page_number in range(1, page_count + 1):
+            file_object.seek(0)
+            result.append(
+                self.execute(file_object=file_object, page_number=page_number)
+            )
+
+        return result
+
 
 class PopplerParser(Parser):
     """
@@ -132,34 +187,43 @@ class PopplerParser(Parser):
 
         logger.debug('self.pdftotext_path: %s', self.pdftotext_path)
 
-    def execute(self, file_object, page_number):
-        logger.debug('Parsing PDF page: %d', page_number)
-
+    def _run_pdftotext(self, file_object, page_number=None):
         destination_descriptor, temp_filepath = mkstemp()
-        copyfile(file_object, temp_filepath)
-
-        command = []
-        command.append(self.pdftotext_path)
-        command.append('-f')
-        command.append(str(page_number))
-        command.append('-l')
-        command.append(str(page_number))
-        command.append(temp_filepath)
-        command.append('-')
-
-        proc = subprocess.Popen(
-            command, close_fds=True, stderr=subprocess.PIPE,
-            stdout=subprocess.PIPE
-        )
-        return_code = proc.wait()
-        if return_code != 0:
-            logger.error(proc.stderr.readline())
+
+        try:
+            copyfile(file_object, temp_filepath)
+
+            command = []
+            command.append(self.pdftotext_path)
+            if page_number:
+                command.append('-f')
+                command.append(str(page_number))
+                command.append('-l')
+                command.append(str(page_number))
+            command.append(temp_filepath)
+            command.append('-')
+
+            proc = subprocess.Popen(
+                command, close_fds=True, stderr=subprocess.PIPE,
+                stdout=subprocess.PIPE
+            )
+            # Read both pipes until the process ends, malformed documents
+            # can produce enough errors to fill the error pipe.
+            output, errors = proc.communicate()
+            if proc.returncode != 0:
+                logger.error(errors.partition(b'\n')[0])
+                raise ParserError
+        finally:
             fs_cleanup(temp_filepath, file_descriptor=destination_descriptor)
 
-            raise ParserError
+        return output
 
-        output = proc.stdout.read()
-        fs_cleanup(temp_filepath, file_descriptor=destination_descriptor)
+    def execute(self, file_object, page_number):
+        logger.debug('Parsing PDF page: %d', page_number)
+
+        output = self._run_pdftotext(
+            file_object=file_object, page_number=page_number
+        )
 
         if output == b'\x0c':
             logger.debug('Parser didn\'t return any output')
@@ -170,6 +234,19 @@ class PopplerParser(Parser):
 
         return output
 
+    def execute_document(self, file_object, page_count):
+        logger.debug('Parsing PDF document')
+
+        # pdftotext ends the text of every page with a form feed
+        result = []
+        for content in self._run_pdftotext(file_object=file_object).split(b'\x0c')[:-1]:
+            if content[-2:] == b'\x0a\x0a':
+                content = content[:-2]
+
+            result.append(content)
+
+        return result
+
 
 class PDFMinerParser(Parser):
     """
@@ -195,6 +272,28 @@ class PDFMinerParser(Parser):
 
             return string_buffer.getvalue()
 
+    def execute_document(self, file_object, page_count):
+        logger.debug('Parsing PDF document')
+
+        # Share the resource manager to parse the fonts of the document
+        # only once
+        rsrcmgr = PDFResourceManager()
+        result = []
+        for page in PDFPage.get_pages(file_object):
+            with BytesIO() as string_buffer:
+                device = TextConverter(
+                    rsrcmgr, outfp=string_buffer, laparams=LAParams()
+                )
+                interpreter = PDFPageInterpreter(rsrcmgr, device)
+                interpreter.process_page(page)
+                device.close()
+
+                result.append(string_buffer.getvalue())
+
+        logger.debug('Finished parsing PDF document')
+
+        return result
+
 
 Parser.register(
     mimetypes=('application/pdf',),
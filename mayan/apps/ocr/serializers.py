@@ -9,3 +9,12 @@ class DocumentPageContentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('content',)
         model = DocumentPageContent
+
+
+class OCRBacklogSerializer(serializers.Serializer):
+    document_version_count = serializers.IntegerField(read_only=True)
+    estimated_minutes = serializers.FloatField(read_only=True)
+    page_count = serializers.IntegerField(read_only=True)
+    pages_per_minute = serializers.FloatField(read_only=True)
+    stale_document_version_count = serializers.IntegerField(read_only=True)
+    stale_page_count = serializers.IntegerField(read_only=True)
@@ -18,9 +18,53 @@ setting_ocr_backend = namespace.add_setting(
     global_name='OCR_BACKEND', default='ocr.backends.pyocr.PyOCR',
     help_text=_('Full path to the backend to be used to do OCR.')
 )
+setting_ocr_cache = namespace.add_setting(
+    global_name='OCR_CACHE', default=True,
+    help_text=_(
+        'Reuse the OCR result of pages with an identical image, language '
+        'and OCR backend instead of doing the OCR of the page again.'
+    )
+)
 setting_auto_ocr = namespace.add_setting(
     global_name='OCR_AUTO_OCR', default=True,
     help_text=_(
         'Set new document types to perform OCR automatically by default.'
     )
 )
+setting_pyocr_pool_size = namespace.add_setting(
+    global_name='OCR_PYOCR_POOL_SIZE', default=2,
+    help_text=_(
+        'Maximum number of initialized Tesseract engines, with the data of '
+        'their language loaded, kept by each worker process for reuse '
+        'between pages. Set to 0 to initialize an engine for every page.'
+    )
+)
+setting_text_density_threshold = namespace.add_setting(
+    global_name='OCR_TEXT_DENSITY_THRESHOLD', default=1,
+    help_text=_(
+        'Minimum number of non blank characters that the text parsed from a '
+        'page must have for the page to be considered as having a text '
+        'layer and not be OCR\'ed. Increase it to OCR the scanned pages '
+        'whose text layer contains only short text, like page numbers.'
+    )
+)
+setting_backlog_threshold = namespace.add_setting(
+    global_name='OCR_BACKLOG_THRESHOLD', default=1000,
+    help_text=_(
+        'Number of pages waiting for OCR above which the sources that are '
+        'checked periodically, like watch folders and email accounts, are '
+        'not checked until the backlog is reduced. Set to 0 to always check '
+        'them.'
+    )
+)
+setting_run_timeout = namespace.add_setting(
+    global_name='OCR_RUN_TIMEOUT', default=60 * 60,
+    help_text=_(
+        'Seconds after which a page whose OCR started and didn\'t finish is '
+        'queued again, in case its task was lost by a worker that stopped. '
+        'Pages whose tasks are still waiting in the queues are never queued '
+        'again. The OCR of the document version is aborted and recorded as '
+        'an error when the OCR of one of its pages is started 3 times '
+        'without finishing.'
+    )
+)
@@ -5,81 +5,240 @@ import sys
 import traceback
 
 from django.conf import settings
-from django.db import OperationalError
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import F
+from django.utils.timezone import now
 
-from documents.models import DocumentVersion
+from documents.models import DocumentPage, DocumentVersion
 from lock_manager import LockError
 from lock_manager.runtime import locking_backend
 from mayan.celery import app
 
 from .classes import TextExtractor
-from .literals import DO_OCR_RETRY_DELAY, LOCK_EXPIRE
-from .models import DocumentVersionOCRError
+from .exceptions import OCRError
+from .literals import (
+    DO_OCR_RETRY_DELAY, LOCK_EXPIRE, OCR_PAGE_MAXIMUM_STARTS,
+    OCR_PRIORITY_INTERACTIVE, OCR_PRIORITY_QUEUES
+)
+from .models import (
+    DocumentVersionOCRError, DocumentVersionOCRRun, DocumentVersionOCRRunPage
+)
 from .signals import post_document_version_ocr
 
 logger = logging.getLogger(__name__)
 
 
-@app.task(bind=True, default_retry_delay=DO_OCR_RETRY_DELAY, ignore_result=True)
-def task_do_ocr(self, document_version_pk):
-    lock_id = 'task_do_ocr_doc_version-%d' % document_version_pk
+def _finish_document_version_ocr(document_version, sender):
+    logger.info('OCR complete for document version: %s', document_version)
+    DocumentVersionOCRError.objects.filter(
+        document_version=document_version
+    ).delete()
+
+    post_document_version_ocr.send(sender=sender, instance=document_version)
+
+
+def _save_document_version_ocr_error(document_version, exception):
+    # Must be called while handling the exception to record its traceback
+    entry, created = DocumentVersionOCRError.objects.get_or_create(
+        document_version=document_version
+    )
+
+    if settings.DEBUG:
+        result = []
+        type, value, tb = sys.exc_info()
+        result.append('%s: %s' % (type.__name__, value))
+        result.extend(traceback.format_tb(tb))
+        entry.result = '\n'.join(result)
+    else:
+        entry.result = exception
+
+    entry.save()
+
+
+@app.task(ignore_result=True)
+def task_check_stale_ocr_runs():
+    """
+    Queue again the OCR of the pages whose task started more than
+    OCR_RUN_TIMEOUT seconds ago and didn't finish, usually because the
+    worker processing them stopped. The pages whose tasks are still
+    waiting in the queues are left alone.
+    """
+    for run_page in DocumentVersionOCRRunPage.objects.get_stale().select_related('ocr_run'):
+        # Only queue the page once if checked concurrently
+        if DocumentVersionOCRRunPage.objects.filter(pk=run_page.pk, datetime_started=run_page.datetime_started).update(datetime_started=None):
+            logger.warning(
+                'OCR of document page: %d did not finish; queuing it again',
+                run_page.document_page_id
+            )
+            task_do_ocr_page.apply_async(
+                kwargs={'document_page_pk': run_page.document_page_id},
+                queue=OCR_PRIORITY_QUEUES[run_page.ocr_run.priority]
+            )
+
+
+@app.task(acks_late=True, bind=True, default_retry_delay=DO_OCR_RETRY_DELAY, ignore_result=True)
+def task_do_ocr(self, document_version_pk, priority=OCR_PRIORITY_INTERACTIVE):
+    """
+    Parse the text of the pages of a document version and queue a task for
+    each page that needs to be OCR'ed, so that any OCR worker can process
+    the pages of a single document in parallel. The page tasks are queued
+    in the queue of the priority of the document version and the run of
+    the document version is marked as prepared.
+    """
+    document_version = None
+    try:
+        document_version = DocumentVersion.objects.get(pk=document_version_pk)
+        logger.info(
+            'Starting document OCR for document version: %s',
+            document_version
+        )
+        document_pages = TextExtractor.prepare_document_version(
+            document_version=document_version
+        )
+
+        with transaction.atomic():
+            # Replace the pages of a previous run, pages already processed
+            # by it are not processed again if also pending in this run.
+            DocumentVersionOCRRunPage.objects.filter(
+                ocr_run__document_version=document_version
+            ).delete()
+
+            if not document_pages:
+                DocumentVersionOCRRun.objects.filter(
+                    document_version=document_version
+                ).delete()
+            else:
+                ocr_run, created = DocumentVersionOCRRun.objects.update_or_create(
+                    document_version=document_version, defaults={
+                        'datetime_started': now(), 'is_prepared': True,
+                        'priority': priority
+                    }
+                )
+                DocumentVersionOCRRunPage.objects.bulk_create(
+                    [
+                        DocumentVersionOCRRunPage(
+                            document_page=document_page, ocr_run=ocr_run
+                        ) for document_page in document_pages
+                    ]
+                )
+    except IntegrityError as exception:
+        logger.debug(
+            'OCR for document version: %d already being queued; %s',
+            document_version_pk, exception
+        )
+    except OperationalError as exception:
+        logger.warning(
+            'OCR error for document version: %d; %s. Retrying.',
+            document_version_pk, exception
+        )
+        raise self.retry(exc=exception)
+    except Exception as exception:
+        logger.error(
+            'OCR error for document version: %d; %s', document_version_pk,
+            exception
+        )
+        # Remove the unprepared run from the backlog
+        DocumentVersionOCRRun.objects.filter(
+            document_version_id=document_version_pk
+        ).delete()
+        if document_version:
+            _save_document_version_ocr_error(
+                document_version=document_version, exception=exception
+            )
+    else:
+        if document_pages:
+            for document_page in document_pages:
+                task_do_ocr_page.apply_async(
+                    kwargs={'document_page_pk': document_page.pk},
+                    queue=OCR_PRIORITY_QUEUES[priority]
+                )
+        else:
+            _finish_document_version_ocr(
+                document_version=document_version, sender=self
+            )
+
+
+@app.task(acks_late=True, bind=True, default_retry_delay=DO_OCR_RETRY_DELAY, ignore_result=True, max_retries=None)
+def task_do_ocr_page(self, document_page_pk):
+    """
+    OCR a page pending in the OCR run of its document version. The task
+    that processes the last pending page sends the document version OCR
+    finished signal. The task is acknowledged after it finishes, for the
+    broker to deliver it again if the worker stops while processing it.
+    The start of the OCR of the page is recorded, a page started too many
+    times without finishing aborts the OCR of its document version.
+    """
+    lock_id = 'task_do_ocr_page-%d' % document_page_pk
     try:
         logger.debug('trying to acquire lock: %s', lock_id)
-        # Acquire lock to avoid doing OCR on the same document version more than
-        # once concurrently
+        # Acquire lock to avoid doing OCR on the same page more than once
+        # concurrently
         lock = locking_backend.acquire_lock(lock_id, LOCK_EXPIRE)
         logger.debug('acquired lock: %s', lock_id)
-        document_version = None
+    except LockError as exception:
+        logger.debug('unable to obtain lock: %s; retrying', lock_id)
+        raise self.retry(exc=exception)
+
+    document_page = None
+    try:
+        document_page = DocumentPage.objects.select_related(
+            'document_version'
+        ).get(pk=document_page_pk)
+
         try:
-            document_version = DocumentVersion.objects.get(pk=document_version_pk)
-            logger.info(
-                'Starting document OCR for document version: %s',
-                document_version
-            )
-            TextExtractor.process_document_version(document_version)
-        except OperationalError as exception:
-            logger.warning(
-                'OCR error for document version: %d; %s. Retrying.',
-                document_version_pk, exception
+            run_page = DocumentVersionOCRRunPage.objects.get(
+                document_page=document_page,
+                ocr_run__document_version=document_page.document_version
             )
-            raise self.retry(exc=exception)
-        except Exception as exception:
-            logger.error(
-                'OCR error for document version: %d; %s', document_version_pk,
-                exception
+        except DocumentVersionOCRRunPage.DoesNotExist:
+            # Page already processed or its run was aborted
+            logger.debug(
+                'Page: %d is not pending OCR; skipping', document_page_pk
             )
-            if document_version:
-                entry, created = DocumentVersionOCRError.objects.get_or_create(
-                    document_version=document_version
+            return
+
+        if run_page.start_count >= OCR_PAGE_MAXIMUM_STARTS:
+            raise OCRError(
+                'OCR of page {} started {} times without finishing'.format(
+                    document_page.page_number, run_page.start_count
                 )
+            )
 
-                if settings.DEBUG:
-                    result = []
-                    type, value, tb = sys.exc_info()
-                    result.append('%s: %s' % (type.__name__, value))
-                    result.extend(traceback.format_tb(tb))
-                    entry.result = '\n'.join(result)
-                else:
-                    entry.result = exception
+        DocumentVersionOCRRunPage.objects.filter(pk=run_page.pk).update(
+            datetime_started=now(), start_count=F('start_count') + 1
+        )
 
-                entry.save()
-        else:
-            logger.info(
-                'OCR complete for document version: %s', document_version
-            )
-            try:
-                entry = DocumentVersionOCRError.objects.get(
-                    document_version=document_version
-                )
-            except DocumentVersionOCRError.DoesNotExist:
-                pass
-            else:
-                entry.delete()
+        TextExtractor.perform_ocr(document_page=document_page)
 
-            post_document_version_ocr.send(
-                sender=self, instance=document_version
+        run_page.delete()
+        # Only the task deleting the run finishes the document version
+        is_last_page = not DocumentVersionOCRRunPage.objects.filter(ocr_run_id=run_page.ocr_run_id).exists() and DocumentVersionOCRRun.objects.filter(pk=run_page.ocr_run_id).delete()[0]
+    except DocumentPage.DoesNotExist:
+        logger.debug('Page: %d no longer exists; skipping', document_page_pk)
+    except OperationalError as exception:
+        logger.warning(
+            'OCR error for document page: %d; %s. Retrying.',
+            document_page_pk, exception
+        )
+        raise self.retry(exc=exception)
+    except Exception as exception:
+        logger.error(
+            'OCR error for document page: %d; %s', document_page_pk,
+            exception
+        )
+        if document_page:
+            # Abort the run, the remaining page tasks will skip their pages
+            DocumentVersionOCRRun.objects.filter(
+                document_version=document_page.document_version
+            ).delete()
+            _save_document_version_ocr_error(
+                document_version=document_page.document_version,
+                exception=exception
+            )
+    else:
+        if is_last_page:
+            _finish_document_version_ocr(
+                document_version=document_page.document_version, sender=self
             )
-        finally:
-            lock.release()
-    except LockError:
-        logger.debug('unable to obtain lock: %s' % lock_id)
+    finally:
+        lock.release()
@@ -1,9 +1,11 @@
 from __future__ import unicode_literals
 
+from datetime import timedelta
 import json
 
 from django.contrib.auth import get_user_model
 from django.core.urlresolvers import reverse
+from django.utils.timezone import now
 
 from rest_framework import status
 
@@ -14,6 +16,9 @@ from user_management.tests import (
     TEST_ADMIN_EMAIL, TEST_ADMIN_PASSWORD, TEST_ADMIN_USERNAME
 )
 
+from ..models import DocumentVersionOCRRun, DocumentVersionOCRRunPage
+from ..settings import setting_run_timeout
+
 
 class OCRAPITestCase(BaseAPITestCase):
     """
@@ -86,3 +91,55 @@ class OCRAPITestCase(BaseAPITestCase):
         self.assertTrue(
             'Mayan EDMS Documentation' in json.loads(response.content)['content']
         )
+
+    def test_get_backlog(self):
+        ocr_run = DocumentVersionOCRRun.objects.create(
+            document_version=self.document.latest_version, is_prepared=True
+        )
+        DocumentVersionOCRRunPage.objects.create(
+            document_page=self.document.pages.first(), ocr_run=ocr_run
+        )
+
+        response = self.client.get(reverse('rest_api:ocr-backlog-view'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        content = json.loads(response.content)
+        self.assertEqual(content['document_version_count'], 1)
+        self.assertEqual(content['page_count'], 1)
+        self.assertEqual(content['stale_page_count'], 0)
+
+    def test_get_backlog_stale(self):
+        ocr_run = DocumentVersionOCRRun.objects.create(
+            document_version=self.document.latest_version, is_prepared=True
+        )
+        DocumentVersionOCRRunPage.objects.create(
+            document_page=self.document.pages.first(), ocr_run=ocr_run
+        )
+        DocumentVersionOCRRunPage.objects.filter(ocr_run=ocr_run).update(
+            datetime_started=now() - timedelta(
+                seconds=setting_run_timeout.value + 1
+            )
+        )
+
+        response = self.client.get(reverse('rest_api:ocr-backlog-view'))
+
+        content = json.loads(response.content)
+        self.assertEqual(content['document_version_count'], 1)
+        self.assertEqual(content['page_count'], 1)
+        self.assertEqual(content['stale_document_version_count'], 1)
+        self.assertEqual(content['stale_page_count'], 1)
+
+    def test_get_backlog_unprepared(self):
+        DocumentVersionOCRRun.objects.create(
+            document_version=self.document.latest_version
+        )
+
+        response = self.client.get(reverse('rest_api:ocr-backlog-view'))
+
+        content = json.loads(response.content)
+        self.assertEqual(content['document_version_count'], 1)
+        self.assertEqual(
+            content['page_count'], self.document.latest_version.pages.count()
+        )
+        self.assertEqual(content['stale_page_count'], 0)
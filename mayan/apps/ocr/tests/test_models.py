@@ -2,13 +2,38 @@
 
 from __future__ import unicode_literals
 
+from datetime import timedelta
+
+import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils.timezone import now
+
 from common.tests import BaseTestCase
 from documents.models import DocumentType
+from documents.search import document_page_search, document_search
 from documents.settings import setting_language_choices
 from documents.tests import (
-    TEST_DEU_DOCUMENT_PATH, TEST_DOCUMENT_TYPE, TEST_SMALL_DOCUMENT_PATH
+    TEST_DEU_DOCUMENT_PATH, TEST_DOCUMENT_TYPE, TEST_MULTI_PAGE_TIFF_PATH,
+    TEST_SMALL_DOCUMENT_PATH
+)
+from user_management.tests import (
+    TEST_ADMIN_EMAIL, TEST_ADMIN_PASSWORD, TEST_ADMIN_USERNAME
 )
 
+from ..classes import TextExtractor
+from ..literals import OCR_PAGE_MAXIMUM_STARTS, TERM_MAXIMUM_LENGTH
+from ..models import (
+    DocumentPageContent, DocumentPageContentTerm, DocumentVersionOCRError,
+    DocumentVersionOCRRun, DocumentVersionOCRRunPage
+)
+from ..settings import setting_run_timeout
+from ..signals import post_document_version_ocr
+from ..tasks import task_check_stale_ocr_runs, task_do_ocr_page
+
+TEST_DOCUMENT_CONTENT = 'Mayan EDMS is a Free Open Source Document Management System'
+
 
 class DocumentOCRTestCase(BaseTestCase):
     # PyOCR's leak descriptor in get_available_languages and image_to_string
@@ -36,6 +61,173 @@ class DocumentOCRTestCase(BaseTestCase):
         content = self.document.pages.first().ocr_content.content
         self.assertTrue('Mayan EDMS Documentation' in content)
 
+    def test_ocr_backend_reuse(self):
+        backend = TextExtractor.get_ocr_backend()
+        self.assertTrue(TextExtractor.get_ocr_backend() is backend)
+
+        # The tesseract engine used for the document was kept for reuse
+        if backend.handle_pool:
+            self.assertTrue(backend.handle_pool._idle_count > 0)
+
+    def test_ocr_result_reuse(self):
+        backend = TextExtractor.get_ocr_backend()
+
+        with mock.patch.object(backend, 'execute', wraps=backend.execute) as mock_execute:
+            with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
+                document = self.document_type.new_document(
+                    file_object=file_object,
+                )
+
+        # The OCR engine was not run for the duplicate page
+        self.assertFalse(mock_execute.called)
+
+        page_content = self.document.pages.first().ocr_content
+        duplicate_page_content = document.pages.first().ocr_content
+
+        self.assertNotEqual(page_content.cache_key, '')
+        self.assertEqual(
+            page_content.cache_key, duplicate_page_content.cache_key
+        )
+        self.assertEqual(
+            page_content.content, duplicate_page_content.content
+        )
+
+        document.delete()
+
+
+@override_settings(OCR_AUTO_OCR=False)
+class DocumentVersionOCRRunTestCase(BaseTestCase):
+    # PyOCR's leak descriptor in get_available_languages and image_to_string
+    # Disable descriptor leak test until fixed in upstream
+    _skip_file_descriptor_test = True
+
+    def setUp(self):
+        super(DocumentVersionOCRRunTestCase, self).setUp()
+
+        self.document_type = DocumentType.objects.create(
+            label=TEST_DOCUMENT_TYPE
+        )
+
+        with open(TEST_MULTI_PAGE_TIFF_PATH) as file_object:
+            self.document = self.document_type.new_document(
+                file_object=file_object,
+            )
+
+        self.signal_instances = []
+        post_document_version_ocr.connect(
+            self._signal_handler, dispatch_uid='test_ocr_run_signal_handler'
+        )
+
+    def tearDown(self):
+        post_document_version_ocr.disconnect(
+            dispatch_uid='test_ocr_run_signal_handler'
+        )
+        self.document.delete()
+        self.document_type.delete()
+        super(DocumentVersionOCRRunTestCase, self).tearDown()
+
+    def _signal_handler(self, sender, instance, **kwargs):
+        self.signal_instances.append(instance)
+
+    def _submit_for_ocr(self):
+        # Keep the page tasks from running to process them one at a time
+        with mock.patch.object(task_do_ocr_page, 'apply_async') as apply_async:
+            self.document.latest_version.submit_for_ocr()
+
+        return [
+            call[1]['kwargs']['document_page_pk'] for call in apply_async.call_args_list
+        ]
+
+    def test_ocr_run_pending_pages(self):
+        document_version = self.document.latest_version
+        document_page_pks = self._submit_for_ocr()
+
+        self.assertTrue(len(document_page_pks) > 1)
+        self.assertEqual(
+            set(document_page_pks),
+            set(document_version.pages.values_list('pk', flat=True))
+        )
+
+        for index, document_page_pk in enumerate(document_page_pks):
+            self.assertEqual(
+                DocumentVersionOCRRun.objects.get(
+                    document_version=document_version
+                ).document_pages.count(), len(document_page_pks) - index
+            )
+            self.assertEqual(self.signal_instances, [])
+
+            task_do_ocr_page.apply(
+                kwargs={'document_page_pk': document_page_pk}
+            )
+
+        self.assertFalse(
+            DocumentVersionOCRRun.objects.filter(
+                document_version=document_version
+            ).exists()
+        )
+        self.assertEqual(self.signal_instances, [document_version])
+
+        # Tasks of pages no longer pending don't finish the run again
+        task_do_ocr_page.apply(
+            kwargs={'document_page_pk': document_page_pks[0]}
+        )
+        self.assertEqual(self.signal_instances, [document_version])
+
+    def test_stale_ocr_run(self):
+        document_page_pks = self._submit_for_ocr()
+        ocr_run = DocumentVersionOCRRun.objects.get(
+            document_version=self.document.latest_version
+        )
+        timeout = timedelta(seconds=setting_run_timeout.value + 1)
+
+        # Pages whose tasks are still queued are never stale
+        DocumentVersionOCRRun.objects.filter(pk=ocr_run.pk).update(
+            datetime_started=now() - timeout
+        )
+
+        with mock.patch.object(task_do_ocr_page, 'apply_async') as apply_async:
+            task_check_stale_ocr_runs.apply()
+
+        self.assertFalse(apply_async.called)
+        self.assertEqual(DocumentVersionOCRRun.objects.get_stale().count(), 0)
+
+        # Page whose OCR started and didn't finish
+        DocumentVersionOCRRunPage.objects.filter(
+            document_page_id=document_page_pks[0]
+        ).update(datetime_started=now() - timeout, start_count=1)
+        self.assertEqual(DocumentVersionOCRRun.objects.get_stale().count(), 1)
+
+        with mock.patch.object(task_do_ocr_page, 'apply_async') as apply_async:
+            task_check_stale_ocr_runs.apply()
+
+        self.assertEqual(
+            [
+                call[1]['kwargs']['document_page_pk'] for call in apply_async.call_args_list
+            ], [document_page_pks[0]]
+        )
+        self.assertEqual(DocumentVersionOCRRun.objects.get_stale().count(), 0)
+        self.assertEqual(ocr_run.document_pages.count(), len(document_page_pks))
+
+    def test_ocr_run_page_maximum_starts(self):
+        document_page_pks = self._submit_for_ocr()
+        DocumentVersionOCRRunPage.objects.filter(
+            document_page_id=document_page_pks[0]
+        ).update(start_count=OCR_PAGE_MAXIMUM_STARTS)
+
+        task_do_ocr_page.apply(kwargs={'document_page_pk': document_page_pks[0]})
+
+        self.assertFalse(
+            DocumentVersionOCRRun.objects.filter(
+                document_version=self.document.latest_version
+            ).exists()
+        )
+        self.assertTrue(
+            DocumentVersionOCRError.objects.filter(
+                document_version=self.document.latest_version
+            ).exists()
+        )
+        self.assertEqual(self.signal_instances, [])
+
 
 class GermanOCRSupportTestCase(BaseTestCase):
     # PyOCR's leak descriptor in get_available_languages and image_to_string
@@ -75,3 +267,117 @@ class GermanOCRSupportTestCase(BaseTestCase):
         self.assertTrue(
             'Es bietet einen' in content
         )
+
+
+@override_settings(OCR_AUTO_OCR=False)
+class DocumentPageContentTermTestCase(BaseTestCase):
+    def setUp(self):
+        super(DocumentPageContentTermTestCase, self).setUp()
+        self.admin_user = get_user_model().objects.create_superuser(
+            username=TEST_ADMIN_USERNAME, email=TEST_ADMIN_EMAIL,
+            password=TEST_ADMIN_PASSWORD
+        )
+
+        self.document_type = DocumentType.objects.create(
+            label=TEST_DOCUMENT_TYPE
+        )
+
+        with open(TEST_SMALL_DOCUMENT_PATH) as file_object:
+            self.document = self.document_type.new_document(
+                file_object=file_object,
+            )
+
+        DocumentPageContent.objects.create(
+            document_page=self.document.pages.first(),
+            content=TEST_DOCUMENT_CONTENT
+        )
+        DocumentPageContentTerm.objects.index_document_version(
+            document_version=self.document.latest_version
+        )
+
+    def tearDown(self):
+        self.document_type.delete()
+        super(DocumentPageContentTermTestCase, self).tearDown()
+
+    def _search(self, search_model, field, term):
+        queryset, result_set, elapsed_time = search_model.search(
+            {field: term}, user=self.admin_user
+        )
+        return list(queryset)
+
+    def test_document_version_indexing(self):
+        self.assertEqual(
+            set(
+                DocumentPageContentTerm.objects.filter(
+                    document_pages=self.document.pages.first()
+                ).values_list('value', flat=True)
+            ), set(TEST_DOCUMENT_CONTENT.lower().split())
+        )
+
+    def test_document_search(self):
+        self.assertEqual(
+            self._search(
+                document_search, 'versions__pages__ocr_content__content',
+                'manage'
+            ), [self.document]
+        )
+        self.assertEqual(
+            self._search(
+                document_search, 'versions__pages__ocr_content__content',
+                'invoice'
+            ), []
+        )
+
+    def test_document_page_search(self):
+        self.assertEqual(
+            len(
+                self._search(
+                    document_page_search, 'ocr_content__content',
+                    '"open source"'
+                )
+            ), 1
+        )
+        self.assertEqual(
+            self._search(
+                document_page_search, 'ocr_content__content', '"source open"'
+            ), []
+        )
+
+    def test_word_prefix_search(self):
+        self.assertEqual(
+            self._search(
+                document_search, 'versions__pages__ocr_content__content',
+                'manag'
+            ), [self.document]
+        )
+        # Search words only match the start of the content words
+        self.assertEqual(
+            self._search(
+                document_search, 'versions__pages__ocr_content__content',
+                'anage'
+            ), []
+        )
+
+    def test_long_word_search(self):
+        long_word = 'a' * TERM_MAXIMUM_LENGTH + 'b'
+        self.document.pages.first().ocr_content.delete()
+        DocumentPageContent.objects.create(
+            document_page=self.document.pages.first(), content=long_word
+        )
+        DocumentPageContentTerm.objects.index_document_version(
+            document_version=self.document.latest_version
+        )
+
+        self.assertEqual(
+            len(
+                self._search(
+                    document_page_search, 'ocr_content__content', long_word
+                )
+            ), 1
+        )
+        self.assertEqual(
+            self._search(
+                document_page_search, 'ocr_content__content',
+                'a' * TERM_MAXIMUM_LENGTH + 'c'
+            ), []
+        )
@@ -10,6 +10,7 @@ from documents.tests import (
 )
 
 from ..classes import TextExtractor
+from ..models import DocumentPageContent
 from ..parsers import PDFMinerParser, PopplerParser
 
 
@@ -39,6 +40,20 @@ class ParserTestCase(BaseTestCase):
             'Mayan EDMS Documentation' in self.document.pages.first().ocr_content.content
         )
 
+    def test_poppler_parser_all_pages(self):
+        parser = PopplerParser()
+
+        parser.process_document_version(self.document.latest_version)
+
+        self.assertEqual(
+            DocumentPageContent.objects.filter(
+                document_page__document_version=self.document.latest_version
+            ).count(), self.document.page_count
+        )
+        self.assertTrue(
+            'Mayan EDMS Documentation' in self.document.pages.first().ocr_content.content
+        )
+
     def test_poppler_parser(self):
         parser = PopplerParser()
 
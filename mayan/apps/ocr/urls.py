@@ -3,7 +3,8 @@ from __future__ import unicode_literals
 from django.conf.urls import url
 
 from .api_views import (
-    APIDocumentOCRView, APIDocumentPageContentView, APIDocumentVersionOCRView
+    APIDocumentOCRView, APIDocumentPageContentView, APIDocumentVersionOCRView,
+    APIOCRBacklogView
 )
 from .views import (
     DocumentAllSubmitView, DocumentOCRContent, DocumentSubmitView,
@@ -55,4 +56,5 @@ api_urls = [
         r'^page/(?P<pk>\d+)/content/$', APIDocumentPageContentView.as_view(),
         name='document-page-content-view'
     ),
+    url(r'^backlog/$', APIOCRBacklogView.as_view(), name='ocr-backlog-view'),
 ]
@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
-from .classes import Permission, PermissionNamespace  # NOQA
+from .classes import (  # NOQA
+    Permission, PermissionNamespace, UserPermissionCache
+)
 
 default_app_config = 'permissions.apps.PermissionsApp'
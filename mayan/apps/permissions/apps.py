@@ -1,5 +1,8 @@
 from __future__ import unicode_literals
 
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.utils.translation import ugettext_lazy as _
 
 from common import (
@@ -8,7 +11,9 @@ from common import (
 from common.signals import perform_upgrade
 from rest_api.classes import APIEndPoint
 
-from .handlers import purge_permissions
+from .handlers import (
+    handler_invalidate_user_permission_cache, purge_permissions
+)
 from .links import (
     link_permission_grant, link_permission_revoke, link_role_create,
     link_role_delete, link_role_edit, link_role_list, link_role_members,
@@ -24,6 +29,7 @@ class PermissionsApp(MayanAppConfig):
     def ready(self):
         super(PermissionsApp, self).ready()
 
+        Group = apps.get_model(app_label='auth', model_name='Group')
         Role = self.get_model('Role')
 
         APIEndPoint(app=self, version_string='1')
@@ -47,3 +53,34 @@ class PermissionsApp(MayanAppConfig):
         perform_upgrade.connect(
             purge_permissions, dispatch_uid='purge_permissions'
         )
+
+        post_delete.connect(
+            handler_invalidate_user_permission_cache,
+            dispatch_uid='permissions_handler_invalidate_cache_group_delete',
+            sender=Group
+        )
+        post_delete.connect(
+            handler_invalidate_user_permission_cache,
+            dispatch_uid='permissions_handler_invalidate_cache_role_delete',
+            sender=Role
+        )
+        post_save.connect(
+            handler_invalidate_user_permission_cache,
+            dispatch_uid='permissions_handler_invalidate_cache_role_save',
+            sender=Role
+        )
+        m2m_changed.connect(
+            handler_invalidate_user_permission_cache,
+            dispatch_uid='permissions_handler_invalidate_cache_role_groups',
+            sender=Role.groups.through
+        )
+        m2m_changed.connect(
+            handler_invalidate_user_permission_cache,
+            dispatch_uid='permissions_handler_invalidate_cache_role_permissions',
+            sender=Role.permissions.through
+        )
+        m2m_changed.connect(
+            handler_invalidate_user_permission_cache,
+            dispatch_uid='permissions_handler_invalidate_cache_user_groups',
+            sender=get_user_model().groups.through
+        )
@@ -48,6 +48,14 @@ class Permission(object):
     _permissions = {}
     _stored_permissions_cache = {}
 
+    @staticmethod
+    def get_pks(permissions):
+        try:
+            return tuple(sorted(permission.pk for permission in permissions))
+        except TypeError:
+            # Not a list of permissions, just one
+            return (permissions.pk,)
+
     @classmethod
     def all(cls):
         # Return sorted permisions by namespace.name
@@ -57,6 +65,15 @@ class Permission(object):
 
     @classmethod
     def check_permissions(cls, requester, permissions):
+        return UserPermissionCache.get_for_user(user=requester).get_decision(
+            key=('permissions', cls.get_pks(permissions=permissions)),
+            function=lambda: cls._check_permissions(
+                requester=requester, permissions=permissions
+            )
+        )
+
+    @classmethod
+    def _check_permissions(cls, requester, permissions):
         try:
             for permission in permissions:
                 if permission.stored_permission.requester_has_this(requester):
@@ -133,3 +150,95 @@ class Permission(object):
     @property
     def uuid(self):
         return '%s.%s' % (self.namespace.name, self.name)
+
+
+class UserPermissionCache(object):
+    """
+    Effective permissions of a user: the roles held through its groups,
+    the permissions granted to those roles and the result of the access
+    checks already performed. Computed once per user instance (one per request) and
+    discarded whenever roles, groups or access control lists change.
+    The hits and misses attributes count the access checks served from
+    and added to the cache.
+    """
+    _generation = 0
+
+    @classmethod
+    def get_for_user(cls, user):
+        cache = getattr(user, '_permission_cache', None)
+        if cache is None or cache.generation != cls._generation:
+            cache = cls(user=user)
+            user._permission_cache = cache
+
+        return cache
+
+    @classmethod
+    def invalidate(cls):
+        cls._generation += 1
+
+    def __init__(self, user):
+        self.generation = self.__class__._generation
+        self.hits = 0
+        self.misses = 0
+        self.user = user
+        self._decisions = {}
+        self._role_ids = None
+        self._stored_permission_ids = None
+
+    @property
+    def role_ids(self):
+        if self._role_ids is None:
+            Role = apps.get_model(app_label='permissions', model_name='Role')
+
+            self._role_ids = frozenset(
+                Role.objects.filter(
+                    groups__in=self.user.groups.all()
+                ).values_list('pk', flat=True)
+            )
+
+        return self._role_ids
+
+    @property
+    def stored_permission_ids(self):
+        if self._stored_permission_ids is None:
+            StoredPermission = apps.get_model(
+                app_label='permissions', model_name='StoredPermission'
+            )
+
+            self._stored_permission_ids = frozenset(
+                StoredPermission.objects.filter(
+                    roles__pk__in=self.role_ids
+                ).values_list('pk', flat=True)
+            )
+
+        return self._stored_permission_ids
+
+    def get_decision(self, key, function):
+        """
+        Return the memoized result of the access check for key, calling
+        function to perform it the first time. A PermissionDenied raised by
+        function is memoized too and raised again on later calls.
+        """
+        try:
+            decision = self._decisions[key]
+        except KeyError:
+            self.misses += 1
+            try:
+                decision = function()
+            except PermissionDenied as exception:
+                self._decisions[key] = exception
+                raise
+            else:
+                self._decisions[key] = decision
+                return decision
+        else:
+            self.hits += 1
+            logger.debug(
+                'Access check "%s" for user "%s" served from cache, hits: %d',
+                key, self.user, self.hits
+            )
+
+            if isinstance(decision, PermissionDenied):
+                raise decision
+
+            return decision
@@ -2,6 +2,12 @@ from __future__ import unicode_literals
 
 from django.core import management
 
+from .classes import UserPermissionCache
+
 
 def purge_permissions(**kwargs):
     management.call_command('purgepermissions')
+
+
+def handler_invalidate_user_permission_cache(sender, **kwargs):
+    UserPermissionCache.invalidate()
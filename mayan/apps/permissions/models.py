@@ -8,7 +8,7 @@ from django.db import models
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 
-from .classes import Permission
+from .classes import Permission, UserPermissionCache
 from .managers import RoleManager, StoredPermissionManager
 
 logger = logging.getLogger(__name__)
@@ -53,14 +53,13 @@ class StoredPermission(models.Model):
             return True
 
         # Request is one of the permission's holders?
-        for group in user.groups.all():
-            for role in group.roles.all():
-                if self in role.permissions.all():
-                    logger.debug('Permission "%s" granted to user "%s" through role "%s"',
-                                 self,
-                                 user,
-                                 role)
-                    return True
+        permission_cache = UserPermissionCache.get_for_user(user=user)
+        if self.pk in permission_cache.stored_permission_ids:
+            logger.debug('Permission "%s" granted to user "%s" through roles "%s"',
+                         self,
+                         user,
+                         permission_cache.role_ids)
+            return True
 
         logger.debug('Fallthru: Permission "%s" not granted to user "%s"',
                      self,
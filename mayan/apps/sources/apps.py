@@ -104,12 +104,18 @@ class SourcesApp(MayanAppConfig):
                 'sources.tasks.task_check_interval_source': {
                     'queue': 'sources_periodic'
                 },
+                'sources.tasks.task_process_email_message': {
+                    'queue': 'sources'
+                },
                 'sources.tasks.task_source_handle_upload': {
                     'queue': 'sources'
                 },
                 'sources.tasks.task_upload_document': {
                     'queue': 'sources'
                 },
+                'sources.tasks.task_upload_watch_folder_claim': {
+                    'queue': 'sources'
+                },
             }
         )
         menu_documents.bind_links(links=(link_document_create_multiple,))
@@ -1,7 +1,11 @@
 from __future__ import unicode_literals
 
 import base64
+from email.message import Message
 import os
+import quopri
+import shutil
+from tempfile import SpooledTemporaryFile
 import time
 import urllib
 
@@ -14,6 +18,8 @@ from django.core.files import File
 
 from converter import TransformationResize, converter_class
 
+from .literals import EMAIL_SPOOL_SIZE
+
 
 class PseudoFile(File):
     def __init__(self, file, name):
@@ -32,11 +38,77 @@ class SourceUploadedFile(File):
 
 
 class Attachment(File):
+    """
+    Decode the payload of an email part line by line into a temporary file
+    that is kept in memory only while it is small.
+    """
+    decoders = {
+        '': shutil.copyfileobj,
+        '7bit': shutil.copyfileobj,
+        '8bit': shutil.copyfileobj,
+        'base64': base64.decode,
+        'binary': shutil.copyfileobj,
+        'quoted-printable': quopri.decode,
+    }
+
     def __init__(self, part, name):
         self.name = name
-        self.file = PseudoFile(
-            StringIO(part.get_payload(decode=True)), name=name
-        )
+        file_object = SpooledTemporaryFile(max_size=EMAIL_SPOOL_SIZE)
+
+        encoding = part.get('Content-Transfer-Encoding', '').strip().lower()
+
+        try:
+            decoder = self.decoders[encoding]
+        except KeyError:
+            file_object.write(part.get_payload(decode=True))
+        else:
+            if isinstance(part, SpooledMessage):
+                decoder(part.get_payload_file(), file_object)
+            else:
+                decoder(StringIO(part.get_payload()), file_object)
+
+        file_object.seek(0)
+        self.file = PseudoFile(file_object, name=name)
+
+
+class SpooledMessage(Message):
+    """
+    Email message that moves the payload of each of its parts to a
+    temporary file as soon as the part is parsed. Only the part being
+    parsed is kept in memory instead of the whole message.
+    """
+    def __init__(self):
+        Message.__init__(self)
+        self.payload_file = None
+
+    def get_payload(self, i=None, decode=False):
+        if self.payload_file is None:
+            return Message.get_payload(self, i=i, decode=decode)
+
+        self._payload = self.get_payload_file().read()
+        try:
+            return Message.get_payload(self, i=i, decode=decode)
+        finally:
+            self._payload = None
+
+    def get_payload_file(self):
+        """
+        Return the file holding the payload, still encoded, positioned at
+        its beginning.
+        """
+        self.payload_file.seek(0)
+        return self.payload_file
+
+    def set_payload(self, payload, charset=None):
+        if charset is None and isinstance(payload, bytes):
+            self.payload_file = SpooledTemporaryFile(
+                max_size=EMAIL_SPOOL_SIZE
+            )
+            self.payload_file.write(payload)
+            Message.set_payload(self, payload=None, charset=charset)
+        else:
+            self.payload_file = None
+            Message.set_payload(self, payload=payload, charset=charset)
 
 
 class StagingFile(object):
@@ -100,7 +100,7 @@ class EmailSetupBaseForm(forms.ModelForm):
             'label', 'enabled', 'interval', 'document_type', 'uncompress',
             'host', 'ssl', 'port', 'username', 'password',
             'metadata_attachment_name', 'subject_metadata_type',
-            'from_metadata_type', 'store_body'
+            'from_metadata_type', 'store_body', 'batch_size'
         )
         widgets = {
             'password': forms.widgets.PasswordInput(render_value=True)
@@ -123,6 +123,6 @@ class WatchFolderSetupForm(forms.ModelForm):
     class Meta:
         fields = (
             'label', 'enabled', 'interval', 'document_type', 'uncompress',
-            'folder_path'
+            'folder_path', 'batch_size', 'concurrency'
         )
         model = WatchFolderSource
@@ -31,11 +31,31 @@ SOURCE_CHOICES = (
     (SOURCE_CHOICE_EMAIL_IMAP, _('IMAP email')),
 )
 
+BULK_UPLOAD_BACKLOG_WAIT = 30
+DEFAULT_BULK_UPLOAD_BATCH_SIZE = 100
+DEFAULT_EMAIL_BATCH_SIZE = 50
 DEFAULT_INTERVAL = 600
 DEFAULT_METADATA_ATTACHMENT_NAME = 'metadata.yaml'
 DEFAULT_POP3_TIMEOUT = 60
 DEFAULT_IMAP_MAILBOX = 'INBOX'
 DEFAULT_SOURCE_TASK_RETRY_DELAY = 10
+DEFAULT_WATCH_FOLDER_BATCH_SIZE = 100
+DEFAULT_WATCH_FOLDER_CONCURRENCY = 4
+
+# Size after which email messages and attachments are stored in a
+# temporary file
+EMAIL_SPOOL_SIZE = 1024 * 1024  # 1 MB
+EMAIL_FETCH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+EMAIL_MESSAGE_FILENAME = 'message.eml'
+EMAIL_MESSAGE_MAXIMUM_RETRIES = 5
+
+# Watch folder file claiming
+WATCH_FOLDER_CLAIM_TIMEOUT = 60 * 60  # 1 hour
+WATCH_FOLDER_ERROR_DIRECTORY = '.mayan_errors'
+WATCH_FOLDER_MONITOR_REFRESH_INTERVAL = 60
+WATCH_FOLDER_MONITOR_RETRY_INTERVAL = 5
+WATCH_FOLDER_PROCESSING_DIRECTORY = '.mayan_processing'
+WATCH_FOLDER_STABLE_TIME = 10
 
 # Upload wizard steps
 STEP_DOCUMENT_TYPE = '0'
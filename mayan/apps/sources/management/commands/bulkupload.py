@@ -0,0 +1,187 @@
+from __future__ import unicode_literals
+
+import os
+import time
+
+from django.apps import apps
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.encoding import force_text
+
+from documents.models import DocumentType
+
+from ...literals import (
+    BULK_UPLOAD_BACKLOG_WAIT, DEFAULT_BULK_UPLOAD_BATCH_SIZE
+)
+from ...models import Source
+
+
+class Command(BaseCommand):
+    help = (
+        'Upload the files of a list of files and folders as new documents, '
+        'creating the documents in batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source_id', type=int,
+            help='ID of the source whose transformations will be applied.'
+        )
+        parser.add_argument(
+            'document_type_id', type=int,
+            help='ID of the document type of the new documents.'
+        )
+        parser.add_argument(
+            'paths', nargs='+',
+            help='Files, or folders whose files will be uploaded.'
+        )
+        parser.add_argument(
+            '--batch-size', default=DEFAULT_BULK_UPLOAD_BATCH_SIZE,
+            dest='batch_size', type=int,
+            help='Number of documents to create in each transaction.'
+        )
+        parser.add_argument(
+            '--start', default=0, dest='start', type=int,
+            help='Position, in the sorted list of files, of the first file '
+            'to upload. Used to resume an interrupted upload.'
+        )
+        parser.add_argument(
+            '--ignore-backlog', action='store_true', default=False,
+            dest='ignore_backlog',
+            help='Don\'t wait between batches for the OCR backlog to '
+            'fall below the OCR_BACKLOG_THRESHOLD setting.'
+        )
+        parser.add_argument(
+            '--metadata', action='append', default=[], dest='metadata',
+            help='Metadata type name and value pair, as name=value, to '
+            'assign to every document. Can be repeated.'
+        )
+        parser.add_argument(
+            '--tag', action='append', default=[], dest='tag_ids', type=int,
+            help='ID of a tag to attach to every document. Can be repeated.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            source = Source.objects.get_subclass(pk=options['source_id'])
+        except Source.DoesNotExist:
+            raise CommandError(
+                'Unknown source: {}'.format(options['source_id'])
+            )
+
+        try:
+            document_type = DocumentType.objects.get(
+                pk=options['document_type_id']
+            )
+        except DocumentType.DoesNotExist:
+            raise CommandError(
+                'Unknown document type: {}'.format(
+                    options['document_type_id']
+                )
+            )
+
+        metadata_dictionary = {}
+        for entry in options['metadata']:
+            try:
+                name, value = entry.split('=', 1)
+            except ValueError:
+                raise CommandError('Invalid metadata: {}'.format(entry))
+            else:
+                metadata_dictionary[name] = value
+
+        DocumentVersionOCRRun = apps.get_model(
+            app_label='ocr', model_name='DocumentVersionOCRRun'
+        )
+
+        file_paths = list(self.get_file_paths(paths=options['paths']))
+        failed_file_paths = []
+
+        positions = range(
+            options['start'], len(file_paths), options['batch_size']
+        )
+
+        for start in positions:
+            if not options['ignore_backlog']:
+                while DocumentVersionOCRRun.objects.is_backlogged():
+                    self.stdout.write(
+                        'OCR backlog above threshold, waiting {} '
+                        'seconds'.format(BULK_UPLOAD_BACKLOG_WAIT)
+                    )
+                    time.sleep(BULK_UPLOAD_BACKLOG_WAIT)
+
+            batch = file_paths[start:start + options['batch_size']]
+            file_objects = []
+            for file_path in batch:
+                try:
+                    file_objects.append(
+                        File(
+                            file=open(file_path, mode='rb'),
+                            name=os.path.basename(file_path)
+                        )
+                    )
+                except IOError as exception:
+                    failed_file_paths.append(file_path)
+                    self.stderr.write(
+                        'Unable to open file: {}; {}'.format(
+                            file_path, exception
+                        )
+                    )
+
+            file_paths_by_object = dict(
+                (file_object, file_object.file.name)
+                for file_object in file_objects
+            )
+
+            try:
+                documents, failures = source.upload_documents(
+                    document_type=document_type, file_objects=file_objects,
+                    metadata_dictionary=metadata_dictionary,
+                    tag_ids=options['tag_ids']
+                )
+            except Exception as exception:
+                failed_file_paths.extend(file_paths_by_object.values())
+                self.stderr.write(
+                    'Unable to upload the files at positions {} to {}; '
+                    '{}'.format(start, start + len(batch) - 1, exception)
+                )
+            else:
+                for file_object, exception in failures:
+                    failed_file_paths.append(
+                        file_paths_by_object[file_object]
+                    )
+                    self.stderr.write(
+                        'Unable to upload file: {}; {}'.format(
+                            file_paths_by_object[file_object], exception
+                        )
+                    )
+            finally:
+                for file_object in file_objects:
+                    file_object.close()
+
+            self.stdout.write(
+                'Processed {} of {} files, resume with --start {}'.format(
+                    start + len(batch), len(file_paths), start + len(batch)
+                )
+            )
+
+        if failed_file_paths:
+            self.stderr.write(
+                '{} files were not uploaded:'.format(len(failed_file_paths))
+            )
+            for file_path in failed_file_paths:
+                self.stderr.write(file_path)
+
+    def get_file_paths(self, paths):
+        for path in paths:
+            # Force path to unicode to avoid os.listdir returning str for
+            # non-latin filenames.
+            path = force_text(path)
+            if os.path.isdir(path):
+                for file_name in sorted(os.listdir(path)):
+                    file_path = os.path.join(path, file_name)
+                    if os.path.isfile(file_path):
+                        yield file_path
+            elif os.path.isfile(path):
+                yield path
+            else:
+                raise CommandError('Not a file or folder: {}'.format(path))
@@ -0,0 +1,169 @@
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import logging
+import time
+
+import pyinotify
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...literals import (
+    WATCH_FOLDER_MONITOR_REFRESH_INTERVAL, WATCH_FOLDER_MONITOR_RETRY_INTERVAL
+)
+from ...models import WatchFolderSource
+
+logger = logging.getLogger(__name__)
+
+
+class WatchFolderEventHandler(pyinotify.ProcessEvent):
+    def my_init(self, sources):
+        self.pending = OrderedDict()
+        self.sources = sources
+
+    def process_IN_CLOSE_WRITE(self, event):
+        self.process_file(event=event)
+
+    def process_IN_MOVED_TO(self, event):
+        self.process_file(event=event)
+
+    def process_file(self, event):
+        if event.path not in self.sources:
+            return
+
+        logger.debug(
+            'Watch folder "%s"; file written: %s', self.sources[event.path],
+            event.name
+        )
+
+        self.pending[(event.path, event.name)] = event.pathname
+        self.process_pending()
+
+    def process_pending(self):
+        """
+        Claim the files reported by the events in the order they were
+        written. The files of the folders that have the maximum number of
+        files being uploaded, and all the files while the OCR backlog is
+        above its threshold, are kept to be claimed on a later call.
+        """
+        if not self.pending:
+            return
+
+        DocumentVersionOCRRun = apps.get_model(
+            app_label='ocr', model_name='DocumentVersionOCRRun'
+        )
+
+        if DocumentVersionOCRRun.objects.is_backlogged():
+            logger.debug(
+                'OCR backlog above threshold, not claiming %d files',
+                len(self.pending)
+            )
+            return
+
+        full_paths = set()
+        for (path, file_name), pathname in list(self.pending.items()):
+            if path in full_paths:
+                continue
+
+            try:
+                source = self.sources[path]
+            except KeyError:
+                # Folder no longer monitored
+                del self.pending[(path, file_name)]
+                continue
+
+            try:
+                if not source.check_file(file_name=file_name):
+                    full_paths.add(path)
+                    continue
+            except Exception as exception:
+                logger.error(
+                    'Error processing watch folder file: %s; %s', pathname,
+                    exception
+                )
+
+            del self.pending[(path, file_name)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Monitor the enabled watch folders and claim new files for upload as '
+        'soon as they are written. Files written while a folder has the '
+        'maximum number of files being uploaded are claimed as soon as one '
+        'of the uploads finishes. The periodic checks of the watch folders '
+        'continue to upload the files missed by the monitor.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refresh-interval', default=WATCH_FOLDER_MONITOR_REFRESH_INTERVAL,
+            dest='refresh_interval', type=int,
+            help='Seconds between checks for added or removed watch folders.'
+        )
+
+    def handle(self, *args, **options):
+        self.sources = {}
+        self.watches = {}
+
+        event_handler = WatchFolderEventHandler(sources=self.sources)
+        watch_manager = pyinotify.WatchManager()
+        notifier = pyinotify.Notifier(
+            watch_manager, default_proc_fun=event_handler
+        )
+
+        try:
+            while True:
+                self.refresh_watches(watch_manager=watch_manager)
+                refresh_time = time.time() + options['refresh_interval']
+                retry_time = 0
+
+                while time.time() < refresh_time:
+                    if notifier.check_events(timeout=1000):
+                        close_old_connections()
+                        notifier.read_events()
+                        notifier.process_events()
+                    elif time.time() >= retry_time:
+                        # Claim the files that were kept waiting for an
+                        # upload of their folder to finish
+                        close_old_connections()
+                        event_handler.process_pending()
+                        retry_time = (
+                            time.time() + WATCH_FOLDER_MONITOR_RETRY_INTERVAL
+                        )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            notifier.stop()
+
+    def refresh_watches(self, watch_manager):
+        close_old_connections()
+
+        sources = dict(
+            (unicode(source.folder_path).rstrip('/'), source) for source in
+            WatchFolderSource.objects.filter(enabled=True)
+        )
+
+        for path in set(self.watches) - set(sources):
+            watch_manager.rm_watch(self.watches.pop(path))
+            self.stdout.write('Stopped monitoring: {}'.format(path))
+
+        for path in set(sources) - set(self.watches):
+            descriptor = watch_manager.add_watch(
+                path, pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO
+            ).get(path, -1)
+
+            if descriptor < 0:
+                logger.error('Unable to monitor watch folder: %s', path)
+            else:
+                self.watches[path] = descriptor
+                self.stdout.write('Monitoring: {}'.format(path))
+
+        self.sources.clear()
+        self.sources.update(
+            dict(
+                (path, source) for path, source in sources.items()
+                if path in self.watches
+            )
+        )
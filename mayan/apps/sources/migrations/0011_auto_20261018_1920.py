@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-18 19:20
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sources', '0010_auto_20151001_0055'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='watchfoldersource',
+            name='batch_size',
+            field=models.PositiveIntegerField(default=100, help_text='Maximum number of files to claim for upload on each check.', verbose_name='Batch size'),
+        ),
+        migrations.AddField(
+            model_name='watchfoldersource',
+            name='concurrency',
+            field=models.PositiveIntegerField(default=4, help_text='Maximum number of files from this folder being uploaded at the same time.', verbose_name='Concurrency'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-18 21:05
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sources', '0011_auto_20261018_1920'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailbasemodel',
+            name='batch_size',
+            field=models.PositiveIntegerField(default=50, help_text='Maximum number of messages to download on each check.', verbose_name='Batch size'),
+        ),
+        migrations.AddField(
+            model_name='imapemail',
+            name='last_uid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Last UID'),
+        ),
+        migrations.AddField(
+            model_name='imapemail',
+            name='uid_validity',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='UID validity'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.7 on 2026-10-19 10:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0009_shareduploadedfile_extracted_count'),
+        ('sources', '0012_auto_20261018_2105'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FailedEmailMessage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datetime', models.DateTimeField(auto_now=True, verbose_name='Date time')),
+                ('error', models.TextField(blank=True, editable=False, verbose_name='Error')),
+                ('retry_count', models.PositiveIntegerField(default=0, editable=False, verbose_name='Retry count')),
+                ('shared_uploaded_file', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='failed_email_message', to='common.SharedUploadedFile', verbose_name='Shared uploaded file')),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='failed_email_messages', to='sources.Source', verbose_name='Source')),
+            ],
+            options={
+                'ordering': ('datetime',),
+                'verbose_name': 'Failed email message',
+                'verbose_name_plural': 'Failed email messages',
+            },
+        ),
+    ]
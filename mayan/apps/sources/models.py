@@ -1,6 +1,6 @@
 from __future__ import unicode_literals
 
-from email import message_from_string
+from email import message_from_file
 from email.Utils import collapse_rfc2231_value
 from email.header import decode_header
 import imaplib
@@ -8,6 +8,10 @@ import json
 import logging
 import os
 import poplib
+import re
+from tempfile import SpooledTemporaryFile
+import time
+import uuid
 
 import yaml
 
@@ -15,29 +19,46 @@ from django.core.exceptions import ValidationError
 from django.core.files import File
 from django.core.files.base import ContentFile
 from django.db import models, transaction
-from django.utils.encoding import python_2_unicode_compatible
+from django.db.models import F
+from django.utils.encoding import force_text, python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 
 from model_utils.managers import InheritanceManager
 
 from common.compressed_files import CompressedFile, NotACompressedFile
+from common.models import SharedUploadedFile
 from converter.literals import DIMENSION_SEPARATOR
 from converter.models import Transformation
 from djcelery.models import PeriodicTask, IntervalSchedule
-from documents.models import Document, DocumentType
+from documents.models import Document, DocumentType, DocumentVersion
 from documents.settings import setting_language
-from metadata.api import save_metadata_list, set_bulk_metadata
+from documents.signals import (
+    post_document_created_bulk, post_version_upload_bulk
+)
+from metadata.api import (
+    bulk_create_metadata, save_metadata_list, set_bulk_metadata
+)
 from metadata.models import MetadataType
 from tags.models import Tag
 
-from .classes import Attachment, SourceUploadedFile, StagingFile
+from .classes import (
+    Attachment, SourceUploadedFile, SpooledMessage, StagingFile
+)
 from .literals import (
-    DEFAULT_INTERVAL, DEFAULT_POP3_TIMEOUT, DEFAULT_IMAP_MAILBOX,
-    DEFAULT_METADATA_ATTACHMENT_NAME, SOURCE_CHOICES, SOURCE_CHOICE_STAGING,
-    SOURCE_CHOICE_WATCH, SOURCE_CHOICE_WEB_FORM,
+    DEFAULT_EMAIL_BATCH_SIZE, DEFAULT_IMAP_MAILBOX, DEFAULT_INTERVAL,
+    DEFAULT_METADATA_ATTACHMENT_NAME, DEFAULT_POP3_TIMEOUT,
+    DEFAULT_WATCH_FOLDER_BATCH_SIZE, DEFAULT_WATCH_FOLDER_CONCURRENCY,
+    EMAIL_FETCH_CHUNK_SIZE, EMAIL_MESSAGE_FILENAME,
+    EMAIL_MESSAGE_MAXIMUM_RETRIES, EMAIL_SPOOL_SIZE, SOURCE_CHOICES,
+    SOURCE_CHOICE_EMAIL_IMAP, SOURCE_CHOICE_EMAIL_POP3,
+    SOURCE_CHOICE_STAGING, SOURCE_CHOICE_WATCH, SOURCE_CHOICE_WEB_FORM,
     SOURCE_INTERACTIVE_UNCOMPRESS_CHOICES, SOURCE_UNCOMPRESS_CHOICES,
     SOURCE_UNCOMPRESS_CHOICE_N, SOURCE_UNCOMPRESS_CHOICE_Y,
-    SOURCE_CHOICE_EMAIL_IMAP, SOURCE_CHOICE_EMAIL_POP3
+    WATCH_FOLDER_CLAIM_TIMEOUT, WATCH_FOLDER_ERROR_DIRECTORY,
+    WATCH_FOLDER_PROCESSING_DIRECTORY, WATCH_FOLDER_STABLE_TIME
+)
+from .tasks import (
+    task_process_email_message, task_upload_watch_folder_claim
 )
 
 logger = logging.getLogger(__name__)
@@ -104,6 +125,96 @@ class Source(models.Model):
             )
             raise
 
+    def upload_documents(self, file_objects, document_type, description=None, language=None, metadata_dict_list=None, metadata_dictionary=None, tag_ids=None, user=None):
+        """
+        Create a document for each file in a single transaction. The
+        documents share the document type, metadata and tags, which are
+        added with one query each. The document and version rows are still
+        inserted one by one as each version stores its file and counts its
+        pages when saved. A file that fails is skipped, its changes are
+        rolled back and its stored file removed, without affecting the
+        other files. The apps that process new documents are notified once
+        for all the documents instead of once per document. Return the new
+        documents and a list of the failed files with their exceptions.
+        """
+        documents = []
+        document_versions = []
+        failures = []
+
+        try:
+            with transaction.atomic():
+                for file_object in file_objects:
+                    document_version = None
+
+                    try:
+                        with transaction.atomic():
+                            document = Document.objects.create(
+                                description=description or '',
+                                document_type=document_type,
+                                label=file_object.name,
+                                language=language or setting_language.value
+                            )
+                            document.save(_user=user)
+
+                            document_version = DocumentVersion(
+                                comment='', document=document,
+                                file=file_object
+                            )
+                            document_version.save(
+                                _send_signals=False, _user=user
+                            )
+
+                            Transformation.objects.copy(
+                                source=self,
+                                targets=document_version.pages.all()
+                            )
+                    except Exception as exception:
+                        logger.error(
+                            'Unable to create a new document from file '
+                            '"%s" of source "%s"; %s', file_object.name, self,
+                            exception
+                        )
+                        if document_version and document_version.file._committed:
+                            document_version.delete_unused_file()
+
+                        failures.append((file_object, exception))
+                    else:
+                        documents.append(document)
+                        document_versions.append(document_version)
+
+                bulk_create_metadata(
+                    documents=documents, document_type=document_type,
+                    metadata_dict_list=metadata_dict_list,
+                    metadata_dictionary=metadata_dictionary
+                )
+
+                if tag_ids:
+                    Tag.documents.through.objects.bulk_create(
+                        [
+                            Tag.documents.through(
+                                document=document, tag_id=tag_id
+                            ) for document in documents
+                            for tag_id in tag_ids
+                        ]
+                    )
+        except Exception as exception:
+            logger.critical(
+                'Unexpected exception while trying to create %d new '
+                'documents from source "%s"; %s', len(file_objects), self,
+                exception
+            )
+            raise
+        else:
+            if documents:
+                post_version_upload_bulk.send(
+                    sender=DocumentVersion, instances=document_versions
+                )
+                post_document_created_bulk.send(
+                    sender=Document, instances=documents
+                )
+
+        return documents, failures
+
     def handle_upload(self, file_object, description=None, document_type=None, expand=False, label=None, language=None, metadata_dict_list=None, metadata_dictionary=None, user=None):
         if not document_type:
             document_type = self.document_type
@@ -399,6 +510,11 @@ class EmailBaseModel(IntervalBaseModel):
             'Store the body of the email as a text document.'
         ), verbose_name=_('Store email body')
     )
+    batch_size = models.PositiveIntegerField(
+        default=DEFAULT_EMAIL_BATCH_SIZE, help_text=_(
+            'Maximum number of messages to download on each check.'
+        ), verbose_name=_('Batch size')
+    )
 
     def clean(self):
         if self.subject_metadata_type:
@@ -447,7 +563,9 @@ class EmailBaseModel(IntervalBaseModel):
     @staticmethod
     def process_message(source, message):
         counter = 1
-        email = message_from_string(message)
+        # Parse the message keeping the payloads of its parts in temporary
+        # files
+        email = message_from_file(message, _class=SpooledMessage)
         metadata_dictionary = {}
 
         if source.subject_metadata_type:
@@ -508,6 +626,45 @@ class EmailBaseModel(IntervalBaseModel):
                             metadata_dictionary=metadata_dictionary
                         )
 
+    def queue_failed_messages(self):
+        """
+        Queue again the processing of the downloaded messages that failed,
+        up to EMAIL_MESSAGE_MAXIMUM_RETRIES times for each message.
+        """
+        queryset = self.failed_email_messages.filter(
+            retry_count__lt=EMAIL_MESSAGE_MAXIMUM_RETRIES
+        )
+
+        for failed_email_message in queryset:
+            logger.info(
+                'Retrying processing of email message: %s from source: %s',
+                failed_email_message.shared_uploaded_file, self
+            )
+            FailedEmailMessage.objects.filter(
+                pk=failed_email_message.pk
+            ).update(retry_count=F('retry_count') + 1)
+            task_process_email_message.apply_async(
+                kwargs={
+                    'shared_uploaded_file_id': failed_email_message.shared_uploaded_file_id,
+                    'source_id': self.pk
+                }
+            )
+
+    def queue_message(self, file_object):
+        """
+        Store a downloaded message as a shared file and process it in its
+        own task.
+        """
+        shared_uploaded_file = SharedUploadedFile.objects.create(
+            file=File(file_object, name=EMAIL_MESSAGE_FILENAME)
+        )
+        task_process_email_message.apply_async(
+            kwargs={
+                'shared_uploaded_file_id': shared_uploaded_file.pk,
+                'source_id': self.pk
+            }
+        )
+
     class Meta:
         verbose_name = _('Email source')
         verbose_name_plural = _('Email sources')
@@ -520,11 +677,35 @@ class POP3Email(EmailBaseModel):
         default=DEFAULT_POP3_TIMEOUT, verbose_name=_('Timeout')
     )
 
+    @staticmethod
+    def fetch_message(mailbox, message_number, file_object):
+        """
+        Download a message into file_object one line at a time, as it is
+        received. poplib's retr holds the lines of the whole message in
+        memory before returning them.
+        """
+        mailbox._putcmd('RETR {}'.format(message_number))
+        mailbox._getresp()
+
+        line, octets = mailbox._getline()
+        while line != b'.':
+            # Remove the byte stuffing of the lines starting with a dot
+            if line.startswith(b'..'):
+                line = line[1:]
+
+            file_object.write(line)
+            file_object.write(b'\n')
+            line, octets = mailbox._getline()
+
+        file_object.seek(0)
+
     def check_source(self):
         logger.debug('Starting POP3 email fetch')
         logger.debug('host: %s', self.host)
         logger.debug('ssl: %s', self.ssl)
 
+        self.queue_failed_messages()
+
         if self.ssl:
             mailbox = poplib.POP3_SSL(self.host, self.port)
         else:
@@ -539,16 +720,18 @@ class POP3Email(EmailBaseModel):
         logger.debug(messages_info)
         logger.debug('messages count: %s', len(messages_info[1]))
 
-        for message_info in messages_info[1]:
+        for message_info in messages_info[1][:self.batch_size]:
             message_number, message_size = message_info.split()
             logger.debug('message_number: %s', message_number)
             logger.debug('message_size: %s', message_size)
 
-            complete_message = '\n'.join(mailbox.retr(message_number)[1])
+            with SpooledTemporaryFile(max_size=EMAIL_SPOOL_SIZE) as file_object:
+                self.fetch_message(
+                    mailbox=mailbox, message_number=message_number,
+                    file_object=file_object
+                )
+                self.queue_message(file_object=file_object)
 
-            EmailBaseModel.process_message(
-                source=self, message=complete_message
-            )
             mailbox.dele(message_number)
 
         mailbox.quit()
@@ -566,6 +749,38 @@ class IMAPEmail(EmailBaseModel):
         help_text=_('IMAP Mailbox from which to check for messages.'),
         max_length=64, verbose_name=_('Mailbox')
     )
+    uid_validity = models.BigIntegerField(
+        default=0, editable=False, verbose_name=_('UID validity')
+    )
+    last_uid = models.BigIntegerField(
+        default=0, editable=False, verbose_name=_('Last UID')
+    )
+
+    @staticmethod
+    def fetch_message(mailbox, uid, file_object):
+        """
+        Download the message with the given UID into file_object in chunks
+        of EMAIL_FETCH_CHUNK_SIZE bytes, to avoid holding large messages in
+        memory.
+        """
+        status, data = mailbox.uid('fetch', str(uid), '(RFC822.SIZE)')
+        size = int(re.search(r'RFC822\.SIZE (\d+)', data[0]).group(1))
+
+        offset = 0
+        while offset < size:
+            status, data = mailbox.uid(
+                'fetch', str(uid), '(BODY.PEEK[]<{}.{}>)'.format(
+                    offset, EMAIL_FETCH_CHUNK_SIZE
+                )
+            )
+            chunk = data[0][1]
+            if not chunk:
+                break
+
+            file_object.write(chunk)
+            offset += len(chunk)
+
+        file_object.seek(0)
 
     # http://www.doughellmann.com/PyMOTW/imaplib/
     def check_source(self):
@@ -573,6 +788,8 @@ class IMAPEmail(EmailBaseModel):
         logger.debug('host: %s', self.host)
         logger.debug('ssl: %s', self.ssl)
 
+        self.queue_failed_messages()
+
         if self.ssl:
             mailbox = imaplib.IMAP4_SSL(self.host, self.port)
         else:
@@ -581,18 +798,40 @@ class IMAPEmail(EmailBaseModel):
         mailbox.login(self.username, self.password)
         mailbox.select(self.mailbox)
 
-        status, data = mailbox.search(None, 'NOT', 'DELETED')
-        if data:
-            messages_info = data[0].split()
-            logger.debug('messages count: %s', len(messages_info))
+        status, data = mailbox.response('UIDVALIDITY')
+        uid_validity = int(data[0] or 0)
+
+        if uid_validity != self.uid_validity:
+            # The server renumbered the messages of the mailbox, start over
+            self.uid_validity = uid_validity
+            self.last_uid = 0
 
-            for message_number in messages_info:
-                logger.debug('message_number: %s', message_number)
-                status, data = mailbox.fetch(message_number, '(RFC822)')
-                EmailBaseModel.process_message(
-                    source=self, message=data[0][1]
+        # A UID range always includes the last message of the mailbox, even
+        # when its UID is below the start of the range.
+        status, data = mailbox.uid(
+            'search', None, 'UID', '{}:*'.format(self.last_uid + 1), 'NOT',
+            'DELETED'
+        )
+        uids = sorted(
+            uid for uid in [int(value) for value in data[0].split()]
+            if uid > self.last_uid
+        )[:self.batch_size]
+        logger.debug('messages count: %s', len(uids))
+
+        for uid in uids:
+            logger.debug('message uid: %s', uid)
+            with SpooledTemporaryFile(max_size=EMAIL_SPOOL_SIZE) as file_object:
+                IMAPEmail.fetch_message(
+                    mailbox=mailbox, uid=uid, file_object=file_object
                 )
-                mailbox.store(message_number, '+FLAGS', '\\Deleted')
+                self.queue_message(file_object=file_object)
+
+            mailbox.uid('store', str(uid), '+FLAGS', '\\Deleted')
+
+            self.last_uid = uid
+            IMAPEmail.objects.filter(pk=self.pk).update(
+                last_uid=self.last_uid, uid_validity=self.uid_validity
+            )
 
         mailbox.expunge()
         mailbox.close()
@@ -613,6 +852,14 @@ class WatchFolderSource(IntervalBaseModel):
     they want to upload as a bill or invoice to the respective filesystem
     folder. Mayan will periodically scan these filesystem locations and
     upload the files as documents, deleting them if configured.
+    Files are claimed by moving them to a processing directory inside the
+    watch folder and are uploaded in parallel by separate tasks. Each task
+    claims the next file of the folder when its upload finishes. A file is
+    deleted only after its upload finishes, claims left behind by workers
+    that stopped are uploaded again on later checks. Claims whose upload
+    fails are moved to an error directory inside the watch folder.
+    The watchfolders management command can be used to claim files as soon
+    as they are written instead of waiting for the next check.
     """
     source_type = SOURCE_CHOICE_WATCH
 
@@ -620,20 +867,194 @@ class WatchFolderSource(IntervalBaseModel):
         help_text=_('Server side filesystem path.'), max_length=255,
         verbose_name=_('Folder path')
     )
+    batch_size = models.PositiveIntegerField(
+        default=DEFAULT_WATCH_FOLDER_BATCH_SIZE, help_text=_(
+            'Maximum number of files to claim for upload on each check.'
+        ), verbose_name=_('Batch size')
+    )
+    concurrency = models.PositiveIntegerField(
+        default=DEFAULT_WATCH_FOLDER_CONCURRENCY, help_text=_(
+            'Maximum number of files from this folder being uploaded at the '
+            'same time.'
+        ), verbose_name=_('Concurrency')
+    )
+
+    def check_file(self, file_name):
+        """
+        Claim a single file reported as completely written by the watch
+        folder monitor. Returns False without claiming the file when the
+        folder already has the maximum number of files being uploaded, for
+        the monitor to try again later.
+        """
+        if self.get_claim_count() >= self.concurrency:
+            return False
+
+        full_path = os.path.join(unicode(self.folder_path), file_name)
+        if os.path.isfile(full_path):
+            self.claim_file(file_name=file_name)
+
+        return True
 
     def check_source(self):
+        processing_path = self.get_processing_path()
+
+        if not os.path.isdir(processing_path):
+            os.makedirs(processing_path)
+
+        now = time.time()
+
+        # Queue again the claims whose upload was interrupted, ie: by a
+        # worker restart.
+        claim_count = 0
+        for claim_name in os.listdir(processing_path):
+            claim_path = os.path.join(processing_path, claim_name)
+            try:
+                claim_age = now - os.path.getmtime(claim_path)
+                if claim_age > WATCH_FOLDER_CLAIM_TIMEOUT:
+                    os.utime(claim_path, None)
+                    logger.warning(
+                        'Watch folder "%s"; retrying stale claim: %s',
+                        self, claim_name
+                    )
+                    task_upload_watch_folder_claim.apply_async(
+                        kwargs={'claim_name': claim_name, 'source_id': self.pk}
+                    )
+            except OSError:
+                # Claim finished while checking it
+                continue
+            else:
+                claim_count += 1
+
+        self.claim_files(
+            count=min(self.batch_size, self.concurrency - claim_count)
+        )
+
+    def claim_files(self, count):
+        """
+        Claim up to count files of the folder, skipping the files modified
+        recently that might still be being written. Returns the number of
+        files claimed.
+        """
+        now = time.time()
+        claimed = 0
+
         # Force self.folder_path to unicode to avoid os.listdir returning
         # str for non-latin filenames, gh-issue #163
-        for file_name in os.listdir(unicode(self.folder_path)):
+        for file_name in sorted(os.listdir(unicode(self.folder_path))):
+            if claimed >= count:
+                break
+
             full_path = os.path.join(self.folder_path, file_name)
-            if os.path.isfile(full_path):
-                with File(file=open(full_path, mode='rb')) as file_object:
-                    self.handle_upload(
-                        file_object=file_object,
-                        expand=(self.uncompress == SOURCE_UNCOMPRESS_CHOICE_Y),
-                        label=file_name
-                    )
-                    os.unlink(full_path)
+
+            if not os.path.isfile(full_path):
+                continue
+
+            try:
+                file_age = now - os.path.getmtime(full_path)
+                if file_age < WATCH_FOLDER_STABLE_TIME:
+                    # File modified recently, it might still be being
+                    # written.
+                    continue
+            except OSError:
+                # File removed while checking it
+                continue
+
+            if self.claim_file(file_name=file_name):
+                claimed += 1
+
+        return claimed
+
+    def claim_file(self, file_name):
+        processing_path = self.get_processing_path()
+
+        if not os.path.isdir(processing_path):
+            os.makedirs(processing_path)
+
+        claim_name = uuid.uuid4().hex
+        claim_path = os.path.join(processing_path, claim_name)
+        os.mkdir(claim_path)
+
+        try:
+            os.rename(
+                os.path.join(unicode(self.folder_path), file_name),
+                os.path.join(claim_path, file_name)
+            )
+        except OSError:
+            # Claimed by another check of this folder
+            os.rmdir(claim_path)
+            return False
+
+        task_upload_watch_folder_claim.apply_async(
+            kwargs={'claim_name': claim_name, 'source_id': self.pk}
+        )
+        return True
+
+    def claim_next_files(self):
+        """
+        Claim files until the folder has the maximum number of files being
+        uploaded. Called when the upload of a claim finishes, to keep
+        uploading the files of the folder without waiting for the next
+        check.
+        """
+        return self.claim_files(
+            count=self.concurrency - self.get_claim_count()
+        )
+
+    def get_claim_count(self):
+        try:
+            return len(os.listdir(self.get_processing_path()))
+        except OSError:
+            return 0
+
+    def get_error_path(self):
+        return os.path.join(
+            unicode(self.folder_path), WATCH_FOLDER_ERROR_DIRECTORY
+        )
+
+    def get_processing_path(self):
+        return os.path.join(
+            unicode(self.folder_path), WATCH_FOLDER_PROCESSING_DIRECTORY
+        )
+
+    def reject_claim(self, claim_name):
+        """
+        Move a claim whose upload failed to the error directory of the
+        watch folder. The claim is not uploaded again and no longer counts
+        toward the concurrency of the folder. Returns the new path of the
+        claim.
+        """
+        error_path = self.get_error_path()
+
+        if not os.path.isdir(error_path):
+            os.makedirs(error_path)
+
+        claim_error_path = os.path.join(error_path, claim_name)
+        os.rename(
+            os.path.join(self.get_processing_path(), claim_name),
+            claim_error_path
+        )
+        return claim_error_path
+
+    def upload_claim(self, claim_name):
+        claim_path = os.path.join(self.get_processing_path(), claim_name)
+
+        try:
+            file_name = os.listdir(claim_path)[0]
+        except (IndexError, OSError):
+            # Already uploaded
+            return
+
+        full_path = os.path.join(claim_path, file_name)
+
+        with File(file=open(full_path, mode='rb')) as file_object:
+            self.handle_upload(
+                file_object=file_object,
+                expand=(self.uncompress == SOURCE_UNCOMPRESS_CHOICE_Y),
+                label=file_name
+            )
+
+        os.unlink(full_path)
+        os.rmdir(claim_path)
 
     class Meta:
         verbose_name = _('Watch folder')
@@ -656,3 +1077,38 @@ class SourceLog(models.Model):
         ordering = ('-datetime',)
         verbose_name = _('Log entry')
         verbose_name_plural = _('Log entries')
+
+
+@python_2_unicode_compatible
+class FailedEmailMessage(models.Model):
+    """
+    Downloaded email message whose processing failed. The message file is
+    kept and its processing is queued again on the following checks of
+    the source.
+    """
+    source = models.ForeignKey(
+        Source, on_delete=models.CASCADE,
+        related_name='failed_email_messages', verbose_name=_('Source')
+    )
+    shared_uploaded_file = models.OneToOneField(
+        SharedUploadedFile, on_delete=models.CASCADE,
+        related_name='failed_email_message',
+        verbose_name=_('Shared uploaded file')
+    )
+    datetime = models.DateTimeField(
+        auto_now=True, editable=False, verbose_name=_('Date time')
+    )
+    error = models.TextField(
+        blank=True, editable=False, verbose_name=_('Error')
+    )
+    retry_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name=_('Retry count')
+    )
+
+    class Meta:
+        ordering = ('datetime',)
+        verbose_name = _('Failed email message')
+        verbose_name_plural = _('Failed email messages')
+
+    def __str__(self):
+        return force_text(self.shared_uploaded_file)
@@ -4,13 +4,19 @@ from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.core.files import File
 from django.db import OperationalError
+from django.db.models import F
+from django.utils.encoding import force_text
 from django.utils.translation import ugettext_lazy as _
 
 from mayan.celery import app
 
 from common.compressed_files import CompressedFile, NotACompressedFile
+from lock_manager import LockError
+from lock_manager.runtime import locking_backend
 
-from .literals import DEFAULT_SOURCE_TASK_RETRY_DELAY
+from .literals import (
+    DEFAULT_SOURCE_TASK_RETRY_DELAY, WATCH_FOLDER_CLAIM_TIMEOUT
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +27,21 @@ def task_check_interval_source(source_id):
         app_label='sources', model_name='Source'
     )
 
+    DocumentVersionOCRRun = apps.get_model(
+        app_label='ocr', model_name='DocumentVersionOCRRun'
+    )
+
     source = Source.objects.get_subclass(pk=source_id)
     if source.enabled:
+        if DocumentVersionOCRRun.objects.is_backlogged():
+            # Don't add to the OCR backlog, the documents will be picked up
+            # by a later check
+            logger.info(
+                'OCR backlog above threshold, skipping check of source: %s',
+                source
+            )
+            return
+
         try:
             source.check_source()
         except Exception as exception:
@@ -34,6 +53,72 @@ def task_check_interval_source(source_id):
             source.logs.all().delete()
 
 
+@app.task(bind=True, default_retry_delay=DEFAULT_SOURCE_TASK_RETRY_DELAY, ignore_result=True)
+def task_process_email_message(self, shared_uploaded_file_id, source_id):
+    EmailBaseModel = apps.get_model(
+        app_label='sources', model_name='EmailBaseModel'
+    )
+
+    FailedEmailMessage = apps.get_model(
+        app_label='sources', model_name='FailedEmailMessage'
+    )
+
+    SharedUploadedFile = apps.get_model(
+        app_label='common', model_name='SharedUploadedFile'
+    )
+
+    Source = apps.get_model(
+        app_label='sources', model_name='Source'
+    )
+
+    try:
+        source = Source.objects.get_subclass(pk=source_id)
+        shared_upload = SharedUploadedFile.objects.get(
+            pk=shared_uploaded_file_id
+        )
+    except OperationalError as exception:
+        logger.warning(
+            'Operational error during attempt to load data to process email '
+            'message: %s. Retrying.', exception
+        )
+        raise self.retry(exc=exception)
+
+    try:
+        with shared_upload.open() as file_object:
+            EmailBaseModel.process_message(
+                source=source, message=file_object
+            )
+    except OperationalError as exception:
+        logger.warning(
+            'Operational error while processing email message from source '
+            'id %d; %s. Retrying.', source_id, exception
+        )
+        raise self.retry(exc=exception)
+    except Exception as exception:
+        # Keep the message file, the next checks of the source will queue
+        # it again
+        logger.error(
+            'Error processing email message: %s from source id %d; %s',
+            shared_upload, source_id, exception
+        )
+        source.logs.create(
+            message=_('Error processing source: %s') % exception
+        )
+        FailedEmailMessage.objects.update_or_create(
+            shared_uploaded_file=shared_upload, defaults={
+                'error': force_text(exception), 'source': source
+            }
+        )
+    else:
+        try:
+            shared_upload.delete()
+        except OperationalError as exception:
+            logger.warning(
+                'Operational error during attempt to delete shared upload '
+                'file: %s; %s. Retrying.', shared_upload, exception
+            )
+
+
 @app.task(bind=True, default_retry_delay=DEFAULT_SOURCE_TASK_RETRY_DELAY, ignore_result=True)
 def task_upload_document(self, source_id, document_type_id, shared_uploaded_file_id, description=None, label=None, language=None, metadata_dict_list=None, tag_ids=None, user_id=None):
     SharedUploadedFile = apps.get_model(
@@ -86,7 +171,7 @@ def task_upload_document(self, source_id, document_type_id, shared_uploaded_file
 
 
 @app.task(bind=True, default_retry_delay=DEFAULT_SOURCE_TASK_RETRY_DELAY, ignore_result=True)
-def task_source_handle_upload(self, document_type_id, shared_uploaded_file_id, source_id, description=None, expand=False, label=None, language=None, metadata_dict_list=None, skip_list=None, tag_ids=None, user_id=None):
+def task_source_handle_upload(self, document_type_id, shared_uploaded_file_id, source_id, description=None, expand=False, label=None, language=None, metadata_dict_list=None, tag_ids=None, user_id=None):
     SharedUploadedFile = apps.get_model(
         app_label='common', model_name='SharedUploadedFile'
     )
@@ -118,50 +203,49 @@ def task_source_handle_upload(self, document_type_id, shared_uploaded_file_id, s
         'source_id': source_id, 'tag_ids': tag_ids, 'user_id': user_id
     }
 
-    if not skip_list:
-        skip_list = []
-
     with shared_upload.open() as file_object:
         if expand:
             try:
                 compressed_file = CompressedFile(file_object)
-                for compressed_file_child in compressed_file.children():
-                    # TODO: find way to uniquely identify child files
-                    # Use filename in the mean time.
-                    if unicode(compressed_file_child) not in skip_list:
-                        kwargs.update({'label': unicode(compressed_file_child)})
-
-                        try:
-                            child_shared_uploaded_file = SharedUploadedFile.objects.create(
-                                file=File(compressed_file_child)
-                            )
-                        except OperationalError as exception:
-                            logger.warning(
-                                'Operational error while preparing to upload '
-                                'child document: %s. Rescheduling.', exception
-                            )
-
-                            task_source_handle_upload.delay(
-                                document_type_id=document_type_id,
-                                shared_uploaded_file_id=shared_uploaded_file_id,
-                                source_id=source_id, description=description,
-                                expand=expand, label=label,
-                                language=language,
-                                metadata_dict_list=metadata_dict_list,
-                                skip_list=skip_list, tag_ids=tag_ids,
-                                user_id=user_id
-                            )
-                            return
-                        else:
-                            skip_list.append(unicode(compressed_file_child))
-                            task_upload_document.delay(
-                                shared_uploaded_file_id=child_shared_uploaded_file.pk,
-                                **kwargs
-                            )
-                        finally:
-                            compressed_file_child.close()
-
-                    compressed_file_child.close()
+                # Children already uploaded by a previous execution of this
+                # task are skipped by their position in the compressed file.
+                for compressed_file_child in compressed_file.children(skip=shared_upload.extracted_count):
+                    kwargs.update({'label': unicode(compressed_file_child)})
+
+                    try:
+                        child_shared_uploaded_file = SharedUploadedFile.objects.create(
+                            file=File(compressed_file_child)
+                        )
+                    except OperationalError as exception:
+                        logger.warning(
+                            'Operational error while preparing to upload '
+                            'child document: %s. Rescheduling.', exception
+                        )
+
+                        task_source_handle_upload.delay(
+                            document_type_id=document_type_id,
+                            shared_uploaded_file_id=shared_uploaded_file_id,
+                            source_id=source_id, description=description,
+                            expand=expand, label=label,
+                            language=language,
+                            metadata_dict_list=metadata_dict_list,
+                            tag_ids=tag_ids, user_id=user_id
+                        )
+                        return
+                    else:
+                        task_upload_document.delay(
+                            shared_uploaded_file_id=child_shared_uploaded_file.pk,
+                            **kwargs
+                        )
+                        # Persist the progress, an interrupted execution
+                        # resumes after the last child queued for upload.
+                        SharedUploadedFile.objects.filter(
+                            pk=shared_upload.pk
+                        ).update(extracted_count=F('extracted_count') + 1)
+                        shared_upload.extracted_count += 1
+                    finally:
+                        compressed_file_child.close()
+
                 try:
                     shared_upload.delete()
                 except OperationalError as exception:
@@ -179,3 +263,71 @@ def task_source_handle_upload(self, document_type_id, shared_uploaded_file_id, s
             task_upload_document.delay(
                 shared_uploaded_file_id=shared_upload.pk, **kwargs
             )
+
+
+@app.task(bind=True, default_retry_delay=DEFAULT_SOURCE_TASK_RETRY_DELAY, ignore_result=True)
+def task_upload_watch_folder_claim(self, claim_name, source_id):
+    WatchFolderSource = apps.get_model(
+        app_label='sources', model_name='WatchFolderSource'
+    )
+
+    try:
+        source = WatchFolderSource.objects.get(pk=source_id)
+    except WatchFolderSource.DoesNotExist:
+        # Source was deleted before we could execute, abort
+        return
+
+    try:
+        lock = locking_backend.acquire_lock(
+            name='sources:watch_folder_claim_{}'.format(claim_name),
+            timeout=WATCH_FOLDER_CLAIM_TIMEOUT
+        )
+    except LockError:
+        logger.debug(
+            'Watch folder claim already being uploaded: %s', claim_name
+        )
+        return
+
+    try:
+        source.upload_claim(claim_name=claim_name)
+    except OperationalError as exception:
+        logger.warning(
+            'Operational error while uploading watch folder claim: %s; %s. '
+            'Retrying.', claim_name, exception
+        )
+        raise self.retry(exc=exception)
+    except Exception as exception:
+        logger.error(
+            'Error uploading watch folder claim: %s; %s', claim_name,
+            exception
+        )
+        source.logs.create(
+            message=_('Error processing source: %s') % exception
+        )
+
+        try:
+            claim_error_path = source.reject_claim(claim_name=claim_name)
+        except OSError as exception:
+            logger.error(
+                'Error moving the watch folder claim: %s to the error '
+                'directory; %s', claim_name, exception
+            )
+        else:
+            logger.error(
+                'Watch folder claim moved to: %s', claim_error_path
+            )
+    finally:
+        lock.release()
+
+    DocumentVersionOCRRun = apps.get_model(
+        app_label='ocr', model_name='DocumentVersionOCRRun'
+    )
+
+    if source.enabled and not DocumentVersionOCRRun.objects.is_backlogged():
+        try:
+            source.claim_next_files()
+        except OSError as exception:
+            logger.error(
+                'Error claiming the next files of watch folder: %s; %s',
+                source, exception
+            )
@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+from email import encoders
+from email.mime.base import MIMEBase
 import os
 import shutil
 
@@ -7,7 +9,7 @@ from common.tests import BaseTestCase
 from common.utils import mkdtemp
 from documents.tests import TEST_NON_ASCII_DOCUMENT_PATH
 
-from ..classes import StagingFile
+from ..classes import Attachment, StagingFile
 
 
 class StagingFileTestCase(BaseTestCase):
@@ -33,3 +35,17 @@ class StagingFileTestCase(BaseTestCase):
         self.assertEqual(filename, staging_file_2.filename)
 
         shutil.rmtree(temporary_directory)
+
+
+class AttachmentTestCase(BaseTestCase):
+    def test_base64_attachment(self):
+        with open(TEST_NON_ASCII_DOCUMENT_PATH, 'rb') as file_object:
+            content = file_object.read()
+
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(content)
+        encoders.encode_base64(part)
+
+        with Attachment(part, name='test.png') as file_object:
+            self.assertEqual(file_object.size, len(content))
+            self.assertEqual(file_object.read(), content)
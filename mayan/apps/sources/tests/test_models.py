@@ -1,24 +1,46 @@
 from __future__ import unicode_literals
 
+import os
+import re
 import shutil
+import tarfile
+
+import mock
 
 from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.base import ContentFile
 from django.test import override_settings
 
-from common.utils import mkdtemp
+from common.models import SharedUploadedFile
+from common.utils import mkdtemp, mkstemp
 from common.tests import BaseTestCase
-from documents.models import Document, DocumentType
+from documents.models import Document, DocumentType, DocumentVersion
+from documents.runtime import storage_backend
 from documents.tests import (
     TEST_COMPRESSED_DOCUMENT_PATH, TEST_DOCUMENT_TYPE,
     TEST_NON_ASCII_DOCUMENT_FILENAME, TEST_NON_ASCII_DOCUMENT_PATH,
-    TEST_NON_ASCII_COMPRESSED_DOCUMENT_PATH
+    TEST_NON_ASCII_COMPRESSED_DOCUMENT_PATH, TEST_SMALL_DOCUMENT_PATH
+)
+from metadata.models import MetadataType, DocumentTypeMetadataType
+from metadata.tests.literals import (
+    TEST_METADATA_TYPE_LABEL, TEST_METADATA_TYPE_NAME
 )
+from tags.models import Tag
+from tags.tests.literals import TEST_TAG_COLOR, TEST_TAG_LABEL
 from user_management.tests import (
     TEST_ADMIN_EMAIL, TEST_ADMIN_PASSWORD, TEST_ADMIN_USERNAME
 )
 
-from ..literals import SOURCE_UNCOMPRESS_CHOICE_Y
-from ..models import WatchFolderSource, WebFormSource
+from ..literals import (
+    SOURCE_UNCOMPRESS_CHOICE_N, SOURCE_UNCOMPRESS_CHOICE_Y,
+    WATCH_FOLDER_ERROR_DIRECTORY, WATCH_FOLDER_PROCESSING_DIRECTORY
+)
+from ..models import (
+    EmailBaseModel, FailedEmailMessage, IMAPEmail, POP3Email,
+    WatchFolderSource, WebFormSource
+)
+from ..tasks import task_source_handle_upload
 
 
 @override_settings(OCR_AUTO_OCR=False)
@@ -50,7 +72,7 @@ class UploadDocumentTestCase(BaseTestCase):
         """
 
         temporary_directory = mkdtemp()
-        shutil.copy(TEST_NON_ASCII_DOCUMENT_PATH, temporary_directory)
+        shutil.copy2(TEST_NON_ASCII_DOCUMENT_PATH, temporary_directory)
 
         watch_folder = WatchFolderSource.objects.create(
             document_type=self.document_type, folder_path=temporary_directory,
@@ -72,7 +94,7 @@ class UploadDocumentTestCase(BaseTestCase):
 
         # Test Non-ASCII named documents inside Non-ASCII named compressed file
 
-        shutil.copy(
+        shutil.copy2(
             TEST_NON_ASCII_COMPRESSED_DOCUMENT_PATH, temporary_directory
         )
 
@@ -91,6 +113,189 @@ class UploadDocumentTestCase(BaseTestCase):
 
         shutil.rmtree(temporary_directory)
 
+    def test_upload_documents(self):
+        metadata_type = MetadataType.objects.create(
+            name=TEST_METADATA_TYPE_NAME, label=TEST_METADATA_TYPE_LABEL
+        )
+        DocumentTypeMetadataType.objects.create(
+            document_type=self.document_type, metadata_type=metadata_type
+        )
+        tag = Tag.objects.create(color=TEST_TAG_COLOR, label=TEST_TAG_LABEL)
+
+        source = WebFormSource.objects.create(
+            label='test source', uncompress=SOURCE_UNCOMPRESS_CHOICE_N
+        )
+
+        with open(TEST_SMALL_DOCUMENT_PATH, 'rb') as file_object_1:
+            with open(TEST_SMALL_DOCUMENT_PATH, 'rb') as file_object_2:
+                documents, failures = source.upload_documents(
+                    document_type=self.document_type, file_objects=(
+                        File(file_object_1, name='1.png'),
+                        File(file_object_2, name='2.png')
+                    ), metadata_dictionary={TEST_METADATA_TYPE_NAME: '1'},
+                    tag_ids=(tag.pk,)
+                )
+
+        self.assertEqual(failures, [])
+        self.assertEqual(
+            [document.label for document in documents], ['1.png', '2.png']
+        )
+        for document in documents:
+            self.assertEqual(document.pages.count(), 1)
+            self.assertEqual(
+                document.metadata.get(metadata_type=metadata_type).value, '1'
+            )
+            self.assertEqual(list(document.tags.all()), [tag])
+
+    def test_upload_documents_failure(self):
+        source = WebFormSource.objects.create(
+            label='test source', uncompress=SOURCE_UNCOMPRESS_CHOICE_N
+        )
+        stored_names = []
+        storage_save = storage_backend.save
+
+        def save(name, content, *args, **kwargs):
+            name = storage_save(name, content, *args, **kwargs)
+            stored_names.append(name)
+            return name
+
+        with open(TEST_SMALL_DOCUMENT_PATH, 'rb') as file_object_1:
+            with open(TEST_SMALL_DOCUMENT_PATH, 'rb') as file_object_2:
+                file_objects = (
+                    File(file_object_1, name='1.png'),
+                    File(file_object_2, name='2.png')
+                )
+                with mock.patch.object(storage_backend, 'save', save):
+                    with mock.patch.object(
+                        DocumentVersion, 'update_page_count', autospec=True,
+                        side_effect=(ValueError('test'), None)
+                    ):
+                        documents, failures = source.upload_documents(
+                            document_type=self.document_type,
+                            file_objects=file_objects
+                        )
+
+        self.assertEqual(
+            [document.label for document in documents], ['2.png']
+        )
+        self.assertEqual(Document.objects.count(), 1)
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0][0], file_objects[0])
+        self.assertEqual(len(stored_names), 2)
+        self.assertFalse(storage_backend.exists(stored_names[0]))
+        self.assertTrue(storage_backend.exists(stored_names[1]))
+
+    def test_watch_folder_claims(self):
+        temporary_directory = mkdtemp()
+        for file_name in ('1.png', '2.png', '3.png'):
+            shutil.copy2(
+                TEST_SMALL_DOCUMENT_PATH,
+                os.path.join(temporary_directory, file_name)
+            )
+
+        # File still being written
+        os.utime(os.path.join(temporary_directory, '3.png'), None)
+
+        watch_folder = WatchFolderSource.objects.create(
+            batch_size=1, document_type=self.document_type,
+            folder_path=temporary_directory,
+            uncompress=SOURCE_UNCOMPRESS_CHOICE_N
+        )
+
+        # The upload of the file claimed by the check claims the next file
+        watch_folder.check_source()
+        self.assertEqual(
+            list(
+                Document.objects.order_by('pk').values_list('label', flat=True)
+            ), ['1.png', '2.png']
+        )
+
+        # Interrupted upload
+        claim_path = os.path.join(
+            temporary_directory, WATCH_FOLDER_PROCESSING_DIRECTORY, 'claim'
+        )
+        os.mkdir(claim_path)
+        shutil.copy2(
+            TEST_SMALL_DOCUMENT_PATH, os.path.join(claim_path, '4.png')
+        )
+        os.utime(claim_path, (0, 0))
+
+        watch_folder.check_source()
+        self.assertEqual(Document.objects.count(), 3)
+        self.assertFalse(os.path.exists(claim_path))
+        self.assertEqual(
+            sorted(os.listdir(temporary_directory)),
+            [WATCH_FOLDER_PROCESSING_DIRECTORY, '3.png']
+        )
+
+        shutil.rmtree(temporary_directory)
+
+    def test_watch_folder_check_file(self):
+        temporary_directory = mkdtemp()
+        for file_name in ('1.png', '2.png'):
+            shutil.copy(
+                TEST_SMALL_DOCUMENT_PATH,
+                os.path.join(temporary_directory, file_name)
+            )
+
+        watch_folder = WatchFolderSource.objects.create(
+            concurrency=1, document_type=self.document_type,
+            folder_path=temporary_directory,
+            uncompress=SOURCE_UNCOMPRESS_CHOICE_N
+        )
+
+        watch_folder.check_file(file_name='1.png')
+        self.assertEqual(Document.objects.first().label, '1.png')
+
+        # Concurrency limit reached
+        os.mkdir(
+            os.path.join(
+                temporary_directory, WATCH_FOLDER_PROCESSING_DIRECTORY,
+                'claim'
+            )
+        )
+        self.assertFalse(watch_folder.check_file(file_name='2.png'))
+        self.assertEqual(Document.objects.count(), 1)
+        self.assertTrue(
+            os.path.exists(os.path.join(temporary_directory, '2.png'))
+        )
+
+        shutil.rmtree(temporary_directory)
+
+    def test_watch_folder_failed_claims(self):
+        temporary_directory = mkdtemp()
+        for file_name in ('1.png', '2.png'):
+            shutil.copy2(
+                TEST_SMALL_DOCUMENT_PATH,
+                os.path.join(temporary_directory, file_name)
+            )
+            os.utime(os.path.join(temporary_directory, file_name), (0, 0))
+
+        watch_folder = WatchFolderSource.objects.create(
+            concurrency=1, document_type=self.document_type,
+            folder_path=temporary_directory,
+            uncompress=SOURCE_UNCOMPRESS_CHOICE_N
+        )
+
+        with mock.patch.object(WatchFolderSource, 'handle_upload') as handle_upload:
+            handle_upload.side_effect = ValueError('Test error')
+            watch_folder.check_source()
+
+        # Failed claims don't block the next files of the folder
+        self.assertEqual(handle_upload.call_count, 2)
+        self.assertEqual(watch_folder.get_claim_count(), 0)
+
+        error_path = os.path.join(
+            temporary_directory, WATCH_FOLDER_ERROR_DIRECTORY
+        )
+        self.assertEqual(
+            sorted(
+                file_name for claim_name in os.listdir(error_path) for file_name in os.listdir(os.path.join(error_path, claim_name))
+            ), ['1.png', '2.png']
+        )
+
+        shutil.rmtree(temporary_directory)
+
 
 @override_settings(OCR_AUTO_OCR=False)
 class CompressedUploadsTestCase(BaseTestCase):
@@ -127,3 +332,322 @@ class CompressedUploadsTestCase(BaseTestCase):
                 'label', flat=True
             )
         )
+
+    def test_upload_compressed_tar_file(self):
+        source = WebFormSource(
+            label='test source', uncompress=SOURCE_UNCOMPRESS_CHOICE_Y
+        )
+
+        file_descriptor, file_path = mkstemp()
+        os.close(file_descriptor)
+
+        with tarfile.open(file_path, mode='w:gz') as archive:
+            archive.add(
+                TEST_SMALL_DOCUMENT_PATH, arcname='first document.png'
+            )
+            archive.add(
+                TEST_SMALL_DOCUMENT_PATH, arcname='second document.png'
+            )
+
+        with open(file_path, 'rb') as file_object:
+            source.handle_upload(
+                document_type=self.document_type,
+                file_object=file_object,
+                expand=(source.uncompress == SOURCE_UNCOMPRESS_CHOICE_Y)
+            )
+
+        os.unlink(file_path)
+
+        self.assertEqual(
+            list(Document.objects.order_by('label').values_list(
+                'label', flat=True
+            )), ['first document.png', 'second document.png']
+        )
+
+    def test_resume_compressed_upload(self):
+        source = WebFormSource.objects.create(
+            label='test source', uncompress=SOURCE_UNCOMPRESS_CHOICE_Y
+        )
+
+        with open(TEST_COMPRESSED_DOCUMENT_PATH) as file_object:
+            shared_uploaded_file = SharedUploadedFile.objects.create(
+                file=File(file_object)
+            )
+
+        # First child already extracted by an interrupted execution
+        SharedUploadedFile.objects.filter(pk=shared_uploaded_file.pk).update(
+            extracted_count=1
+        )
+
+        task_source_handle_upload.apply(
+            kwargs={
+                'document_type_id': self.document_type.pk, 'expand': True,
+                'shared_uploaded_file_id': shared_uploaded_file.pk,
+                'source_id': source.pk
+            }
+        )
+
+        self.assertEqual(Document.objects.count(), 1)
+        self.assertFalse(
+            SharedUploadedFile.objects.filter(
+                pk=shared_uploaded_file.pk
+            ).exists()
+        )
+
+
+TEST_EMAIL_MESSAGE = (
+    'Subject: Test message {}\n'
+    'Content-Type: text/plain\n\n'
+    'Message body.\n'
+)
+
+
+class MockIMAPMailbox(object):
+    def __init__(self, uid_validity, uids):
+        self.messages = {
+            uid: TEST_EMAIL_MESSAGE.format(uid) for uid in uids
+        }
+        self.uid_validity = uid_validity
+
+    def close(self):
+        pass
+
+    def expunge(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def logout(self):
+        pass
+
+    def response(self, code):
+        return code, [str(self.uid_validity)]
+
+    def select(self, mailbox):
+        pass
+
+    def uid(self, command, *args):
+        if command == 'search':
+            # Return every message like a server does for a UID range past
+            # the last message
+            return 'OK', [' '.join(str(uid) for uid in sorted(self.messages))]
+        elif command == 'fetch':
+            uid = int(args[0])
+            message = self.messages[uid]
+            if args[1] == '(RFC822.SIZE)':
+                return 'OK', [
+                    '1 (UID {} RFC822.SIZE {})'.format(uid, len(message))
+                ]
+            else:
+                offset, length = [
+                    int(value) for value in re.search(
+                        r'<(\d+)\.(\d+)>', args[1]
+                    ).groups()
+                ]
+                return 'OK', [
+                    (
+                        '1 (UID {} BODY[]<{}>'.format(uid, offset),
+                        message[offset:offset + length]
+                    ), ')'
+                ]
+        elif command == 'store':
+            self.messages.pop(int(args[0]))
+            return 'OK', [None]
+
+
+class MockPOP3Mailbox(object):
+    def __init__(self, message_count):
+        self.deleted = []
+        self.messages = [
+            TEST_EMAIL_MESSAGE.format(number) for number in range(
+                1, message_count + 1
+            )
+        ]
+
+    def _getline(self):
+        line = next(self.response)
+        return line, len(line) + 2
+
+    def _getresp(self):
+        return '+OK'
+
+    def _putcmd(self, line):
+        command, message_number = line.split()
+        self.response = iter(
+            [
+                '.' + message_line if message_line.startswith('.') else message_line
+                for message_line in self.messages[int(message_number) - 1].splitlines()
+            ] + ['.']
+        )
+
+    def dele(self, message_number):
+        self.deleted.append(int(message_number))
+
+    def getwelcome(self):
+        pass
+
+    def list(self):
+        return 'OK', [
+            '{} {}'.format(number, len(message)) for number, message in enumerate(self.messages, 1)
+        ]
+
+    def pass_(self, password):
+        pass
+
+    def quit(self):
+        pass
+
+    def user(self, username):
+        pass
+
+
+class EmailSourceTestCase(BaseTestCase):
+    def setUp(self):
+        super(EmailSourceTestCase, self).setUp()
+        self.document_type = DocumentType.objects.create(
+            label=TEST_DOCUMENT_TYPE
+        )
+
+    def tearDown(self):
+        self.document_type.delete()
+        super(EmailSourceTestCase, self).tearDown()
+
+    def _create_imap_source(self, **kwargs):
+        return IMAPEmail.objects.create(
+            document_type=self.document_type, label='test source',
+            host='localhost', username='username', password='password',
+            uncompress=SOURCE_UNCOMPRESS_CHOICE_N, **kwargs
+        )
+
+    def _get_queued_messages(self, task):
+        result = []
+        for call in task.apply_async.call_args_list:
+            shared_uploaded_file = SharedUploadedFile.objects.get(
+                pk=call[1]['kwargs']['shared_uploaded_file_id']
+            )
+            with shared_uploaded_file.open() as file_object:
+                result.append(file_object.read())
+
+        return result
+
+    @mock.patch('sources.models.EMAIL_FETCH_CHUNK_SIZE', 8)
+    @mock.patch('sources.models.task_process_email_message')
+    @mock.patch('sources.models.imaplib.IMAP4')
+    def test_imap_last_uid(self, mock_imap, mock_task):
+        mock_imap.return_value = MockIMAPMailbox(
+            uid_validity=100, uids=(1, 2, 3)
+        )
+        source = self._create_imap_source(batch_size=2, ssl=False)
+
+        source.check_source()
+        source.refresh_from_db()
+
+        self.assertEqual(source.last_uid, 2)
+        self.assertEqual(source.uid_validity, 100)
+        self.assertEqual(
+            self._get_queued_messages(task=mock_task), [
+                TEST_EMAIL_MESSAGE.format(1), TEST_EMAIL_MESSAGE.format(2)
+            ]
+        )
+
+        mock_task.reset_mock()
+        source.check_source()
+        source.refresh_from_db()
+
+        self.assertEqual(source.last_uid, 3)
+        self.assertEqual(
+            self._get_queued_messages(task=mock_task),
+            [TEST_EMAIL_MESSAGE.format(3)]
+        )
+
+    @mock.patch('sources.models.task_process_email_message')
+    @mock.patch('sources.models.imaplib.IMAP4')
+    def test_imap_last_uid_already_downloaded(self, mock_imap, mock_task):
+        mock_imap.return_value = MockIMAPMailbox(
+            uid_validity=100, uids=(5,)
+        )
+        source = self._create_imap_source(
+            last_uid=5, ssl=False, uid_validity=100
+        )
+
+        source.check_source()
+
+        self.assertEqual(mock_task.apply_async.call_count, 0)
+
+    @mock.patch('sources.models.task_process_email_message')
+    @mock.patch('sources.models.imaplib.IMAP4')
+    def test_imap_uid_validity_change(self, mock_imap, mock_task):
+        mock_imap.return_value = MockIMAPMailbox(uid_validity=200, uids=(1,))
+        source = self._create_imap_source(
+            last_uid=5, ssl=False, uid_validity=100
+        )
+
+        source.check_source()
+        source.refresh_from_db()
+
+        self.assertEqual(source.last_uid, 1)
+        self.assertEqual(source.uid_validity, 200)
+        self.assertEqual(
+            self._get_queued_messages(task=mock_task),
+            [TEST_EMAIL_MESSAGE.format(1)]
+        )
+
+    @mock.patch('sources.models.task_process_email_message')
+    @mock.patch('sources.models.poplib.POP3')
+    def test_pop3_batch_size(self, mock_pop3, mock_task):
+        mailbox = MockPOP3Mailbox(message_count=3)
+        mock_pop3.return_value = mailbox
+        source = POP3Email.objects.create(
+            batch_size=2, document_type=self.document_type,
+            label='test source', host='localhost', username='username',
+            password='password', ssl=False,
+            uncompress=SOURCE_UNCOMPRESS_CHOICE_N
+        )
+
+        source.check_source()
+
+        self.assertEqual(mailbox.deleted, [1, 2])
+        self.assertEqual(
+            self._get_queued_messages(task=mock_task), [
+                TEST_EMAIL_MESSAGE.format(1), TEST_EMAIL_MESSAGE.format(2)
+            ]
+        )
+
+    @mock.patch('sources.models.task_process_email_message')
+    @mock.patch('sources.models.poplib.POP3')
+    def test_pop3_dot_lines(self, mock_pop3, mock_task):
+        mailbox = MockPOP3Mailbox(message_count=0)
+        mailbox.messages = [TEST_EMAIL_MESSAGE.format(1) + '.\n..line\n']
+        mock_pop3.return_value = mailbox
+        source = POP3Email.objects.create(
+            document_type=self.document_type, label='test source',
+            host='localhost', username='username', password='password',
+            ssl=False, uncompress=SOURCE_UNCOMPRESS_CHOICE_N
+        )
+
+        source.check_source()
+
+        self.assertEqual(
+            self._get_queued_messages(task=mock_task),
+            [TEST_EMAIL_MESSAGE.format(1) + '.\n..line\n']
+        )
+
+    def test_failed_message_retry(self):
+        source = self._create_imap_source()
+
+        with mock.patch.object(EmailBaseModel, 'process_message') as process_message:
+            process_message.side_effect = ValueError('Test error')
+            source.queue_message(
+                file_object=ContentFile(TEST_EMAIL_MESSAGE.format(1))
+            )
+
+        failed_email_message = FailedEmailMessage.objects.get()
+        self.assertEqual(failed_email_message.source.pk, source.pk)
+        self.assertEqual(failed_email_message.error, 'Test error')
+
+        with mock.patch.object(EmailBaseModel, 'process_message'):
+            source.queue_failed_messages()
+
+        self.assertEqual(FailedEmailMessage.objects.count(), 0)
+        self.assertEqual(SharedUploadedFile.objects.count(), 0)
@@ -1,13 +1,11 @@
 from __future__ import unicode_literals
 
+import io
 import os
+import struct
+from tempfile import SpooledTemporaryFile
 import zipfile
-
-try:
-    import zlib  # NOQA
-    COMPRESSION = zipfile.ZIP_DEFLATED
-except:
-    COMPRESSION = zipfile.ZIP_STORED
+import zlib
 
 try:
     from cStringIO import StringIO
@@ -17,35 +15,189 @@ except ImportError:
 from django.core.files import File
 from django.core.files.storage import FileSystemStorage
 
-from ..settings import FILESTORAGE_LOCATION
+from ..literals import (
+    COMPRESSED_STORAGE_BLOCK_SIZE, COMPRESSED_STORAGE_HEADER_FORMAT,
+    COMPRESSED_STORAGE_INDEX_ENTRY_FORMAT, COMPRESSED_STORAGE_MAGIC,
+    COMPRESSED_STORAGE_TRAILER_FORMAT
+)
+from ..settings import setting_filestorage_location
+
+HEADER_SIZE = struct.calcsize(COMPRESSED_STORAGE_HEADER_FORMAT)
+INDEX_ENTRY_SIZE = struct.calcsize(COMPRESSED_STORAGE_INDEX_ENTRY_FORMAT)
+TRAILER_SIZE = struct.calcsize(COMPRESSED_STORAGE_TRAILER_FORMAT)
+
+
+class BlockCompressedFile(io.RawIOBase):
+    """
+    Seekable, read only file object over a file stored as independently
+    compressed blocks. Only the blocks that contain the requested data are
+    read and decompressed, one at a time.
+    """
+    def __init__(self, file_object):
+        self.file_object = file_object
+
+        self.file_object.seek(0)
+        magic, self.block_size = struct.unpack(
+            COMPRESSED_STORAGE_HEADER_FORMAT,
+            self.file_object.read(HEADER_SIZE)
+        )
+
+        self.file_object.seek(-TRAILER_SIZE, os.SEEK_END)
+        index_offset, self.size, block_count, magic = struct.unpack(
+            COMPRESSED_STORAGE_TRAILER_FORMAT,
+            self.file_object.read(TRAILER_SIZE)
+        )
+
+        self.file_object.seek(index_offset)
+        index = self.file_object.read(block_count * INDEX_ENTRY_SIZE)
+        self.blocks = [
+            struct.unpack_from(
+                COMPRESSED_STORAGE_INDEX_ENTRY_FORMAT, index,
+                block_number * INDEX_ENTRY_SIZE
+            ) for block_number in range(block_count)
+        ]
+
+        self.block_number = None
+        self.block_data = b''
+        self.position = 0
+
+    def close(self):
+        if not self.closed:
+            self.file_object.close()
+
+        super(BlockCompressedFile, self).close()
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self.position
+
+        result = []
+        while size > 0 and self.position < self.size:
+            block_number, block_offset = divmod(
+                self.position, self.block_size
+            )
+
+            if block_number != self.block_number:
+                offset, compressed_size = self.blocks[block_number]
+                self.file_object.seek(offset)
+                self.block_data = zlib.decompress(
+                    self.file_object.read(compressed_size)
+                )
+                self.block_number = block_number
+
+            data = self.block_data[block_offset:block_offset + size]
+            result.append(data)
+            self.position += len(data)
+            size -= len(data)
+
+        return b''.join(result)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.size
+
+        self.position = max(offset, 0)
+        return self.position
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
 
 
 class CompressedStorage(FileSystemStorage):
-    """Simple wrapper for the stock Django FileSystemStorage class"""
+    """
+    Wrapper for the stock Django FileSystemStorage class that compresses the
+    stored files in fixed size blocks. Files are compressed and read back a
+    block at a time. Files stored as ZIP files by previous versions are
+    still readable.
+    """
 
     separator = os.path.sep
 
     def __init__(self, *args, **kwargs):
         super(CompressedStorage, self).__init__(*args, **kwargs)
-        self.location = FILESTORAGE_LOCATION
+        self.location = setting_filestorage_location.value
 
-    def save(self, name, content):
-        descriptor = StringIO()
-        zf = zipfile.ZipFile(descriptor, mode='w', compression=COMPRESSION)
+    def _save(self, name, content):
+        descriptor = SpooledTemporaryFile(
+            max_size=COMPRESSED_STORAGE_BLOCK_SIZE
+        )
+        descriptor.write(
+            struct.pack(
+                COMPRESSED_STORAGE_HEADER_FORMAT, COMPRESSED_STORAGE_MAGIC,
+                COMPRESSED_STORAGE_BLOCK_SIZE
+            )
+        )
 
-        zf.writestr('document', content.read())
+        blocks = []
+        size = 0
+        content.seek(0)
+        for block in iter(lambda: content.read(COMPRESSED_STORAGE_BLOCK_SIZE), b''):
+            compressed_block = zlib.compress(block)
+            blocks.append((descriptor.tell(), len(compressed_block)))
+            descriptor.write(compressed_block)
+            size += len(block)
 
-        for file in zf.filelist:
-            file.create_system = 0
+        index_offset = descriptor.tell()
+        for block in blocks:
+            descriptor.write(
+                struct.pack(COMPRESSED_STORAGE_INDEX_ENTRY_FORMAT, *block)
+            )
 
-        zf.close()
+        descriptor.write(
+            struct.pack(
+                COMPRESSED_STORAGE_TRAILER_FORMAT, index_offset, size,
+                len(blocks), COMPRESSED_STORAGE_MAGIC
+            )
+        )
         descriptor.seek(0)
-        return super(CompressedStorage, self).save(name, File(descriptor))
 
-    def open(self, name, mode='rb'):
-        storage_file = super(CompressedStorage, self).open(name, mode)
+        try:
+            return super(CompressedStorage, self)._save(
+                name, File(descriptor)
+            )
+        finally:
+            descriptor.close()
+
+    @staticmethod
+    def _is_block_compressed(storage_file):
+        storage_file.seek(0)
+        magic = storage_file.read(len(COMPRESSED_STORAGE_MAGIC))
+        storage_file.seek(0)
+        return magic == COMPRESSED_STORAGE_MAGIC
+
+    def _open(self, name, mode='rb'):
+        storage_file = super(CompressedStorage, self)._open(name, mode)
+
+        if self._is_block_compressed(storage_file):
+            return File(BlockCompressedFile(storage_file), name=name)
+
         zf = zipfile.ZipFile(storage_file)
         descriptor = StringIO()
         descriptor.write(zf.read('document'))
         descriptor.seek(0)
-        return File(descriptor)
+        storage_file.close()
+        return File(descriptor, name=name)
+
+    def size(self, name):
+        with super(CompressedStorage, self)._open(name, 'rb') as storage_file:
+            if self._is_block_compressed(storage_file):
+                storage_file.seek(-TRAILER_SIZE, os.SEEK_END)
+                return struct.unpack(
+                    COMPRESSED_STORAGE_TRAILER_FORMAT,
+                    storage_file.read(TRAILER_SIZE)
+                )[1]
+
+            return zipfile.ZipFile(storage_file).getinfo('document').file_size
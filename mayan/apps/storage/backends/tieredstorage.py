@@ -0,0 +1,276 @@
+from __future__ import unicode_literals
+
+import hashlib
+import logging
+import os
+from tempfile import mkstemp
+
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.utils._os import safe_join
+from django.utils.module_loading import import_string
+
+from ..literals import (
+    TIERED_CACHE_CHUNK_SIZE, TIERED_CACHE_INFO_SUFFIX,
+    TIERED_CACHE_PARTIAL_SUFFIX, TIERED_CACHE_PRUNE_TARGET
+)
+from ..settings import (
+    setting_tiered_backend, setting_tiered_cache_location,
+    setting_tiered_cache_maximum_size, setting_tiered_metadata_timeout,
+    setting_tiered_verify_checksum
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TieredStorage(Storage):
+    """
+    Storage backend that keeps local copies of the most recently used files
+    of another, slower storage backend. Files are copied locally the first
+    time they are opened and saved to both. Each local copy has an
+    information file with its size and checksum. The size is checked before
+    the copy is used and the checksum too when enabled. A running total of
+    the size of the local copies is kept in the cache and the least recently
+    used copies are deleted when it exceeds the maximum. Whether files exist, which is always asked to
+    the backend, and the size of files without a local copy are remembered
+    for a short time.
+    """
+    def __init__(self, *args, **kwargs):
+        super(TieredStorage, self).__init__(*args, **kwargs)
+        self.backend = import_string(setting_tiered_backend.value)()
+        self.location = setting_tiered_cache_location.value
+
+    def _get_cache_key(self, prefix, name):
+        return 'storage:tiered_{}_{}'.format(
+            prefix, hashlib.sha256(name.encode('utf-8')).hexdigest()
+        )
+
+    def _get_cache_path(self, name):
+        return safe_join(self.location, name)
+
+    def _get_total_size_cache_key(self):
+        return self._get_cache_key(prefix='total_size', name=self.location)
+
+    def _update_total_size(self, size):
+        """
+        Add size to the running total of the size of the local copies.
+        Returns the new total or None when the total is not known, because
+        it was not calculated yet or was evicted from the cache.
+        """
+        try:
+            return cache.incr(self._get_total_size_cache_key(), size)
+        except ValueError:
+            return None
+
+    def _get_cached_file(self, name):
+        """
+        Return the local copy of a file if it is valid, deleting it
+        otherwise.
+        """
+        path = self._get_cache_path(name)
+
+        try:
+            with open(path + TIERED_CACHE_INFO_SUFFIX) as file_object:
+                size, checksum = file_object.read().split()
+
+            file_object = open(path, 'rb')
+        except (IOError, ValueError):
+            return None
+
+        valid = os.fstat(file_object.fileno()).st_size == int(size)
+
+        if valid and setting_tiered_verify_checksum.value:
+            hash_object = hashlib.sha256()
+            for chunk in iter(lambda: file_object.read(TIERED_CACHE_CHUNK_SIZE), b''):
+                hash_object.update(chunk)
+
+            valid = hash_object.hexdigest() == checksum
+            file_object.seek(0)
+
+        if not valid:
+            logger.warning('Invalid local copy of file: %s', name)
+            file_object.close()
+            self._delete_cached_file(name=name)
+            return None
+
+        # Update the modification time, used as the last access time by
+        # the pruning.
+        os.utime(path, None)
+        return file_object
+
+    def _cache_file(self, name, content):
+        """
+        Write a local copy of a file. The copy is written to a temporary file
+        that is renamed when complete.
+        """
+        path = self._get_cache_path(name)
+        directory = os.path.dirname(path)
+
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Created by another process
+                pass
+
+        file_descriptor, temporary_path = mkstemp(
+            dir=directory, suffix=TIERED_CACHE_PARTIAL_SUFFIX
+        )
+        hash_object = hashlib.sha256()
+        size = 0
+
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file_object:
+                content.seek(0)
+                for chunk in iter(lambda: content.read(TIERED_CACHE_CHUNK_SIZE), b''):
+                    file_object.write(chunk)
+                    hash_object.update(chunk)
+                    size += len(chunk)
+
+            with open(path + TIERED_CACHE_INFO_SUFFIX, 'w') as file_object:
+                file_object.write(
+                    '{} {}'.format(size, hash_object.hexdigest())
+                )
+
+            os.rename(temporary_path, path)
+        except Exception as exception:
+            logger.error('Error copying file: %s; %s', name, exception)
+            try:
+                os.unlink(temporary_path)
+            except OSError:
+                pass
+        else:
+            maximum_size = setting_tiered_cache_maximum_size.value
+            if maximum_size:
+                total_size = self._update_total_size(size=size)
+                if total_size is None or total_size > maximum_size:
+                    self.prune()
+
+    def _delete_cached_file(self, name):
+        path = self._get_cache_path(name)
+
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except OSError:
+            pass
+        else:
+            self._update_total_size(size=-size)
+
+        try:
+            os.unlink(path + TIERED_CACHE_INFO_SUFFIX)
+        except OSError:
+            pass
+
+        cache.delete_many(
+            [
+                self._get_cache_key(prefix='exists', name=name),
+                self._get_cache_key(prefix='size', name=name)
+            ]
+        )
+
+    def _open(self, name, mode='rb'):
+        file_object = self._get_cached_file(name=name)
+
+        if not file_object:
+            with self.backend.open(name, mode) as content:
+                self._cache_file(name=name, content=content)
+
+            file_object = self._get_cached_file(name=name)
+
+        if not file_object:
+            # The local copy could not be made
+            return self.backend.open(name, mode)
+
+        return File(file_object, name=name)
+
+    def _save(self, name, content):
+        name = self.backend.save(name, content)
+        self._delete_cached_file(name=name)
+        self._cache_file(name=name, content=content)
+        return name
+
+    def delete(self, name):
+        self.backend.delete(name)
+        self._delete_cached_file(name=name)
+
+    def exists(self, name):
+        # A local copy is not enough, the file could have been deleted from
+        # the backend by another node.
+        key = self._get_cache_key(prefix='exists', name=name)
+        result = cache.get(key)
+
+        if result is None:
+            result = self.backend.exists(name)
+            cache.set(key, result, setting_tiered_metadata_timeout.value)
+
+        return result
+
+    def get_available_name(self, name, max_length=None):
+        return self.backend.get_available_name(name, max_length=max_length)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def prune(self):
+        """
+        Calculate the total size of the local copies and, when it exceeds
+        the maximum, delete the least recently used copies until the total
+        is below TIERED_CACHE_PRUNE_TARGET of the maximum. The pruning
+        frees some space to not be needed again on the next save. The
+        running total kept in the cache is set to the result.
+        """
+        maximum_size = setting_tiered_cache_maximum_size.value
+        if not maximum_size:
+            return
+
+        entries = []
+        total_size = 0
+        for directory, directories, file_names in os.walk(self.location):
+            for file_name in file_names:
+                if file_name.endswith((TIERED_CACHE_INFO_SUFFIX, TIERED_CACHE_PARTIAL_SUFFIX)):
+                    continue
+
+                path = os.path.join(directory, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # Deleted by another process
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        if total_size > maximum_size:
+            target_size = maximum_size * TIERED_CACHE_PRUNE_TARGET
+
+            for modification_time, size, path in sorted(entries):
+                if total_size <= target_size:
+                    break
+
+                self._delete_cached_file(
+                    name=os.path.relpath(path, self.location)
+                )
+                total_size -= size
+
+        cache.set(self._get_total_size_cache_key(), total_size, None)
+
+    def size(self, name):
+        try:
+            with open(self._get_cache_path(name) + TIERED_CACHE_INFO_SUFFIX) as file_object:
+                return int(file_object.read().split()[0])
+        except (IOError, IndexError, ValueError):
+            pass
+
+        key = self._get_cache_key(prefix='size', name=name)
+        result = cache.get(key)
+
+        if result is None:
+            result = self.backend.size(name)
+            cache.set(key, result, setting_tiered_metadata_timeout.value)
+
+        return result
+
+    def url(self, name):
+        return self.backend.url(name)
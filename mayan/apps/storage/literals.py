@@ -0,0 +1,18 @@
+from __future__ import unicode_literals
+
+# Compressed storage file format: a header with the block size, the
+# independently compressed blocks and a trailer with the offset of the
+# block index, the uncompressed size and the number of blocks.
+COMPRESSED_STORAGE_BLOCK_SIZE = 256 * 1024  # 256 KB
+COMPRESSED_STORAGE_HEADER_FORMAT = str('>8sI')
+COMPRESSED_STORAGE_INDEX_ENTRY_FORMAT = str('>QI')
+COMPRESSED_STORAGE_MAGIC = b'MAYANZB1'
+COMPRESSED_STORAGE_TRAILER_FORMAT = str('>QQI8s')
+
+DEFAULT_TIERED_CACHE_MAXIMUM_SIZE = 2 * 2 ** 30  # 2 GB
+DEFAULT_TIERED_METADATA_TIMEOUT = 60 * 5  # 5 minutes
+TIERED_CACHE_CHUNK_SIZE = 1024 * 1024
+TIERED_CACHE_INFO_SUFFIX = '.info'
+TIERED_CACHE_PARTIAL_SUFFIX = '.partial'
+# Fraction of the maximum size down to which the local copies are pruned
+TIERED_CACHE_PRUNE_TARGET = 0.9
@@ -7,8 +7,51 @@ from django.utils.translation import ugettext_lazy as _
 
 from smart_settings import Namespace
 
+from .literals import (
+    DEFAULT_TIERED_CACHE_MAXIMUM_SIZE, DEFAULT_TIERED_METADATA_TIMEOUT
+)
+
 namespace = Namespace(name='storage', label=_('Storage'))
 setting_filestorage_location = namespace.add_setting(
     global_name='STORAGE_FILESTORAGE_LOCATION',
     default=os.path.join(settings.MEDIA_ROOT, 'document_storage'), is_path=True
 )
+setting_tiered_backend = namespace.add_setting(
+    global_name='STORAGE_TIERED_BACKEND',
+    default='storage.backends.filebasedstorage.FileBasedStorage',
+    help_text=_(
+        'Storage backend used by the tiered storage backend to store the '
+        'files.'
+    )
+)
+setting_tiered_cache_location = namespace.add_setting(
+    global_name='STORAGE_TIERED_CACHE_LOCATION',
+    default=os.path.join(settings.MEDIA_ROOT, 'document_storage_cache'),
+    help_text=_(
+        'Local path where the tiered storage backend keeps copies of the '
+        'most recently used files.'
+    ), is_path=True
+)
+setting_tiered_cache_maximum_size = namespace.add_setting(
+    global_name='STORAGE_TIERED_CACHE_MAXIMUM_SIZE',
+    default=DEFAULT_TIERED_CACHE_MAXIMUM_SIZE, help_text=_(
+        'Maximum size in bytes of the local copies of the tiered storage '
+        'backend. The least recently used copies are deleted when the size '
+        'is exceeded.'
+    )
+)
+setting_tiered_metadata_timeout = namespace.add_setting(
+    global_name='STORAGE_TIERED_METADATA_TIMEOUT',
+    default=DEFAULT_TIERED_METADATA_TIMEOUT, help_text=_(
+        'Time in seconds to remember if a file exists and its size, for '
+        'files without a local copy.'
+    )
+)
+setting_tiered_verify_checksum = namespace.add_setting(
+    global_name='STORAGE_TIERED_VERIFY_CHECKSUM', default=False,
+    help_text=_(
+        'Verify the checksum of the local copies of the tiered storage '
+        'backend every time they are opened, instead of only their size. '
+        'Reading the whole file to verify it makes opening it slower.'
+    )
+)
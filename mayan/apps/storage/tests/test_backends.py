@@ -0,0 +1,231 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import zipfile
+
+import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import override_settings
+
+from common.tests import BaseTestCase
+from common.utils import mkdtemp
+
+from ..backends.compressedstorage import CompressedStorage
+from ..backends.tieredstorage import TieredStorage
+
+TEST_BLOCK_SIZE = 16
+TEST_CONTENT = b''.join(
+    b'{:04d}'.format(number) for number in range(50)
+)  # 200 bytes, 12.5 blocks
+TEST_FILENAME = 'test_file'
+
+
+@mock.patch(
+    'storage.backends.compressedstorage.COMPRESSED_STORAGE_BLOCK_SIZE',
+    TEST_BLOCK_SIZE
+)
+class CompressedStorageTestCase(BaseTestCase):
+    def setUp(self):
+        super(CompressedStorageTestCase, self).setUp()
+        self.temporary_directory = mkdtemp()
+        self.storage = CompressedStorage()
+        self.storage.location = self.temporary_directory
+
+    def tearDown(self):
+        shutil.rmtree(self.temporary_directory)
+        super(CompressedStorageTestCase, self).tearDown()
+
+    def _save(self, content):
+        return self.storage.save(TEST_FILENAME, ContentFile(content))
+
+    def test_compression(self):
+        name = self._save(content=b'0' * TEST_BLOCK_SIZE * 10)
+
+        self.assertTrue(
+            os.path.getsize(self.storage.path(name)) < TEST_BLOCK_SIZE * 10
+        )
+
+    def test_read(self):
+        name = self._save(content=TEST_CONTENT)
+
+        with self.storage.open(name) as file_object:
+            self.assertEqual(file_object.read(), TEST_CONTENT)
+
+    def test_read_across_blocks(self):
+        name = self._save(content=TEST_CONTENT)
+
+        with self.storage.open(name) as file_object:
+            # Sizes that end in the middle of a block and span several
+            chunks = []
+            for size in (10, 3, 40, 16, 1000):
+                chunks.append(file_object.read(size))
+
+            self.assertEqual(
+                [len(chunk) for chunk in chunks], [10, 3, 40, 16, 131]
+            )
+            self.assertEqual(b''.join(chunks), TEST_CONTENT)
+            self.assertEqual(file_object.read(), b'')
+
+    def test_seek(self):
+        name = self._save(content=TEST_CONTENT)
+
+        with self.storage.open(name) as file_object:
+            file_object.seek(30)
+            self.assertEqual(file_object.read(20), TEST_CONTENT[30:50])
+            self.assertEqual(file_object.tell(), 50)
+
+            # Back into a block already passed
+            file_object.seek(-45, os.SEEK_CUR)
+            self.assertEqual(file_object.read(4), TEST_CONTENT[5:9])
+
+            file_object.seek(-8, os.SEEK_END)
+            self.assertEqual(file_object.read(), TEST_CONTENT[-8:])
+
+            file_object.seek(TEST_BLOCK_SIZE * 3)
+            self.assertEqual(
+                file_object.read(TEST_BLOCK_SIZE),
+                TEST_CONTENT[TEST_BLOCK_SIZE * 3:TEST_BLOCK_SIZE * 4]
+            )
+
+            file_object.seek(len(TEST_CONTENT) + 10)
+            self.assertEqual(file_object.read(), b'')
+
+    def test_size(self):
+        name = self._save(content=TEST_CONTENT)
+
+        self.assertEqual(self.storage.size(name), len(TEST_CONTENT))
+
+        with self.storage.open(name) as file_object:
+            self.assertEqual(file_object.size, len(TEST_CONTENT))
+
+    def test_empty_file(self):
+        name = self._save(content=b'')
+
+        self.assertEqual(self.storage.size(name), 0)
+
+        with self.storage.open(name) as file_object:
+            self.assertEqual(file_object.read(), b'')
+            file_object.seek(10)
+            self.assertEqual(file_object.read(10), b'')
+
+    def test_legacy_zip_file(self):
+        with zipfile.ZipFile(
+            os.path.join(self.temporary_directory, TEST_FILENAME), 'w',
+            zipfile.ZIP_DEFLATED
+        ) as zip_file:
+            zip_file.writestr('document', TEST_CONTENT)
+
+        self.assertEqual(self.storage.size(TEST_FILENAME), len(TEST_CONTENT))
+
+        with self.storage.open(TEST_FILENAME) as file_object:
+            self.assertEqual(file_object.read(), TEST_CONTENT)
+            file_object.seek(30)
+            self.assertEqual(file_object.read(20), TEST_CONTENT[30:50])
+
+
+@override_settings(STORAGE_TIERED_CACHE_MAXIMUM_SIZE=100)
+class TieredStorageTestCase(BaseTestCase):
+    def setUp(self):
+        super(TieredStorageTestCase, self).setUp()
+        self.backend_directory = mkdtemp()
+        self.cache_directory = mkdtemp()
+        self.storage = TieredStorage()
+        self.storage.backend = FileSystemStorage(
+            location=self.backend_directory
+        )
+        self.storage.location = self.cache_directory
+
+    def tearDown(self):
+        shutil.rmtree(self.backend_directory)
+        shutil.rmtree(self.cache_directory)
+        super(TieredStorageTestCase, self).tearDown()
+
+    def _get_cache_path(self, name):
+        return os.path.join(self.cache_directory, name)
+
+    def _save(self, name, content=b'0' * 40):
+        return self.storage.save(name, ContentFile(content))
+
+    def test_save(self):
+        name = self._save(name=TEST_FILENAME, content=TEST_CONTENT)
+
+        self.assertTrue(self.storage.backend.exists(name))
+        self.assertTrue(os.path.exists(self._get_cache_path(name)))
+        self.assertEqual(self.storage.size(name), len(TEST_CONTENT))
+
+        with self.storage.open(name) as file_object:
+            self.assertEqual(file_object.read(), TEST_CONTENT)
+
+    def test_open_without_local_copy(self):
+        name = self.storage.backend.save(
+            TEST_FILENAME, ContentFile(TEST_CONTENT)
+        )
+
+        with self.storage.open(name) as file_object:
+            self.assertEqual(file_object.read(), TEST_CONTENT)
+
+        self.assertTrue(os.path.exists(self._get_cache_path(name)))
+
+    @override_settings(STORAGE_TIERED_VERIFY_CHECKSUM=True)
+    def test_invalid_local_copy(self):
+        name = self._save(name=TEST_FILENAME, content=TEST_CONTENT)
+
+        # Same size, different content
+        with open(self._get_cache_path(name), 'wb') as file_object:
+            file_object.write(b'X' * len(TEST_CONTENT))
+
+        with self.storage.open(name) as file_object:
+            self.assertEqual(file_object.read(), TEST_CONTENT)
+
+    def test_truncated_local_copy(self):
+        name = self._save(name=TEST_FILENAME, content=TEST_CONTENT)
+
+        with open(self._get_cache_path(name), 'wb') as file_object:
+            file_object.write(TEST_CONTENT[:10])
+
+        with self.storage.open(name) as file_object:
+            self.assertEqual(file_object.read(), TEST_CONTENT)
+
+    def test_exists_deleted_from_backend(self):
+        name = self._save(name=TEST_FILENAME)
+
+        # Deleted by another node, which keeps the local copies of this one
+        self.storage.backend.delete(name)
+
+        self.assertTrue(os.path.exists(self._get_cache_path(name)))
+        self.assertFalse(self.storage.exists(name))
+
+    def test_delete(self):
+        name = self._save(name=TEST_FILENAME)
+
+        self.storage.delete(name)
+
+        self.assertFalse(self.storage.backend.exists(name))
+        self.assertFalse(os.path.exists(self._get_cache_path(name)))
+        self.assertEqual(self.storage._update_total_size(size=0), 0)
+
+    def test_prune(self):
+        name_1 = self._save(name='test_file_1')
+        name_2 = self._save(name='test_file_2')
+        os.utime(self._get_cache_path(name_1), (1, 1))
+        os.utime(self._get_cache_path(name_2), (2, 2))
+
+        name_3 = self._save(name='test_file_3')
+
+        self.assertFalse(os.path.exists(self._get_cache_path(name_1)))
+        self.assertTrue(os.path.exists(self._get_cache_path(name_2)))
+        self.assertTrue(os.path.exists(self._get_cache_path(name_3)))
+        self.assertTrue(self.storage.backend.exists(name_1))
+        self.assertEqual(self.storage._update_total_size(size=0), 80)
+
+    def test_prune_only_above_maximum(self):
+        self._save(name='test_file_1')
+
+        with mock.patch.object(self.storage, 'prune') as prune:
+            self._save(name='test_file_2')
+
+        self.assertFalse(prune.called)
+        self.assertEqual(self.storage._update_total_size(size=0), 80)
@@ -82,6 +82,7 @@ djangorestframework-recursive==0.1.1
 fusepy==2.0.4
 pdfminer==20140328
 pycountry==1.20
+pyinotify==0.9.6
 pyocr==0.4.5
 python-dateutil==2.5.3
 python-gnupg==0.3.9